@@ -0,0 +1,121 @@
+"""
+Benchmark ekspor analitik (tat_export) vs mengurai teks laporan.
+
+    python benchmarks/bench_export.py --rows 2000000
+    python benchmarks/bench_export.py --rows 5000000 --days 90 --output hasil.json
+
+Kasus acak (bench_reports.report_cases) tersebar di `--days` tanggal diekspor per
+chunk ke dataset berpartisi per tanggal, dalam format Parquet (zstd) dan Arrow IPC.
+Untuk setiap format diukur:
+    ekspor  : write_analytics ujung ke ujung (evaluate_codes + kolom Arrow + tulis)
+    agregasi: read_analytics (memory map) + group-by jenis_narkotika x rekomendasi
+              (jumlah, rata-rata bb_rasio) seperti ringkasan analis
+
+Pembanding "urai teks" merender laporan (iter_reports) lalu mengurai field yang
+sama dengan regex, cara analis membangun statistik dari teks laporan selama ini;
+diukur pada sampel dan diekstrapolasi ke `--rows`.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tat_export import read_analytics, write_analytics  # noqa: E402
+from tat_reports import iter_reports  # noqa: E402
+from bench_reports import chunks, report_cases  # noqa: E402
+
+REPORT_FIELDS = re.compile(
+    r"Jenis Narkotika\s+: (?P<jenis>.+)\n.*?Berat Barang Bukti: (?P<bb>[\d.]+) gram\n"
+    r"\s+\(Batas SEMA No\. 4/2010: (?P<limit>[\d.]+) gram\).*?KESIMPULAN:\n>> (?P<rekomendasi>.+?) <<",
+    re.S,
+)
+
+
+def dated_cases(n: int, days: int, seed: int = 0):
+    cases = report_cases(n, seed)
+    rng = np.random.default_rng(seed + 2)
+    return cases.assign(tanggal=(np.datetime64("2025-01-01") + rng.integers(0, days, n)).astype(str))
+
+
+def aggregate(root: str):
+    t = read_analytics(root, columns=["jenis_narkotika", "rekomendasi", "bb_rasio"])
+    return t.group_by(["jenis_narkotika", "rekomendasi"]).aggregate([([], "count_all"), ("bb_rasio", "mean")])
+
+
+def scrape(cases) -> int:
+    """Statistik yang sama dari teks laporan: render lalu regex per laporan."""
+    counts, total = Counter(), 0
+    for _, text in iter_reports(cases):
+        m = REPORT_FIELDS.search(text)
+        counts[m["jenis"], m["rekomendasi"]] += 1
+        total += 1
+    return total
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--chunk-size", type=int, default=200_000)
+    parser.add_argument("--scrape-rows", type=int, default=20_000, help="Sampel pembanding urai teks")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    cases = dated_cases(args.rows, args.days)
+    results = {"rows": args.rows, "days": args.days, "chunk_size": args.chunk_size, "formats": {}}
+    tmp = tempfile.mkdtemp(prefix="tat_export_")
+    try:
+        for fmt in ("parquet", "arrow"):
+            root = os.path.join(tmp, fmt)
+            t0 = time.perf_counter()
+            write_analytics(root, chunks(cases, args.chunk_size), fmt=fmt)
+            export_s = time.perf_counter() - t0
+            aggregate(root)  # pemanasan: page cache & import
+            t0 = time.perf_counter()
+            groups = aggregate(root).num_rows
+            agg_s = time.perf_counter() - t0
+            results["formats"][fmt] = {
+                "ekspor_baris_per_detik": round(args.rows / export_s),
+                "ekspor_detik": round(export_s, 2),
+                "byte_per_baris": round(dir_size(root) / args.rows, 1),
+                "agregasi_detik": round(agg_s, 3),
+                "grup": groups,
+            }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    sample = cases.iloc[:min(args.scrape_rows, args.rows)]
+    t0 = time.perf_counter()
+    scrape(sample)
+    per_row = (time.perf_counter() - t0) / len(sample)
+    results["urai_teks_baris_per_detik"] = round(1 / per_row)
+    results["urai_teks_detik_ekstrapolasi"] = round(per_row * args.rows, 1)
+
+    print(f"{args.rows:,} asesmen, {args.days} partisi tanggal, chunk {args.chunk_size:,}:")
+    for fmt, r in results["formats"].items():
+        print(f"  {fmt:<8} ekspor {r['ekspor_baris_per_detik']:>10,} baris/detik ({r['ekspor_detik']} s)  "
+              f"{r['byte_per_baris']:>5} B/baris  agregasi (mmap + group-by) {r['agregasi_detik']:.3f} s")
+    print(f"  urai teks laporan      {results['urai_teks_baris_per_detik']:>10,} baris/detik  "
+          f"(~{results['urai_teks_detik_ekstrapolasi']} s untuk {args.rows:,} baris)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
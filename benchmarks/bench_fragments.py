@@ -0,0 +1,182 @@
+"""
+Benchmark rerun per interaksi: rerun seluruh app vs rerun fragment, di bawah sesi konkuren.
+
+    python benchmarks/bench_fragments.py --sessions 1 4 16 --iterations 20
+    python benchmarks/bench_fragments.py --sessions 8 --output hasil.json
+
+Menjalankan `streamlit run tat_predict_app.py` sungguhan (headless, port acak) lalu
+membuka N sesi websocket konkuren seperti browser. Setiap sesi mengirim form analisis
+sekali, kemudian berulang kali mengedit "Draft Laporan" di tab Laporan:
+
+    full      : rerun tanpa fragment_id = perilaku sebelum tab dipecah menjadi fragment
+                (setiap interaksi menjalankan ulang seluruh skrip termasuk form input)
+    fragment  : rerun dengan fragment_id report_fragment (yang dikirim browser sekarang)
+
+Latensi diukur dari BackMsg rerun_script sampai ForwardMsg script_finished. Karena
+rerun Streamlit sendiri punya overhead tetap (skrip kosong pun butuh puluhan ms CPU
+di mesin lambat), waktu CPU server per rerun (/proc, Linux) serta jumlah delta dan
+byte per rerun ikut dilaporkan sebagai ukuran kerja yang dihemat fragment.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "tat_predict_app.py")
+_DONE = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+def _process_cpu_seconds(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            fields = fh.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, db_path: str) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true",
+         "--server.port", str(port), "--server.enableXsrfProtection", "false",
+         "--browser.gatherUsageStats", "false"],
+        env={**os.environ, "TAT_DB_PATH": db_path}, cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("Server Streamlit tidak merespons")
+
+
+class Session:
+    """Satu sesi browser minimal: kirim rerun_script, kumpulkan widget (id, label, fragment)."""
+
+    def __init__(self, ws: Any):
+        self.ws = ws
+        self.widgets: Dict[str, Tuple[str, str]] = {}  # label -> (widget id, fragment_id)
+        self.deltas = 0
+        self.bytes = 0
+
+    async def rerun(self, states: Optional[List[WidgetState]] = None, fragment_id: str = "") -> float:
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(states or [])
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            raw = await self.ws.recv()
+            fm = ForwardMsg()
+            fm.ParseFromString(raw)
+            self.bytes += len(raw)
+            kind = fm.WhichOneof("type")
+            self.deltas += kind == "delta"
+            if kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                element = fm.delta.new_element
+                widget = getattr(element, element.WhichOneof("type"))
+                if getattr(widget, "id", "") and getattr(widget, "label", ""):
+                    self.widgets[widget.label] = (widget.id, fm.delta.fragment_id)
+            elif kind == "script_finished" and fm.script_finished in _DONE:
+                return time.perf_counter() - t0
+
+
+async def run_session(url: str, iterations: int, mode: str, latencies: List[float], work: List[int]) -> None:
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws)
+        await session.rerun()
+        submit_id, _ = session.widgets["🔍 ANALISIS SEKARANG"]
+        # Submit form: fragment input -> st.rerun(scope="app") -> run penuh
+        await session.rerun([WidgetState(id=submit_id, trigger_value=True)],
+                            fragment_id=session.widgets["🔍 ANALISIS SEKARANG"][1])
+        for _ in range(3):  # tunggu run penuh hasil st.rerun selesai mengirim widget laporan
+            if "Draft Laporan" in session.widgets:
+                break
+            await session.rerun()
+        draft_id, report_fragment = session.widgets["Draft Laporan"]
+        session.deltas = session.bytes = 0
+        for i in range(iterations):
+            state = WidgetState(id=draft_id, string_value=f"draft revisi {i}")
+            latencies.append(await session.rerun([state], fragment_id=report_fragment if mode == "fragment" else ""))
+        work[0] += session.deltas
+        work[1] += session.bytes
+
+
+async def measure(url: str, sessions: int, iterations: int, mode: str, server_pid: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    work = [0, 0]  # delta, byte
+    cpu0, t0 = _process_cpu_seconds(server_pid), time.perf_counter()
+    await asyncio.gather(*[run_session(url, iterations, mode, latencies, work) for _ in range(sessions)])
+    wall = time.perf_counter() - t0
+    cpu1 = _process_cpu_seconds(server_pid)
+    # Termasuk rerun awal + submit per sesi (sama untuk kedua mode)
+    cpu_ms = round((cpu1 - cpu0) * 1000.0 / (sessions * iterations), 1) if cpu0 is not None else None
+    lat = sorted(x * 1000.0 for x in latencies)
+    pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))], 2)  # noqa: E731
+    return {"reruns": len(lat), "p50_ms": pct(0.50), "p95_ms": pct(0.95), "max_ms": pct(1.0),
+            "reruns_per_sec": round(len(lat) / wall, 1), "deltas_per_rerun": round(work[0] / len(lat), 1),
+            "bytes_per_rerun": round(work[1] / len(lat)), "server_cpu_ms_per_rerun": cpu_ms}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--iterations", type=int, default=20, help="Interaksi laporan per sesi")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = start_server(port, os.path.join(tmp, "bench.db"))
+        try:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            asyncio.run(measure(url, 1, 2, "full", proc.pid))  # pemanasan (import pandas/plotly, cache figure)
+            results: Dict[str, Any] = {"cpu_count": os.cpu_count(), "iterations": args.iterations, "sessions": {}}
+            print(f"{os.cpu_count()} CPU, {args.iterations} interaksi laporan per sesi")
+            for n in args.sessions:
+                row = {mode: asyncio.run(measure(url, n, args.iterations, mode, proc.pid))
+                       for mode in ("full", "fragment")}
+                results["sessions"][str(n)] = row
+                for mode, r in row.items():
+                    print(f"  {n:>3} sesi  {mode:<8}  p50 {r['p50_ms']:>8.2f} ms  p95 {r['p95_ms']:>8.2f} ms"
+                          f"  {r['reruns_per_sec']:>6.1f} rerun/s  CPU {r['server_cpu_ms_per_rerun']} ms"
+                          f"  {r['deltas_per_rerun']:>5.0f} delta"
+                          f"  {r['bytes_per_rerun']:>7,} B/rerun")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Benchmark cold-start import engine (python -X importtime).
+
+Mengukur waktu import kumulatif modul headless dan memastikan dependensi UI
+(streamlit, plotly, pandas, numpy) tidak ikut termuat. Hasil dibandingkan dengan
+anggaran di benchmarks/import_budget.json; exit code 1 jika melewati anggaran.
+
+    python benchmarks/bench_import.py                 # cek terhadap anggaran
+    python benchmarks/bench_import.py --update        # simpan hasil sebagai baseline baru
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(ROOT, "benchmarks", "import_budget.json")
+UI_MODULES = ("streamlit", "plotly", "pandas", "numpy")
+
+
+def measure_import(module: str, runs: int = 7) -> Dict[str, float]:
+    """Median waktu import kumulatif (ms) + daftar modul UI yang ikut termuat."""
+    samples: List[float] = []
+    check = f"import sys, {module}; print(','.join(m for m in {UI_MODULES!r} if m in sys.modules))"
+    leaked = ""
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", check],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        leaked = proc.stdout.strip()
+        for line in proc.stderr.splitlines():
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 3 and parts[2] == module:
+                samples.append(int(parts[1]) / 1000.0)
+    return {"median_ms": round(statistics.median(samples), 2), "max_ms": round(max(samples), 2),
+            "ui_modules_loaded": [m for m in leaked.split(",") if m]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--update", action="store_true", help="Tulis hasil sebagai baseline di import_budget.json")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE, encoding="utf-8") as fh:
+        budget = json.load(fh)
+
+    failed = False
+    for module, spec in budget["modules"].items():
+        res = measure_import(module, args.runs)
+        status = "OK"
+        if res["median_ms"] > spec["budget_ms"]:
+            status, failed = "REGRESI (waktu)", True
+        if res["ui_modules_loaded"] and not spec.get("allow_ui", False):
+            status, failed = f"REGRESI (memuat {', '.join(res['ui_modules_loaded'])})", True
+        print(f"{module:<16} median {res['median_ms']:>8.2f} ms  baseline {spec['baseline_ms']:>8.2f} ms  "
+              f"budget {spec['budget_ms']:>8.2f} ms  {status}")
+        if args.update:
+            spec["baseline_ms"] = res["median_ms"]
+
+    if args.update:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as fh:
+            json.dump(budget, fh, indent=2)
+            fh.write("\n")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Benchmark skala eksekusi batch paralel (tat_parallel) pada 1, 2, 4 dan 8 worker.
+
+    python benchmarks/bench_parallel.py --rows 2000000
+    python benchmarks/bench_parallel.py --rows 2000000 --no-alasan --output hasil.json
+
+Setiap konfigurasi dijalankan dengan pool yang sudah hangat (satu evaluasi
+pemanasan) sehingga angka yang dilaporkan adalah throughput steady-state.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tat_core import GRAMATUR_LIMITS  # noqa: E402
+from tat_batch import evaluate_batch  # noqa: E402
+from tat_parallel import ParallelEvaluator  # noqa: E402
+
+
+def synthetic_cases(n: int, seed: int = 0) -> pd.DataFrame:
+    """Kasus acak di seluruh domain input (ASAM 0-4, DSM 0-11, C-SSRS 0-5, dst.)."""
+    rng = np.random.default_rng(seed)
+    substances = rng.choice(list(GRAMATUR_LIMITS), n)
+    return pd.DataFrame({
+        **{f"asam_d{d}": rng.integers(0, 5, n) for d in range(1, 7)},
+        "dsm5_count": rng.integers(0, 12, n),
+        "suicide_risk_level": rng.integers(0, 6, n),
+        "assist_risk": rng.choice(["Low", "Moderate", "High"], n),
+        "bb_amount": np.round(rng.exponential(3.0, n), 2),
+        "bb_limit": pd.Series(substances).map(GRAMATUR_LIMITS).to_numpy(),
+        "peran": rng.choice(["Pengguna", "Kurir", "Pengedar", "Bandar"], n),
+        "is_residivis": rng.random(n) < 0.2,
+        "is_urine_positive": rng.random(n) < 0.8,
+        "status_tangkap": rng.choice(["Tertangkap Tangan", "Pengembangan/Lapor Diri"], n),
+    })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-alasan", action="store_true", help="Ukur tanpa render teks alasan")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    cases = synthetic_cases(args.rows)
+    with_alasan = not args.no_alasan
+    reference = evaluate_batch(cases, with_alasan=with_alasan)
+    results = {"rows": args.rows, "cpu_count": os.cpu_count(), "with_alasan": with_alasan, "workers": {}}
+
+    print(f"{args.rows:,} baris, {os.cpu_count()} CPU, alasan={'ya' if with_alasan else 'tidak'}")
+    for workers in args.workers:
+        with ParallelEvaluator(workers=workers, min_rows=0) as ev:
+            out = ev.evaluate(cases, with_alasan=with_alasan)  # pemanasan pool
+            if not out.equals(reference):
+                raise SystemExit(f"Hasil {workers} worker berbeda dari jalur in-process")
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                ev.evaluate(cases, with_alasan=with_alasan)
+                timings.append(time.perf_counter() - t0)
+        best = min(timings)
+        results["workers"][str(workers)] = {"seconds": round(best, 4), "rows_per_sec": round(args.rows / best)}
+        print(f"  {workers} worker: {best:7.3f} s  {args.rows / best:>14,.0f} baris/detik")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
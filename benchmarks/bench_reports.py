@@ -0,0 +1,120 @@
+"""
+Benchmark laporan massal (tat_reports): laporan/detik dan memori puncak.
+
+    python benchmarks/bench_reports.py --rows 20000
+    python benchmarks/bench_reports.py --rows 100000 --chunk-size 5000 --output hasil.json
+
+Yang diukur pada kasus acak yang sama:
+    per kasus  : TATLogicEngine.determine_recommendation_compact + render_report_text per baris
+                 (cara membuat laporan satu per satu seperti TATUI.render_report)
+    massal     : iter_reports per chunk (evaluate_codes + template terkompilasi), tanpa I/O
+    zip        : write_report_zip ke berkas sementara (deflate), ujung ke ujung
+
+Memori puncak jalur zip (tracemalloc) diukur untuk dua ukuran input agar terlihat
+bahwa memori mengikuti ukuran chunk, bukan jumlah laporan.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tat_core import GRAMATUR_LIMITS, TATLogicEngine  # noqa: E402
+from tat_batch import case_from_row  # noqa: E402
+from tat_reports import iter_reports, render_report_text, write_report_zip  # noqa: E402
+from bench_parallel import synthetic_cases  # noqa: E402
+
+
+def report_cases(n: int, seed: int = 0):
+    cases = synthetic_cases(n, seed)
+    limit_to_jenis = {v: k for k, v in GRAMATUR_LIMITS.items()}
+    rng = np.random.default_rng(seed + 1)
+    return cases.assign(
+        nama=[f"Klien {i}" for i in range(n)],
+        usia=rng.integers(15, 70, n),
+        jenis_narkotika=cases["bb_limit"].map(limit_to_jenis),
+    )
+
+
+def chunks(cases, size: int):
+    for start in range(0, len(cases), size):
+        yield cases.iloc[start:start + size]
+
+
+def per_case(cases) -> int:
+    n = 0
+    for row in cases.to_dict("records"):
+        kwargs = case_from_row(row)
+        decision = TATLogicEngine.determine_recommendation_compact(**kwargs)
+        inputs = {**kwargs, "nama": row["nama"], "usia": row["usia"], "jenis_narkotika": row["jenis_narkotika"],
+                  "dsm_count": kwargs["dsm5_count"]}
+        render_report_text(inputs, decision)
+        n += 1
+    return n
+
+
+def bulk(cases, size: int) -> int:
+    return sum(1 for frame in chunks(cases, size) for _ in iter_reports(frame))
+
+
+def to_zip(cases, size: int, path: str) -> int:
+    return write_report_zip(path, chunks(cases, size))
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    n = fn(*args)
+    return n / (time.perf_counter() - t0)
+
+
+def peak_zip_memory(cases, size: int, path: str) -> float:
+    tracemalloc.start()
+    to_zip(cases, size, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    cases = report_cases(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "laporan.zip")
+        results = {
+            "rows": args.rows, "chunk_size": args.chunk_size,
+            "per_kasus_per_detik": round(timed(per_case, cases.iloc[:min(args.rows, 5_000)])),
+            "massal_per_detik": round(timed(bulk, cases, args.chunk_size)),
+            "zip_per_detik": round(timed(to_zip, cases, args.chunk_size, path)),
+        }
+        results["zip_bytes_per_laporan"] = round(os.path.getsize(path) / args.rows)
+        small = cases.iloc[:max(args.rows // 4, 1)]
+        results["zip_peak_mb"] = {str(len(small)): round(peak_zip_memory(small, args.chunk_size, path), 1),
+                                  str(args.rows): round(peak_zip_memory(cases, args.chunk_size, path), 1)}
+
+    print(f"{args.rows:,} laporan, chunk {args.chunk_size:,}:")
+    print(f"  per kasus (skalar + template) {results['per_kasus_per_detik']:>10,} laporan/detik")
+    print(f"  massal (iter_reports)         {results['massal_per_detik']:>10,} laporan/detik")
+    print(f"  ZIP deflate ujung ke ujung    {results['zip_per_detik']:>10,} laporan/detik"
+          f"  ({results['zip_bytes_per_laporan']:,} B/laporan terkompresi)")
+    for n, mb in results["zip_peak_mb"].items():
+        print(f"  memori puncak ZIP, {int(n):>9,} laporan: {mb:>6.1f} MB")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Benchmark memori representasi hasil: dict determine_recommendation vs CompactResult
+vs rekaman terstruktur NumPy (tat_batch.RESULT_DTYPE), dinormalisasi ke per 1 juta hasil.
+
+    python benchmarks/bench_result_memory.py --rows 200000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tat_core import TATLogicEngine  # noqa: E402
+from tat_batch import case_from_row, evaluate_compact  # noqa: E402
+from bench_parallel import synthetic_cases  # noqa: E402
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    cases = synthetic_cases(args.rows)
+    kwargs = [case_from_row(r) for r in cases.to_dict("records")]
+    scale = 1_000_000 / args.rows
+
+    forms = {
+        "dict (determine_recommendation)": lambda: [TATLogicEngine.determine_recommendation(**k) for k in kwargs],
+        "CompactResult (__slots__)": lambda: [TATLogicEngine.determine_recommendation_compact(**k) for k in kwargs],
+        "NumPy RESULT_DTYPE": lambda: evaluate_compact(cases),
+    }
+    print(f"Memori per 1 juta hasil (diukur pada {args.rows:,} kasus acak):")
+    baseline = None
+    for name, build in forms.items():
+        mb = measure(build) * scale / 2**20
+        baseline = baseline or mb
+        print(f"  {name:<34} {mb:>9.1f} MB  ({baseline / mb:>5.1f}x lebih kecil dari dict)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
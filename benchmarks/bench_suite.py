@@ -0,0 +1,326 @@
+"""
+Suite benchmark TAT DSS: engine skalar, jalur batch, laporan, sensitivitas, grafik dan page run Streamlit.
+
+    python benchmarks/bench_suite.py                          # semua benchmark -> benchmarks/results/
+    python benchmarks/bench_suite.py -k skalar -k laporan     # hanya yang namanya memuat substring
+    python benchmarks/bench_suite.py --output baru.json --compare lama.json
+    python benchmarks/bench_suite.py --compare-only lama.json baru.json
+
+Setiap benchmark dijalankan `--rounds` putaran; jumlah loop per putaran dikalibrasi
+sampai satu putaran >= `--min-time` detik (seperti timeit.autorange). Yang dicatat
+adalah waktu per operasi (satu kasus / satu laporan / satu figure / satu page run):
+min, median, mean, stdev dan ops/detik, plus metadata mesin & versi dependensi.
+
+Kasus "realistis" mengikuti sebaran yang umum di lapangan (mayoritas Pengguna dengan
+BB kecil, skor ASAM rendah), bukan grid seragam, sehingga cabang yang diukur
+sebanding dengan beban nyata. Seed tetap: hasil antar-run dapat dibandingkan.
+
+Mode compare membandingkan `min` per benchmark secara default (paling tahan terhadap
+gangguan proses lain di mesin yang sama; `--stat median` untuk median); rasio
+> 1 + `--threshold` ditandai REGRESI dan exit code menjadi 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, ROOT)
+# Riwayat yang ditulis page run AppTest tidak boleh menyentuh tat_cases.db pengguna
+os.environ.setdefault("TAT_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="tat_bench_"), "bench.db"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from tat_core import ASAM_DIMENSIONS, GRAMATUR_LIMITS, TATLogicEngine  # noqa: E402
+from tat_batch import case_from_row  # noqa: E402
+from tat_rules import RuleSet  # noqa: E402
+
+APP = os.path.join(ROOT, "tat_predict_app.py")
+SAMPLE_SIZE = 1_000
+
+
+class Benchmark:
+    """Satu benchmark: `fn()` mengerjakan `ops` operasi (mis. 1.000 kasus) per panggilan."""
+
+    def __init__(self, name: str, group: str, fn: Callable[[], Any], ops: int = 1, max_loops: Optional[int] = None):
+        self.name = name
+        self.group = group
+        self.fn = fn
+        self.ops = ops
+        self.max_loops = max_loops
+
+
+def realistic_cases(n: int = SAMPLE_SIZE, seed: int = 42) -> pd.DataFrame:
+    """Sebaran kasus mendekati lapangan: ~80% Pengguna, BB log-normal di sekitar batas SEMA."""
+    rng = np.random.default_rng(seed)
+    peran = rng.choice(["Pengguna", "Kurir", "Pengedar", "Bandar"], n, p=[0.80, 0.10, 0.07, 0.03])
+    jenis = rng.choice(list(GRAMATUR_LIMITS), n)
+    limit = pd.Series(jenis).map(GRAMATUR_LIMITS).to_numpy()
+    # Pengguna umumnya di bawah batas; peran jaringan jauh di atasnya
+    skala = np.where(peran == "Pengguna", 0.6, 8.0)
+    asam_p = [0.30, 0.30, 0.20, 0.15, 0.05]
+    return pd.DataFrame({
+        "nama": [f"Klien {i}" for i in range(n)],
+        "usia": rng.integers(16, 65, n),
+        "jenis_narkotika": jenis,
+        **{f"asam_d{d}": rng.choice(5, n, p=asam_p) for d in ASAM_DIMENSIONS},
+        "dsm5_count": rng.binomial(11, 0.4, n),
+        "suicide_risk_level": rng.choice(6, n, p=[0.55, 0.20, 0.12, 0.07, 0.04, 0.02]),
+        "assist_risk": rng.choice(["Low", "Moderate", "High"], n, p=[0.35, 0.40, 0.25]),
+        "bb_amount": np.round(limit * rng.lognormal(np.log(skala), 0.8, n), 2),
+        "bb_limit": limit,
+        "peran": peran,
+        "is_residivis": rng.random(n) < 0.15,
+        "is_urine_positive": rng.random(n) < 0.85,
+        "status_tangkap": rng.choice(["Tertangkap Tangan", "Pengembangan/Lapor Diri"], n, p=[0.7, 0.3]),
+    })
+
+
+def app_inputs(row: Dict[str, Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Bentuk st.session_state['inputs'] untuk satu kasus (masukan TATUI.render_report)."""
+    return {**kwargs, "nama": row["nama"], "usia": int(row["usia"]), "jenis_narkotika": row["jenis_narkotika"],
+            "dsm_count": kwargs["dsm5_count"]}
+
+
+def build_benchmarks() -> List[Benchmark]:
+    from tat_batch import evaluate_batch, evaluate_compact
+    from tat_figures import asam_radar_figure, outcome_heatmap_figure
+    from tat_reports import iter_reports, render_report_text
+    from tat_table import get_decision_table
+    from tat_sensitivity import outcome_grid, sweep
+
+    cases = realistic_cases()
+    rows = cases.to_dict("records")
+    kwargs = [case_from_row(r) for r in rows]
+    legal = [(k["bb_amount"], k["bb_limit"], k["peran"], k["is_residivis"], not k["is_urine_positive"])
+             for k in kwargs]
+    severity = [(k["dsm5_count"], k["assist_risk"]) for k in kwargs]
+    decisions = [TATLogicEngine.determine_recommendation_compact(**k) for k in kwargs]
+    inputs = [app_inputs(r, k) for r, k in zip(rows, kwargs)]
+    scores = [tuple(k["asam_scores"][d] for d in ASAM_DIMENSIONS) for k in kwargs]
+    table = get_decision_table()
+    big = pd.concat([cases] * 100, ignore_index=True)
+    n, tanggal = len(kwargs), "17 Oktober 2026"
+
+    def legal_flags():
+        for args in legal:
+            TATLogicEngine.check_legal_red_flags(*args)
+
+    def addiction_severity():
+        for dsm, assist in severity:
+            TATLogicEngine.get_addiction_severity(dsm, assist)
+
+    def scalar():
+        for k in kwargs:
+            TATLogicEngine.determine_recommendation(**k)
+
+    def scalar_compiled():
+        for k in kwargs:
+            table.recommend(**k)
+
+    def scalar_compact():
+        for k in kwargs:
+            table.lookup_case(**k)
+
+    def report_text():
+        for inp, dec in zip(inputs, decisions):
+            render_report_text(inp, dec, tanggal)
+
+    def report_bulk():
+        for _ in iter_reports(cases):
+            pass
+
+    def sensitivity_sweep():
+        for k in kwargs[:100]:
+            sweep(k)
+
+    def whatif_heatmap():
+        # Grid BB x DSM-5 + figure, seperti TATUI.render_sensitivity
+        xv, yv, z = outcome_grid(kwargs[0], "bb_amount", "dsm5_count")
+        outcome_heatmap_figure(xv, yv, z, "BB", "DSM-5", (kwargs[0]["bb_amount"], kwargs[0]["dsm5_count"]), log_x=True)
+
+    def figure_build():
+        # Tanpa cache: DataFrame + px.line_polar + update_traces seperti TATUI.render_results dulu
+        asam_radar_figure.__wrapped__(scores[0])
+
+    def figure_cached():
+        for s in scores:
+            asam_radar_figure(s)
+
+    return [
+        Benchmark("skalar.determine_recommendation", "engine", scalar, n),
+        Benchmark("skalar.determine_recommendation_compiled", "engine", scalar_compiled, n),
+        Benchmark("skalar.determine_recommendation_compact", "engine", scalar_compact, n),
+        Benchmark("skalar.check_legal_red_flags", "engine", legal_flags, n),
+        Benchmark("skalar.get_addiction_severity", "engine", addiction_severity, n),
+        Benchmark("batch.evaluate_batch_alasan", "batch", lambda: evaluate_batch(big), len(big)),
+        Benchmark("batch.evaluate_compact", "batch", lambda: evaluate_compact(big), len(big)),
+        Benchmark("batch.evaluate_compact_tabel", "batch", lambda: evaluate_compact(big, compiled=True), len(big)),
+        Benchmark("laporan.render_report_text", "laporan", report_text, n),
+        Benchmark("laporan.iter_reports", "laporan", report_bulk, n),
+        Benchmark("sensitivitas.sweep", "sensitivitas", sensitivity_sweep, 100),
+        Benchmark("sensitivitas.heatmap_bb_dsm", "sensitivitas", whatif_heatmap, 1),
+        Benchmark("grafik.line_polar_build", "grafik", figure_build, 1),
+        Benchmark("grafik.line_polar_cached", "grafik", figure_cached, n),
+        Benchmark("app.page_run_awal", "app", app_first_run, 1, max_loops=1),
+        Benchmark("app.page_run_submit", "app", app_submit_run, 1, max_loops=1),
+    ]
+
+
+def _quiet_streamlit() -> None:
+    # Peringatan deprecation / ScriptRunContext dicetak setiap page run dan menenggelamkan hasil
+    from streamlit import logger
+
+    logger.set_log_level("error")
+
+
+def app_first_run() -> None:
+    """Page run penuh headless: sesi baru, render semua tab (setara membuka halaman)."""
+    from streamlit.testing.v1 import AppTest
+
+    _quiet_streamlit()
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def app_submit_run() -> None:
+    """Sesi baru + submit form analisis (rerun hasil, radar ASAM dan laporan)."""
+    from streamlit.testing.v1 import AppTest
+
+    _quiet_streamlit()
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    at.text_input[0].input("Budi")
+    at.button[0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def run_benchmark(bench: Benchmark, rounds: int, min_time: float) -> Dict[str, Any]:
+    bench.fn()  # pemanasan: import, cache figure, tabel keputusan
+    loops = 1
+    while bench.max_loops is None or loops < bench.max_loops:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            bench.fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            bench.fn()
+        samples.append((time.perf_counter() - t0) / (loops * bench.ops) * 1e6)
+    median = statistics.median(samples)
+    return {
+        "group": bench.group, "ops_per_call": bench.ops, "loops": loops, "rounds": rounds,
+        "min_us": round(min(samples), 4), "median_us": round(median, 4),
+        "mean_us": round(statistics.fmean(samples), 4),
+        "stdev_us": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "ops_per_sec": round(1e6 / median, 1),
+    }
+
+
+def machine_info() -> Dict[str, Any]:
+    import plotly
+    import streamlit
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+        "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "plotly": plotly.__version__,
+                     "streamlit": streamlit.__version__},
+        "rules_version": RuleSet.current().version,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float, stat: str = "min") -> int:
+    """Cetak rasio baru/lama (`stat`: min atau median) per benchmark; kembalikan jumlah regresi."""
+    regressions, key = 0, f"{stat}_us"
+    print(f"Perbandingan {old['machine'].get('commit') or '?'} -> {new['machine'].get('commit') or '?'}"
+          f" ({stat}, ambang {threshold:.0%}):")
+    for name, res in new["benchmarks"].items():
+        base = old["benchmarks"].get(name)
+        if base is None:
+            print(f"  {name:<42} {res[key]:>12.3f} us  (baru)")
+            continue
+        ratio = res[key] / base[key]
+        status = ""
+        if ratio > 1 + threshold:
+            status, regressions = "REGRESI", regressions + 1
+        elif ratio < 1 - threshold:
+            status = "lebih cepat"
+        print(f"  {name:<42} {base[key]:>12.3f} -> {res[key]:>12.3f} us  x{ratio:5.2f}  {status}")
+    if old["machine"].get("cpu_count") != new["machine"].get("cpu_count"):
+        print("  Catatan: jumlah CPU berbeda antar-run, rasio hanya indikatif.")
+    return regressions
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="Pilih benchmark (substring nama)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Durasi minimum satu putaran (detik)")
+    parser.add_argument("--output", help="Berkas JSON hasil (default benchmarks/results/suite-<waktu>.json)")
+    parser.add_argument("--compare", metavar="LAMA.json", help="Bandingkan hasil run ini dengan run sebelumnya")
+    parser.add_argument("--compare-only", nargs=2, metavar=("LAMA.json", "BARU.json"),
+                        help="Bandingkan dua berkas hasil tanpa menjalankan benchmark")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Toleransi regresi (0.25 = 25%%)")
+    parser.add_argument("--stat", choices=("min", "median"), default="min", help="Statistik untuk compare")
+    parser.add_argument("--list", action="store_true", help="Tampilkan nama benchmark lalu keluar")
+    args = parser.parse_args()
+
+    if args.compare_only:
+        old, new = (load(p) for p in args.compare_only)
+        return 1 if compare(old, new, args.threshold, args.stat) else 0
+
+    benches = [b for b in build_benchmarks() if not args.filters or any(f in b.name for f in args.filters)]
+    if args.list:
+        for b in benches:
+            print(f"{b.group:<8} {b.name}")
+        return 0
+
+    results: Dict[str, Any] = {"machine": machine_info(), "settings": {"rounds": args.rounds, "min_time": args.min_time,
+                                                                       "sample_size": SAMPLE_SIZE},
+                               "benchmarks": {}}
+    print(f"{len(benches)} benchmark, {args.rounds} putaran, {os.cpu_count()} CPU")
+    for bench in benches:
+        res = run_benchmark(bench, args.rounds, args.min_time)
+        results["benchmarks"][bench.name] = res
+        print(f"  {bench.name:<42} median {res['median_us']:>12.3f} us/op  "
+              f"(+/- {res['stdev_us']:.3f})  {res['ops_per_sec']:>12,.1f} op/s")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Hasil: {output}")
+
+    if args.compare:
+        return 1 if compare(load(args.compare), results, args.threshold, args.stat) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
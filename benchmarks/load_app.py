@@ -0,0 +1,192 @@
+"""
+Load test aplikasi Streamlit: N sesi asesor konkuren terhadap server `streamlit run` lokal.
+
+    python benchmarks/load_app.py --sessions 1 4 16 32
+    python benchmarks/load_app.py --sessions 8 --assessments 5 --think 2.0 --output hasil.json
+
+Untuk setiap N dijalankan server baru (headless, port acak, riwayat SQLite sementara)
+agar memori per sesi dapat diukur bersih. Setiap sesi adalah klien websocket seperti
+browser (lihat bench_fragments.Session) yang menjalankan skenario asesor:
+
+    load     : buka halaman (rerun penuh main(), sesi baru)
+    submit   : isi seluruh `tat_form` dengan kasus acak lalu klik ANALISIS SEKARANG
+               (rerun fragment input + rerun penuh dari st.rerun(scope="app"))
+    laporan  : buka tab Laporan dan edit Draft Laporan (rerun fragment laporan)
+
+Pindah tab Hasil/Laporan sendiri tidak memicu rerun (tab dirender di browser), jadi
+yang diukur adalah rerun yang benar-benar dikirim browser. submit + laporan diulang
+`--assessments` kali per sesi dengan jeda `--think` detik (acak 0.5x-1.5x; 0 = stres).
+
+Dilaporkan per N: persentil latensi per jenis rerun, throughput, CPU server (% satu
+core dan ms CPU per rerun) serta RSS server per sesi (selisih RSS saat semua sesi
+masih terhubung terhadap RSS setelah pemanasan, dibagi N). CPU/RSS dibaca dari /proc
+(Linux); di OS lain kolom tersebut bernilai null.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets  # noqa: E402
+
+from tat_core import ASAM_DIMENSIONS, GRAMATUR_LIMITS  # noqa: E402
+from bench_fragments import Session, WidgetState, _free_port, _process_cpu_seconds, start_server  # noqa: E402
+
+SUBMIT_LABEL = "🔍 ANALISIS SEKARANG"
+DSM_LABELS = (
+    "1. Pakai > rencana", "2. Gagal berhenti", "3. Waktu habis utk zat", "4. Craving/Sugesti",
+    "5. Gagal kewajiban", "6. Masalah sosial", "7. Melepas aktivitas", "8. Situasi bahaya",
+    "9. Masalah fisik", "10. Toleransi", "11. Withdrawal",
+)
+KINDS = ("load", "submit", "laporan")
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def random_form(session: Session, rng: random.Random, nomor: int) -> List[WidgetState]:
+    """WidgetState seluruh field tat_form untuk satu kasus acak (seperti yang dikirim browser saat submit)."""
+    ids = {label: wid for label, (wid, _) in session.widgets.items()}
+    states = [
+        WidgetState(id=ids["Nama Klien"], string_value=f"Klien {nomor}"),
+        WidgetState(id=ids["Usia"], double_value=rng.randint(16, 64)),
+        WidgetState(id=ids["Jenis Narkotika"], string_value=rng.choice(list(GRAMATUR_LIMITS))),
+        WidgetState(id=ids["Barang Bukti (Gram)"], double_value=round(rng.lognormvariate(-0.5, 1.0), 2)),
+        WidgetState(id=ids["Peran Tersangka"],
+                    string_value=rng.choices(["Pengguna", "Kurir", "Pengedar", "Bandar"], [80, 10, 7, 3])[0]),
+        WidgetState(id=ids["Status Residivis?"], bool_value=rng.random() < 0.15),
+        WidgetState(id=ids["Hasil Tes Urine POSITIF (+)?"], bool_value=rng.random() < 0.85),
+        WidgetState(id=ids["Risiko ASSIST"], string_value=rng.choice(["Low", "Moderate", "High"])),
+        WidgetState(id=ids[SUBMIT_LABEL], trigger_value=True),
+    ]
+    for label in DSM_LABELS:
+        states.append(WidgetState(id=ids[label], bool_value=rng.random() < 0.4))
+    for label in [lbl for lbl in ids if lbl.startswith(tuple(f"D{d}:" for d in ASAM_DIMENSIONS))]:
+        state = WidgetState(id=ids[label])
+        state.double_array_value.data[:] = [rng.choice([0, 0, 1, 1, 2, 3, 4])]
+        states.append(state)
+    cssrs = WidgetState(id=ids["Risiko Bunuh Diri (C-SSRS)"])
+    cssrs.double_array_value.data[:] = [rng.choice([0, 0, 0, 1, 2, 3, 4, 5])]
+    return states + [cssrs]
+
+
+async def _think(rng: random.Random, seconds: float) -> None:
+    if seconds > 0:
+        await asyncio.sleep(seconds * rng.uniform(0.5, 1.5))
+
+
+async def assessor(url: str, rng: random.Random, assessments: int, think: float,
+                   latencies: Dict[str, List[float]], work_done: asyncio.Barrier, release: asyncio.Event) -> int:
+    """Satu asesor; kembalikan jumlah rerun. Koneksi ditahan sampai `release` agar RSS terukur."""
+    reruns = 0
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws)
+        latencies["load"].append(await session.rerun())
+        reruns += 1
+        for k in range(assessments):
+            await _think(rng, think)
+            form_fragment = session.widgets[SUBMIT_LABEL][1]
+            latencies["submit"].append(await session.rerun(random_form(session, rng, k), fragment_id=form_fragment))
+            reruns += 1
+            await _think(rng, think)
+            draft_id, report_fragment = session.widgets["Draft Laporan"]
+            state = WidgetState(id=draft_id, string_value=f"catatan asesor {k}")
+            latencies["laporan"].append(await session.rerun([state], fragment_id=report_fragment))
+            reruns += 1
+        await work_done.wait()
+        await release.wait()
+    return reruns
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    lat = sorted(v * 1000.0 for v in values)
+    pick = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))], 1)  # noqa: E731
+    return {"n": len(lat), "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99), "max_ms": pick(1.0)}
+
+
+async def run_level(url: str, sessions: int, assessments: int, think: float, pid: int, seed: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {kind: [] for kind in KINDS}
+    work_done, release = asyncio.Barrier(sessions + 1), asyncio.Event()
+    rss0, cpu0, t0 = _rss_mb(pid), _process_cpu_seconds(pid), time.perf_counter()
+    tasks = [asyncio.create_task(assessor(url, random.Random(seed + i), assessments, think, latencies,
+                                          work_done, release))
+             for i in range(sessions)]
+    await work_done.wait()
+    wall = time.perf_counter() - t0
+    rss1, cpu1 = _rss_mb(pid), _process_cpu_seconds(pid)
+    release.set()
+    reruns = sum(await asyncio.gather(*tasks))
+
+    cpu = None if cpu0 is None or cpu1 is None else cpu1 - cpu0
+    return {
+        "sessions": sessions, "reruns": reruns, "wall_s": round(wall, 2),
+        "reruns_per_sec": round(reruns / wall, 1),
+        "latency": {kind: _percentiles(values) for kind, values in latencies.items()},
+        "server_cpu_pct": None if cpu is None else round(cpu / wall * 100.0, 1),
+        "server_cpu_ms_per_rerun": None if cpu is None else round(cpu * 1000.0 / reruns, 1),
+        "server_rss_mb": None if rss1 is None else round(rss1, 1),
+        "rss_mb_per_session": None if rss0 is None or rss1 is None else round((rss1 - rss0) / sessions, 2),
+    }
+
+
+async def warmup(url: str) -> None:
+    """Satu sesi lengkap agar import pandas/plotly, tabel keputusan dan koneksi riwayat sudah siap."""
+    barrier, release = asyncio.Barrier(1), asyncio.Event()
+    release.set()
+    await assessor(url, random.Random(0), 1, 0.0, {kind: [] for kind in KINDS}, barrier, release)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--assessments", type=int, default=3, help="Submit + edit laporan per sesi")
+    parser.add_argument("--think", type=float, default=0.0, help="Jeda rata-rata antar aksi (detik)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {"cpu_count": os.cpu_count(), "assessments": args.assessments, "think": args.think,
+                               "levels": []}
+    print(f"{os.cpu_count()} CPU, {args.assessments} asesmen per sesi, jeda {args.think} s")
+    for n in args.sessions:
+        port = _free_port()
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = start_server(port, os.path.join(tmp, "load.db"))
+            try:
+                url = f"ws://127.0.0.1:{port}/_stcore/stream"
+                asyncio.run(warmup(url))
+                level = asyncio.run(run_level(url, n, args.assessments, args.think, proc.pid, args.seed))
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+        results["levels"].append(level)
+        lat = level["latency"]
+        print(f"  {n:>3} sesi  {level['reruns_per_sec']:>6.1f} rerun/s  "
+              + "  ".join(f"{kind} p50 {lat[kind]['p50_ms']:>7.1f} p90 {lat[kind]['p90_ms']:>7.1f} "
+                          f"p99 {lat[kind]['p99_ms']:>7.1f} ms" for kind in KINDS)
+              + f"  CPU {level['server_cpu_pct']}% ({level['server_cpu_ms_per_rerun']} ms/rerun)"
+              f"  RSS {level['server_rss_mb']} MB ({level['rss_mb_per_session']} MB/sesi)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
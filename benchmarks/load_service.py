@@ -0,0 +1,117 @@
+"""
+Load generator untuk layanan asesmen lokal (tat_service).
+
+    python benchmarks/load_service.py --clients 64 --requests 200
+    python benchmarks/load_service.py --url http://127.0.0.1:8787 --clients 128 --output hasil.json
+
+Tanpa --url, layanan dijalankan in-process pada port acak. Setiap klien memakai
+satu koneksi keep-alive dan mengirim permintaan POST /assess satu kasus secara
+berurutan; latensi diukur di sisi klien, lalu /metrics layanan ikut dilaporkan.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel import synthetic_cases  # noqa: E402
+from tat_service import AssessmentService  # noqa: E402
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                   method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    length = next(int(h.split(":", 1)[1]) for h in head if h.lower().startswith("content-length:"))
+    return int(head[0].split(" ")[1]), json.loads(await reader.readexactly(length))
+
+
+async def _client(host: str, port: int, cases: List[Dict[str, Any]], latencies: List[float]) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        for case in cases:
+            t0 = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", "/assess", case)
+            latencies.append(time.perf_counter() - t0)
+            errors += status != 200
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_load(host: str, port: int, clients: int, per_client: int) -> Dict[str, Any]:
+    df = synthetic_cases(clients * per_client, seed=7)
+    records = json.loads(df.to_json(orient="records"))
+    latencies: List[float] = []
+    t0 = time.perf_counter()
+    errors = await asyncio.gather(*[
+        _client(host, port, records[i * per_client:(i + 1) * per_client], latencies) for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - t0
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_metrics = await _request(reader, writer, host, "GET", "/metrics")
+    writer.close()
+
+    lat = sorted(x * 1000.0 for x in latencies)
+    pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))], 3)  # noqa: E731
+    return {
+        "clients": clients,
+        "requests": len(lat),
+        "errors": sum(errors),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(lat) / elapsed, 1),
+        "client_latency_ms": {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99), "max": pct(1.0)},
+        "server": server_metrics,
+    }
+
+
+async def _main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.url:
+        url = urlparse(args.url)
+        return await run_load(url.hostname, url.port or 80, args.clients, args.requests)
+    service = AssessmentService(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    await service.start("127.0.0.1", 0)
+    try:
+        port = service.server.sockets[0].getsockname()[1]
+        return await run_load("127.0.0.1", port, args.clients, args.requests)
+    finally:
+        await service.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Layanan yang sudah berjalan (default: jalankan in-process)")
+    parser.add_argument("--clients", type=int, default=64, help="Jumlah klien konkuren")
+    parser.add_argument("--requests", type=int, default=200, help="Permintaan per klien")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(_main_async(args))
+    lat, srv = result["client_latency_ms"], result["server"]
+    print(f"{result['requests']:,} permintaan, {result['clients']} klien, {result['errors']} error")
+    print(f"  throughput : {result['requests_per_sec']:,.0f} permintaan/detik")
+    print(f"  latensi    : p50 {lat['p50']} ms  p90 {lat['p90']} ms  p99 {lat['p99']} ms  max {lat['max']} ms")
+    print(f"  micro-batch: {srv['micro_batches_total']:,} batch, rata-rata {srv['micro_batch_avg_size']} kasus")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+=================================================================================
+TAT DSS - BATCH MODE (VECTORIZED)
+=================================================================================
+Evaluasi TATLogicEngine untuk banyak kasus sekaligus memakai mask kolom NumPy/pandas.
+Hasil identik dengan TATLogicEngine.determine_recommendation (diuji di tests/test_batch_parity.py).
+=================================================================================
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tat_core import ASAM_DIMENSIONS, RULE_THRESHOLDS
+from tat_results import (
+    ASSIST_LEVELS, FLAG_D5, FLAG_D6, FLAG_OVER_LIMIT, LEGAL_FLAG_BITS, LEGAL_OUTCOMES, OUTCOME_FIELDS,
+    OUTCOME_ORDER, PERAN_LEVELS, SEVERITY_LEVELS, CompactResult, alasan_text,
+)
+
+BATCH_COLUMNS = (
+    "asam_d1", "asam_d2", "asam_d3", "asam_d4", "asam_d5", "asam_d6",
+    "dsm5_count", "suicide_risk_level", "assist_risk",
+    "bb_amount", "bb_limit", "peran", "is_residivis", "is_urine_positive", "status_tangkap"
+)
+
+def encode_columns(cases: Any) -> Dict[str, Any]:
+    """Normalisasi input batch (DataFrame / dict of arrays) menjadi array NumPy numerik per kolom.
+
+    Kolom teks dikodekan: assist_risk -> assist_code (indeks ASSIST_LEVELS), peran -> peran_code
+    (indeks PERAN_LEVELS); nilai di luar daftar menjadi -1. status_tangkap tidak memengaruhi hasil
+    akhir sehingga tidak dibawa. Semua kolom berupa buffer NumPy kontigu (siap shared memory).
+    """
+    missing = [c for c in BATCH_COLUMNS if c not in cases]
+    if missing:
+        raise KeyError(f"Kolom batch tidak lengkap: {', '.join(missing)}")
+    cols = {}
+    for c in BATCH_COLUMNS:
+        if c.startswith("asam_d") or c in ("dsm5_count", "suicide_risk_level"):
+            cols[c] = np.ascontiguousarray(cases[c], dtype=np.int64)
+        elif c in ("bb_amount", "bb_limit"):
+            cols[c] = np.ascontiguousarray(cases[c], dtype=np.float64)
+        elif c.startswith("is_"):
+            cols[c] = np.ascontiguousarray(cases[c], dtype=bool)
+    cols["assist_code"] = _encode_labels(cases["assist_risk"], ASSIST_LEVELS)
+    cols["peran_code"] = _encode_labels(cases["peran"], PERAN_LEVELS)
+    return cols
+
+
+def _encode_labels(values: Any, levels: tuple) -> np.ndarray:
+    if isinstance(values, (list, tuple)):
+        # List Python (mis. micro-batch tat_service): lookup dict, tanpa overhead tetap pd.Series (~0.4 ms/kolom)
+        index = {label: k for k, label in enumerate(levels)}
+        return np.fromiter((index.get(v, -1) for v in values), dtype=np.int8, count=len(values))
+    # Perbandingan per level tetap berjalan di backend string pandas (tanpa konversi ke object)
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes = np.full(len(values), -1, dtype=np.int8)
+    for k, label in enumerate(levels):
+        codes[(values == label).to_numpy(dtype=bool, na_value=False)] = k
+    return codes
+
+
+def _categorical(codes: np.ndarray, labels: List[str]) -> pd.Categorical:
+    """Petakan kode kategori (0..k-1) ke label; label duplikat digabung menjadi satu kategori."""
+    categories = list(dict.fromkeys(labels))
+    remap = np.array([categories.index(lbl) for lbl in labels], dtype=np.int8)
+    return pd.Categorical.from_codes(remap[codes], categories=categories)
+
+
+def evaluate_codes(cols: Dict[str, np.ndarray], thresholds: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """Inti vectorized: kembalikan kode hasil per baris tanpa membangun string apa pun.
+
+    - outcome: indeks OUTCOME_ORDER (int8)
+    - severity: indeks SEVERITY_LEVELS (int8)
+    - reason_bits: kombinasi FLAG_* (uint8)
+
+    `thresholds` default RULE_THRESHOLDS (tat_core).
+    """
+    t = RULE_THRESHOLDS if thresholds is None else thresholds
+    dsm, assist, peran = cols["dsm5_count"], cols["assist_code"], cols["peran_code"]
+    bb, limit = cols["bb_amount"], cols["bb_limit"]
+    urine_pos, residivis = cols["is_urine_positive"], cols["is_residivis"]
+
+    # Derajat Ketergantungan (get_addiction_severity)
+    berat = (dsm >= t["dsm_berat"]) | (assist == 2)
+    sedang = ~berat & ((dsm >= t["dsm_sedang"]) | (assist == 1))
+
+    # 1. Kedaruratan medis
+    darurat = ((cols["suicide_risk_level"] >= t["cssrs_darurat"])
+               | (cols["asam_d1"] >= t["asam_darurat"]) | (cols["asam_d2"] >= t["asam_darurat"]))
+
+    # 2. Filter hukum (check_legal_red_flags)
+    over_limit = (limit > 0) & (bb > limit)
+    sindikat = (bb > limit * t["kelipatan_sindikat"]) & (limit > 0)
+    peran_flag = peran >= 1  # Kurir / Pengedar / Bandar
+    urine_neg = ~urine_pos
+    ada_flag = over_limit | sindikat | peran_flag | urine_neg | residivis
+    hukum_jalur = ~darurat & ada_flag
+    dual_track = hukum_jalur & berat & urine_pos & (peran == 0) & (bb > limit)
+    pidana = hukum_jalur & ~dual_track
+
+    # 3. Level rehabilitasi
+    d5_tinggi, d6_tinggi = cols["asam_d5"] >= t["asam_rawat_inap"], cols["asam_d6"] >= t["asam_rawat_inap"]
+    rehab = ~darurat & ~ada_flag
+    rawat_inap = rehab & (berat | d5_tinggi | d6_tinggi)
+    rawat_jalan = rehab & ~rawat_inap
+
+    # OR aritmetika (bool -> uint8 x bit) jauh lebih murah daripada `bits[mask] |= bit` (fancy indexing)
+    bits = np.zeros(len(dsm), dtype=np.uint8)
+    for mask, bit in zip((over_limit, sindikat, peran_flag, urine_neg, residivis, d5_tinggi, d6_tinggi),
+                         LEGAL_FLAG_BITS + (FLAG_D5, FLAG_D6)):
+        bits |= mask.view(np.uint8) * np.uint8(bit)
+    # Kelima mask saling lepas dan mencakup semua baris: assignment bermask menggantikan np.select
+    outcome = np.full(len(dsm), -1, dtype=np.int8)
+    for k, mask in enumerate((darurat, dual_track, pidana, rawat_inap, rawat_jalan)):
+        outcome[mask] = k
+    return {
+        "outcome": outcome,
+        "severity": (berat.astype(np.int8) * 2 + sedang.astype(np.int8)),
+        "reason_bits": bits,
+    }
+
+
+def assemble_results(codes: Dict[str, np.ndarray], index: Any = None, alasan: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Bangun DataFrame hasil (kolom Categorical + alasan opsional) dari kode evaluate_codes."""
+    kode, severity = codes["outcome"], codes["severity"]
+    # Kolom hasil sebagai Categorical (kode int8) agar murah untuk jutaan baris
+    out = pd.DataFrame({
+        field: _categorical(kode, [OUTCOME_FIELDS[k][field] for k in OUTCOME_ORDER])
+        for field in ("rekomendasi", "tipe", "status_warna", "urgency")
+    }, index=index)
+    out["derajat_ketergantungan"] = _categorical(severity, list(SEVERITY_LEVELS))
+    if alasan is not None:
+        out.insert(2, "alasan", alasan)
+    return out
+
+
+def render_alasan(
+    codes: Dict[str, np.ndarray], cols: Dict[str, np.ndarray], thresholds: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """Render daftar alasan per baris (object array of list[str]) dari kode + kolom bb/limit/peran."""
+    kelipatan = (RULE_THRESHOLDS if thresholds is None else thresholds)["kelipatan_sindikat"]
+    alasan = np.empty(len(codes["outcome"]), dtype=object)
+    rows = zip(
+        codes["outcome"].tolist(), codes["severity"].tolist(), codes["reason_bits"].tolist(),
+        cols["bb_amount"].tolist(), cols["bb_limit"].tolist(), cols["peran_code"].tolist(),
+    )
+    # Teks hanya bergantung pada bb/limit bila flag BB-lebih aktif; kombinasi lain di-memo
+    memo: Dict[tuple, tuple] = {}
+    for i, (k, sev, bits, bb, limit, peran) in enumerate(rows):
+        if bits & FLAG_OVER_LIMIT and k in LEGAL_OUTCOMES:
+            alasan[i] = alasan_text(k, sev, bits, bb, limit, peran, kelipatan)
+            continue
+        key = (k, sev, bits, peran)
+        hit = memo.get(key)
+        if hit is None:
+            hit = memo[key] = tuple(alasan_text(k, sev, bits, bb, limit, peran, kelipatan))
+        alasan[i] = list(hit)
+    return alasan
+
+
+def evaluate_batch(cases: Any, with_alasan: bool = True) -> pd.DataFrame:
+    """Implementasi TATLogicEngine.determine_recommendation_batch."""
+    cols = encode_columns(cases)
+    codes = evaluate_codes(cols)
+    index = cases.index if isinstance(cases, pd.DataFrame) else None
+    return assemble_results(codes, index=index, alasan=render_alasan(codes, cols) if with_alasan else None)
+
+
+# Rekaman terstruktur hasil terkode: 20 byte per kasus, teks alasan dirender saat dibutuhkan
+RESULT_DTYPE = np.dtype([
+    ("outcome", "i1"), ("severity", "i1"), ("reason_bits", "u1"), ("peran_code", "i1"),
+    ("bb_amount", "f8"), ("bb_limit", "f8"),
+])
+
+
+def compact_records(codes: Dict[str, np.ndarray], cols: Dict[str, np.ndarray]) -> np.ndarray:
+    """Gabungkan kode evaluate_codes + kolom bb/limit/peran menjadi array RESULT_DTYPE."""
+    rec = np.empty(len(codes["outcome"]), dtype=RESULT_DTYPE)
+    for name in ("outcome", "severity", "reason_bits"):
+        rec[name] = codes[name]
+    rec["peran_code"] = cols["peran_code"]
+    rec["bb_amount"] = cols["bb_amount"]
+    rec["bb_limit"] = cols["bb_limit"]
+    return rec
+
+
+def evaluate_compact(cases: Any, compiled: bool = False) -> np.ndarray:
+    """Evaluasi batch langsung ke rekaman terkode tanpa membangun string apa pun."""
+    cols = encode_columns(cases)
+    if compiled:
+        from tat_table import get_decision_table
+        codes = get_decision_table().lookup_codes(cols)
+    else:
+        codes = evaluate_codes(cols)
+    return compact_records(codes, cols)
+
+
+def record_result(rec: np.void, thresholds: Optional[Dict[str, float]] = None) -> CompactResult:
+    """Satu baris RESULT_DTYPE -> CompactResult (untuk render alasan on-demand).
+
+    `thresholds` = aturan yang dipakai saat rekaman dievaluasi (default RULE_THRESHOLDS saat ini).
+    """
+    t = RULE_THRESHOLDS if thresholds is None else thresholds
+    return CompactResult(int(rec["outcome"]), int(rec["severity"]), int(rec["reason_bits"]),
+                         int(rec["peran_code"]), float(rec["bb_amount"]), float(rec["bb_limit"]),
+                         t["kelipatan_sindikat"])
+
+
+def case_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Ubah satu baris kolom batch menjadi argumen keyword determine_recommendation."""
+    return {
+        "asam_scores": {d: int(row[f"asam_d{d}"]) for d in ASAM_DIMENSIONS},
+        "dsm5_count": int(row["dsm5_count"]),
+        "suicide_risk_level": int(row["suicide_risk_level"]),
+        "assist_risk": row["assist_risk"],
+        "bb_amount": float(row["bb_amount"]),
+        "bb_limit": float(row["bb_limit"]),
+        "peran": row["peran"],
+        "is_residivis": bool(row["is_residivis"]),
+        "is_urine_positive": bool(row["is_urine_positive"]),
+        "status_tangkap": row["status_tangkap"],
+    }
@@ -0,0 +1,396 @@
+"""
+=================================================================================
+TAT DSS - COMMAND LINE (BULK RE-SCREENING)
+=================================================================================
+Entry point baris perintah di samping `main()` Streamlit. Membaca berkas kasus
+(CSV, JSON Lines, Parquet) per chunk berukuran tetap, menjalankan Logic Engine
+versi batch dan menulis rekomendasi + alasan secara bertahap, sehingga memori
+tetap datar berapa pun jumlah barisnya.
+
+    python tat_cli.py screen kasus.csv -o hasil.csv --chunk-size 50000
+    python tat_cli.py screen kasus.parquet -o hasil.jsonl --checkpoint hasil.ckpt --resume
+    python tat_cli.py screen kasus.csv -o hasil.csv --store tat_cases.db
+    python tat_cli.py reevaluate --store tat_cases.db --limit Heroin=2.0 --dry-run --report flip.csv
+    python tat_cli.py reevaluate --store tat_cases.db
+    python tat_cli.py reports kasus.csv -o laporan.zip
+    python tat_cli.py reports --store tat_cases.db --start 2025-12-01 --end 2025-12-31 -o laporan.zip
+    python tat_cli.py export --store tat_cases.db --start 2025-12-01 -o analitik/
+    python tat_cli.py export kasus.csv -o analitik/ --to arrow --tanggal 2025-12-01
+
+Kolom input mengikuti tat_batch.BATCH_COLUMNS; `bb_limit` boleh diganti kolom
+`jenis_narkotika` (dipetakan lewat GRAMATUR_LIMITS).
+=================================================================================
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, TextIO
+
+import pandas as pd
+
+from tat_core import GRAMATUR_LIMITS
+from tat_batch import BATCH_COLUMNS
+from tat_export import EXPORT_FORMATS, write_analytics
+from tat_parallel import ParallelEvaluator
+from tat_reports import write_report_zip
+from tat_rules import RuleSet, reevaluate
+from tat_store import CaseStore
+
+INPUT_FORMATS = ("csv", "jsonl", "parquet")
+OUTPUT_COLUMNS = ("row", "rekomendasi", "tipe", "status_warna", "urgency", "derajat_ketergantungan", "alasan")
+
+# =============================================================================
+# 1. CHUNKED READERS
+# =============================================================================
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    fmt = {"ndjson": "jsonl", "json": "jsonl", "pq": "parquet"}.get(ext, ext)
+    if fmt not in INPUT_FORMATS:
+        raise ValueError(f"Format berkas tidak dikenali: {path} (gunakan --format)")
+    return fmt
+
+
+def iter_chunks(path: str, fmt: str, chunk_size: int, start_row: int = 0) -> Iterator[pd.DataFrame]:
+    """Baca berkas kasus per chunk mulai dari baris data ke-`start_row` (0-based).
+
+    Index setiap chunk adalah nomor baris global di berkas input.
+    """
+    if fmt == "csv":
+        reader = _iter_csv(path, chunk_size, start_row)
+    elif fmt == "jsonl":
+        reader = _iter_jsonl(path, chunk_size, start_row)
+    elif fmt == "parquet":
+        reader = _iter_parquet(path, chunk_size, start_row)
+    else:
+        raise ValueError(f"Format tidak didukung: {fmt}")
+
+    offset = start_row
+    for chunk in reader:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def _iter_csv(path: str, chunk_size: int, start_row: int) -> Iterator[pd.DataFrame]:
+    if start_row == 0:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+    # start_row menghitung baris data seperti pandas (baris kosong dilewati, newline di
+    # dalam kutip tetap satu baris), bukan baris fisik berkas
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        names = next(csv.reader([fh.readline()]), None)
+        if names is None:
+            return
+        skipped, quoted = 0, False
+        for line in fh:
+            if not quoted and not line.strip():
+                continue
+            # Jumlah kutip ganjil membuka/menutup field berkutip yang berlanjut ke baris berikutnya
+            if line.count('"') % 2:
+                quoted = not quoted
+            if not quoted:
+                skipped += 1
+                if skipped == start_row:
+                    break
+        else:
+            return
+        yield from pd.read_csv(fh, chunksize=chunk_size, header=None, names=names)
+
+
+def _iter_jsonl(path: str, chunk_size: int, start_row: int) -> Iterator[pd.DataFrame]:
+    with open(path, encoding="utf-8") as fh:
+        # Baris kosong tidak dihitung sebagai baris data, juga saat melewati start_row
+        lines = itertools.islice((line for line in fh if line.strip()), start_row, None)
+        while True:
+            block = list(itertools.islice(lines, chunk_size))
+            if not block:
+                return
+            yield pd.DataFrame.from_records([json.loads(line) for line in block])
+
+
+def _iter_parquet(path: str, chunk_size: int, start_row: int) -> Iterator[pd.DataFrame]:
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    # Lewati row group yang seluruhnya berada sebelum start_row tanpa membacanya
+    row_groups, skip = [], start_row
+    for rg in range(pf.num_row_groups):
+        n = pf.metadata.row_group(rg).num_rows
+        if skip >= n and not row_groups:
+            skip -= n
+            continue
+        row_groups.append(rg)
+    for batch in pf.iter_batches(batch_size=chunk_size, row_groups=row_groups):
+        if skip:
+            drop = min(skip, batch.num_rows)
+            batch, skip = batch.slice(drop), skip - drop
+            if batch.num_rows == 0:
+                continue
+        yield batch.to_pandas()
+
+
+def prepare_cases(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Lengkapi kolom turunan (bb_limit dari jenis_narkotika) dan validasi kolom wajib."""
+    if "bb_limit" not in chunk and "jenis_narkotika" in chunk:
+        limits = chunk["jenis_narkotika"].map(GRAMATUR_LIMITS)
+        if limits.isna().any():
+            unknown = sorted(set(chunk.loc[limits.isna(), "jenis_narkotika"].astype(str)))
+            raise ValueError(f"jenis_narkotika tidak dikenal: {', '.join(unknown)}")
+        chunk = chunk.assign(bb_limit=limits)
+    missing = [c for c in BATCH_COLUMNS if c not in chunk]
+    if missing:
+        raise ValueError(f"Kolom input tidak lengkap: {', '.join(missing)}")
+    return chunk
+
+# =============================================================================
+# 2. STREAMING WRITER
+# =============================================================================
+
+def write_results(out: TextIO, results: pd.DataFrame, fmt: str, header: bool) -> None:
+    results = results.reset_index(names="row")[list(OUTPUT_COLUMNS)]
+    if fmt == "jsonl":
+        for rec in results.to_dict("records"):
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    else:
+        results = results.assign(alasan=results["alasan"].map(" | ".join))
+        results.to_csv(out, index=False, header=header)
+
+
+def read_checkpoint(path: Optional[str]) -> Dict[str, int]:
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    return {"next_row": 0, "output_bytes": 0}
+
+
+def write_checkpoint(path: str, next_row: int, output_bytes: int) -> None:
+    # Tulis atomik agar checkpoint tidak korup saat proses mati di tengah jalan
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"next_row": next_row, "output_bytes": output_bytes}, fh)
+    os.replace(tmp, path)
+
+
+def screen_file(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 50_000,
+    start_row: int = 0,
+    input_format: Optional[str] = None,
+    checkpoint: Optional[str] = None,
+    truncate_to: Optional[int] = None,
+    workers: int = 1,
+    store: Optional[CaseStore] = None,
+    log: Optional[TextIO] = sys.stderr,
+) -> int:
+    """Proses seluruh berkas secara streaming; kembalikan jumlah baris yang diproses.
+
+    Saat melanjutkan (start_row > 0) hasil ditambahkan ke output yang ada; `truncate_to`
+    memotong output ke ukuran yang tercatat di checkpoint agar chunk yang sempat
+    tertulis sebagian sebelum crash tidak terduplikasi. `workers` > 1 membagi setiap
+    chunk ke process pool (tat_parallel); chunk kecil tetap dievaluasi in-process.
+    Bila `store` diberikan, setiap chunk juga disimpan ke riwayat kasus (tat_store)
+    sebelum checkpoint ditulis.
+    """
+    in_fmt = input_format or detect_format(input_path)
+    out_fmt = "jsonl" if output_path.endswith((".jsonl", ".ndjson")) else "csv"
+    append = start_row > 0 and os.path.exists(output_path)
+    if append and truncate_to is not None:
+        os.truncate(output_path, truncate_to)
+
+    done, t0 = 0, time.perf_counter()
+    with ParallelEvaluator(workers=workers) as evaluator, \
+            open(output_path, "a" if append else "w", encoding="utf-8", newline="") as out:
+        for chunk in iter_chunks(input_path, in_fmt, chunk_size, start_row):
+            cases = prepare_cases(chunk)
+            results = evaluator.evaluate(cases)
+            write_results(out, results, out_fmt, header=not append and done == 0)
+            out.flush()
+            if store is not None:
+                # Disimpan sebelum checkpoint: bila proses mati di antaranya, chunk ini
+                # tersimpan ulang saat --resume (at-least-once)
+                store.insert_batch(cases)
+            done += len(chunk)
+            next_row = start_row + done
+            if checkpoint:
+                write_checkpoint(checkpoint, next_row, out.tell())
+            if log:
+                elapsed = time.perf_counter() - t0
+                log.write(f"[tat] {done:,} baris ({done / elapsed:,.0f} baris/detik) - next_row={next_row}\n")
+                log.flush()
+    return done
+
+# =============================================================================
+# 3. ENTRY POINT
+# =============================================================================
+
+def _iter_store_range(store: CaseStore, start: Optional[str], end: Optional[str],
+                      chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Blok riwayat tat_store dengan tanggal dalam [start, end]; batas kosong = tanpa batas."""
+    bounds = [("tanggal >= ?", start), ("tanggal <= ?", end)]
+    where = " AND ".join(clause for clause, value in bounds if value) or "1"
+    return store.iter_cases(where, [value for _, value in bounds if value], chunk_size)
+
+
+def _parse_assignments(items: List[str], what: str) -> Dict[str, float]:
+    parsed = {}
+    for item in items:
+        name, sep, value = item.rpartition("=")
+        if not sep or not name:
+            raise SystemExit(f"{what} harus berbentuk NAMA=NILAI: {item}")
+        try:
+            parsed[name] = float(value)
+        except ValueError:
+            raise SystemExit(f"Nilai {what} bukan angka: {item}")
+    return parsed
+
+
+def write_flip_report(path: str, flips: List[Dict]) -> None:
+    """Daftar keputusan yang berubah (CSV atau JSONL sesuai ekstensi)."""
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        if path.endswith((".jsonl", ".ndjson")):
+            for flip in flips:
+                out.write(json.dumps(flip, ensure_ascii=False) + "\n")
+        else:
+            pd.DataFrame(flips, columns=["id", "tanggal", "jenis_narkotika", "peran", "versi_lama", "versi_baru",
+                                         "dari", "menjadi"]).to_csv(out, index=False)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="tat_cli", description="TAT DSS - pemrosesan kasus massal")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    screen = sub.add_parser("screen", help="Skrining ulang berkas kasus (CSV/JSONL/Parquet)")
+    screen.add_argument("input", help="Berkas kasus input")
+    screen.add_argument("-o", "--output", required=True, help="Berkas hasil (.csv atau .jsonl)")
+    screen.add_argument("--format", choices=INPUT_FORMATS, help="Paksa format input")
+    screen.add_argument("--chunk-size", type=int, default=50_000, help="Jumlah baris per chunk")
+    screen.add_argument("--start-row", type=int, default=0, help="Lanjutkan dari baris data ke-N (0-based)")
+    screen.add_argument("--checkpoint", help="Berkas checkpoint next_row (ditulis setiap chunk)")
+    screen.add_argument("--resume", action="store_true", help="Mulai dari next_row pada --checkpoint")
+    screen.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses paralel (efektif untuk chunk >= 200.000 baris)")
+    screen.add_argument("--store", help="Simpan hasil ke riwayat kasus SQLite (mis. tat_cases.db)")
+    screen.add_argument("-q", "--quiet", action="store_true", help="Tanpa laporan progres")
+
+    reeval = sub.add_parser("reevaluate", help="Evaluasi ulang riwayat kasus yang terdampak perubahan aturan")
+    reeval.add_argument("--store", required=True, help="Riwayat kasus SQLite (tat_store)")
+    reeval.add_argument("--set", dest="thresholds", action="append", default=[], metavar="AMBANG=NILAI",
+                        help="Simulasikan RULE_THRESHOLDS lain, mis. kelipatan_sindikat=10 (boleh berulang; "
+                             "wajib --dry-run)")
+    reeval.add_argument("--limit", dest="limits", action="append", default=[], metavar="ZAT=GRAM",
+                        help="Simulasikan GRAMATUR_LIMITS lain, mis. Heroin=2.0 (boleh berulang; wajib --dry-run)")
+    reeval.add_argument("--full", action="store_true", help="Evaluasi ulang semua baris (tanpa predikat diff)")
+    reeval.add_argument("--dry-run", action="store_true", help="Hanya laporan; store tidak diubah")
+    reeval.add_argument("--report", help="Tulis daftar flip rekomendasi (.csv atau .jsonl)")
+
+    reports = sub.add_parser("reports", help="Laporan Hasil Asesmen Terpadu massal dalam satu ZIP")
+    reports.add_argument("input", nargs="?", help="Berkas kasus input (dievaluasi dengan aturan aktif)")
+    reports.add_argument("--store", help="Ambil kasus dari riwayat SQLite (keputusan tersimpan)")
+    reports.add_argument("--start", help="Riwayat: tanggal awal (YYYY-MM-DD)")
+    reports.add_argument("--end", help="Riwayat: tanggal akhir (YYYY-MM-DD)")
+    reports.add_argument("-o", "--output", required=True, help="Berkas ZIP, atau - untuk stdout")
+    reports.add_argument("--format", choices=INPUT_FORMATS, help="Paksa format input")
+    reports.add_argument("--chunk-size", type=int, default=5_000, help="Jumlah kasus per chunk")
+
+    export = sub.add_parser("export", help="Ekspor analitik kolumnar (Parquet/Arrow) berpartisi per tanggal")
+    export.add_argument("input", nargs="?", help="Berkas kasus input (dievaluasi dengan aturan aktif)")
+    export.add_argument("--store", help="Ambil kasus dari riwayat SQLite (keputusan tersimpan)")
+    export.add_argument("--start", help="Riwayat: tanggal awal (YYYY-MM-DD)")
+    export.add_argument("--end", help="Riwayat: tanggal akhir (YYYY-MM-DD)")
+    export.add_argument("-o", "--output", required=True,
+                        help="Direktori dataset (partisi ditambahkan) atau satu berkas .parquet/.arrow")
+    export.add_argument("--to", choices=EXPORT_FORMATS, help="Format ekspor (default dari ekstensi, lalu parquet)")
+    export.add_argument("--tanggal", help="Tanggal (YYYY-MM-DD) untuk input tanpa kolom tanggal; default hari ini")
+    export.add_argument("--format", choices=INPUT_FORMATS, help="Paksa format input")
+    export.add_argument("--chunk-size", type=int, default=200_000, help="Jumlah kasus per chunk")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "screen":
+        start_row, truncate_to = args.start_row, None
+        if args.resume:
+            if not args.checkpoint:
+                raise SystemExit("--resume membutuhkan --checkpoint")
+            state = read_checkpoint(args.checkpoint)
+            start_row, truncate_to = state["next_row"], state["output_bytes"]
+        t0 = time.perf_counter()
+        store = CaseStore(args.store) if args.store else None
+        try:
+            total = screen_file(
+                args.input, args.output, chunk_size=args.chunk_size, start_row=start_row,
+                input_format=args.format, checkpoint=args.checkpoint, truncate_to=truncate_to,
+                workers=args.workers, store=store,
+                log=None if args.quiet else sys.stderr,
+            )
+        finally:
+            if store is not None:
+                store.close()
+        elapsed = time.perf_counter() - t0
+        print(f"Selesai: {total:,} baris dalam {elapsed:.1f} detik ({total / max(elapsed, 1e-9):,.0f} baris/detik)")
+
+    elif args.command == "reevaluate":
+        try:
+            rules = RuleSet.current().with_changes(
+                _parse_assignments(args.thresholds, "--set"), _parse_assignments(args.limits, "--limit"))
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        with CaseStore(args.store) as store:
+            try:
+                report = reevaluate(store, rules, full=args.full, dry_run=args.dry_run)
+            except ValueError as exc:
+                raise SystemExit(f"{exc} (--set/--limit hanya untuk --dry-run)")
+        if args.report:
+            write_flip_report(args.report, report.flips)
+        summary = report.to_dict()
+        print(f"Aturan {summary['new_version']}: {summary['candidates']:,} kandidat dari {summary['total_rows']:,} "
+              f"baris, {summary['changed']:,} berubah, {summary['flips']:,} flip rekomendasi "
+              f"({summary['seconds']:.2f} detik{', dry-run' if args.dry_run else ''})")
+        for item in summary["flip_summary"]:
+            print(f"  {item['dari']} -> {item['menjadi']}: {item['jumlah']:,}")
+
+    elif args.command == "reports":
+        if bool(args.input) == bool(args.store):
+            raise SystemExit("Gunakan tepat satu sumber: berkas input atau --store")
+        t0 = time.perf_counter()
+        target = sys.stdout.buffer if args.output == "-" else args.output
+        if args.store:
+            with CaseStore(args.store) as store:
+                frames = _iter_store_range(store, args.start, args.end, args.chunk_size)
+                total = write_report_zip(target, frames, stored_codes=True, rules=store.get_rules)
+        else:
+            fmt = args.format or detect_format(args.input)
+            frames = (prepare_cases(chunk) for chunk in iter_chunks(args.input, fmt, args.chunk_size))
+            total = write_report_zip(target, frames)
+        elapsed = time.perf_counter() - t0
+        print(f"Selesai: {total:,} laporan dalam {elapsed:.1f} detik ({total / max(elapsed, 1e-9):,.0f} laporan/detik)",
+              file=sys.stderr if args.output == "-" else sys.stdout)
+
+    elif args.command == "export":
+        if bool(args.input) == bool(args.store):
+            raise SystemExit("Gunakan tepat satu sumber: berkas input atau --store")
+        t0 = time.perf_counter()
+        if args.store:
+            with CaseStore(args.store) as store:
+                frames = _iter_store_range(store, args.start, args.end, args.chunk_size)
+                total = write_analytics(args.output, frames, stored_codes=True, fmt=args.to)
+        else:
+            fmt = args.format or detect_format(args.input)
+            frames = (prepare_cases(chunk) for chunk in iter_chunks(args.input, fmt, args.chunk_size))
+            total = write_analytics(args.output, frames, fmt=args.to, tanggal=args.tanggal)
+        elapsed = time.perf_counter() - t0
+        print(f"Selesai: {total:,} baris dalam {elapsed:.1f} detik ({total / max(elapsed, 1e-9):,.0f} baris/detik)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+=================================================================================
+TAT DSS - CORE (HEADLESS)
+=================================================================================
+Konstanta regulasi dan Logic Engine tanpa dependensi UI (Streamlit/Plotly/pandas).
+Aman diimpor oleh batch worker, CLI maupun service:
+
+    from tat_core import TATLogicEngine, GRAMATUR_LIMITS, ASAM_DIMENSIONS
+=================================================================================
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Any
+
+if TYPE_CHECKING:  # hanya untuk anotasi; import headless tetap tanpa pandas
+    import pandas as pd
+
+    from tat_results import CompactResult
+
+# =============================================================================
+# 1. KONFIGURASI & KONSTANTA DATA
+# =============================================================================
+
+# SEMA No. 4 Tahun 2010 Limits (Gram) - VERIFIED
+GRAMATUR_LIMITS = {
+    "Ganja/Cannabis": 5.0,
+    "Metamfetamin/Sabu": 1.0,
+    "Heroin": 1.8,
+    "Kokain": 1.8,
+    "Ekstasi/MDMA": 2.4, # Atau 8 butir
+    "Morfin": 1.8,
+    "Kodein": 72.0,
+    "Lainnya": 0.0 # Requires Manual Review
+}
+
+# Mapping Dimensi ASAM (Standard BNN/Intl)
+ASAM_DIMENSIONS = {
+    1: "Intoksikasi Akut/Withdrawal",
+    2: "Kondisi Biomedis",
+    3: "Emosional/Perilaku/Kognitif",
+    4: "Kesiapan Berubah",
+    5: "Potensi Relapse",
+    6: "Lingkungan Pemulihan"
+}
+
+# Ambang Aturan Klinis & Hukum (dipakai jalur skalar, batch dan tabel terkompilasi)
+RULE_THRESHOLDS = {
+    "dsm_berat": 6,           # DSM-5 >= 6 kriteria -> BERAT
+    "dsm_sedang": 4,          # DSM-5 >= 4 kriteria -> SEDANG
+    "cssrs_darurat": 4,       # C-SSRS >= 4 -> Gawat Darurat
+    "asam_darurat": 3,        # ASAM D1/D2 >= 3 -> Gawat Darurat
+    "asam_rawat_inap": 3,     # ASAM D5/D6 >= 3 -> Rawat Inap
+    "kelipatan_sindikat": 15, # BB > 15x SEMA -> Indikasi Pengedar
+}
+
+# =============================================================================
+# 2. LOGIC ENGINE (BACKEND) - AUDITED
+# =============================================================================
+
+class TATLogicEngine:
+    
+    @staticmethod
+    def get_addiction_severity(dsm_count: int, assist_risk: str) -> str:
+        """Mapping ke Terminologi BNN: Ringan/Sedang/Berat"""
+        if dsm_count >= RULE_THRESHOLDS["dsm_berat"] or assist_risk == "High":
+            return "BERAT"
+        elif dsm_count >= RULE_THRESHOLDS["dsm_sedang"] or assist_risk == "Moderate":
+            return "SEDANG"
+        else:
+            return "RINGAN"
+
+    @staticmethod
+    def check_legal_red_flags(bb: float, limit: float, peran: str, residivis: bool, urine_negatif: bool) -> List[str]:
+        """Mendeteksi indikator diskualifikasi rehabilitasi sesuai Regulasi"""
+        flags = []
+        
+        # 1. Cek Gramatur (SEMA Limit)
+        if limit > 0 and bb > limit:
+            flags.append(f"⛔ Barang bukti ({bb}g) melebihi batas SEMA ({limit}g).")
+            
+        # 2. Indikasi Sindikat (Heuristik)
+        kelipatan = RULE_THRESHOLDS["kelipatan_sindikat"]
+        if bb > limit * kelipatan and limit > 0:
+            flags.append(f"⛔ Barang bukti sangat besar (>{kelipatan}x SEMA) - Indikasi Kuat Pengedar.")
+            
+        # 3. Peran Tersangka (UU 35/2009 Pasal 114)
+        if peran in ["Bandar", "Pengedar", "Kurir"]:
+            flags.append(f"⛔ Peran tersangka terindikasi sebagai {peran}.")
+            
+        # 4. Syarat Urine (SEMA Poin 3c)
+        if urine_negatif:
+            flags.append("⚠️ Hasil Tes Urine NEGATIF (Tidak memenuhi syarat SEMA Poin 3c, kecuali ada riwayat medis valid).")
+            
+        # 5. Residivis
+        if residivis:
+            flags.append("⚠️ Status Residivis (Pemberatan).")
+            
+        return flags
+
+    @staticmethod
+    def determine_recommendation(
+        # Medical Inputs
+        asam_scores: Dict[int, int],
+        dsm5_count: int,
+        suicide_risk_level: int,
+        assist_risk: str,
+        
+        # Legal Inputs
+        bb_amount: float,
+        bb_limit: float,
+        peran: str,
+        is_residivis: bool,
+        is_urine_positive: bool,
+        status_tangkap: str
+    ) -> Dict[str, Any]:
+        
+        result = {
+            "rekomendasi": "",
+            "tipe": "",
+            "alasan": [],
+            "status_warna": "grey",
+            "urgency": "Normal",
+            "derajat_ketergantungan": ""
+        }
+
+        # Hitung Derajat Ketergantungan (Terminologi Form BNN)
+        severity = TATLogicEngine.get_addiction_severity(dsm5_count, assist_risk)
+        result["derajat_ketergantungan"] = severity
+
+        # 1. CEK KEDARURATAN MEDIS (PRIORITAS TERTINGGI - DUTY OF CARE)
+        # FIX: Renamed suicide_risk to suicide_risk_level to match argument name
+        t = RULE_THRESHOLDS
+        if (suicide_risk_level >= t["cssrs_darurat"]
+                or asam_scores.get(1, 0) >= t["asam_darurat"] or asam_scores.get(2, 0) >= t["asam_darurat"]):
+            result.update({
+                "rekomendasi": "REHABILITASI RAWAT INAP (MEDIS/PSIKIATRIS SEGERA)",
+                "tipe": "Medis", "status_warna": "red", "urgency": "IMMEDIATE",
+                "alasan": ["🚨 INDIKASI GAWAT DARURAT: Risiko bunuh diri tinggi atau Komplikasi Medis.",
+                           "Wajib intervensi medis segera (Stabilisasi) sebelum proses hukum lanjut."]
+            })
+            return result
+
+        # 2. FILTER HUKUM (SEMA 4/2010)
+        # SEMA Poin 3c: Harus Urine Positif
+        urine_flag = not is_urine_positive
+        legal_flags = TATLogicEngine.check_legal_red_flags(bb_amount, bb_limit, peran, is_residivis, urine_flag)
+        
+        # SEMA Poin 3a: Tertangkap Tangan (Pertimbangan Hakim)
+        if status_tangkap != "Tertangkap Tangan":
+            result["alasan"].append("ℹ️ Catatan: Status bukan 'Tertangkap Tangan' (Pertimbangan Hakim SEMA Poin 3a).")
+
+        if legal_flags:
+            # Jika ada pelanggaran hukum (BB Lebih / Bandar / Urine Negatif)
+            
+            # Cek Pasal 103 (Dual Track) -> Hanya jika BB lebih TAPI dia pecandu berat & Urine Positif
+            can_dual_track = (severity == "BERAT") and (is_urine_positive) and (peran == "Pengguna")
+            
+            if can_dual_track and bb_amount > bb_limit:
+                 result.update({
+                    "rekomendasi": "PROSES HUKUM (+ REKOMENDASI REHABILITASI PASAL 103)",
+                    "tipe": "Dual Track", "status_warna": "orange",
+                    "alasan": legal_flags + [
+                        f"⚠️ Klien terkonfirmasi Pecandu {severity}.",
+                        "Disarankan penerapan UU 35/2009 Pasal 103 (Vonis Rehab di Lapas/Lembaga)."
+                    ]
+                })
+            else:
+                # Murni Pidana
+                result.update({
+                    "rekomendasi": "PROSES HUKUM (PIDANA PENJARA)",
+                    "tipe": "Hukum", "status_warna": "red",
+                    "alasan": legal_flags + ["❌ Tidak memenuhi kriteria rehabilitasi SEMA 4/2010."]
+                })
+            return result
+
+        # 3. PENENTUAN LEVEL REHABILITASI (JIKA LOLOS FILTER HUKUM)
+        # Juknis BNN: Rawat Inap untuk Ketergantungan Berat / Masalah Sosial / Medis
+        
+        need_inpatient = False
+        reasons_rehab = []
+
+        # Cek Indikasi Rawat Inap
+        if severity == "BERAT":
+            need_inpatient = True
+            reasons_rehab.append(f"✓ Derajat Ketergantungan: {severity}.")
+        if asam_scores.get(5, 0) >= t["asam_rawat_inap"]:
+            need_inpatient = True
+            reasons_rehab.append("✓ Potensi Relapse Tinggi (ASAM D5).")
+        if asam_scores.get(6, 0) >= t["asam_rawat_inap"]:
+            need_inpatient = True
+            reasons_rehab.append("✓ Lingkungan tidak mendukung pemulihan (ASAM D6).")
+
+        if need_inpatient:
+            result.update({
+                "rekomendasi": "REHABILITASI RAWAT INAP",
+                "tipe": "Medis", "status_warna": "blue",
+                "alasan": ["✓ Memenuhi syarat SEMA (BB Aman, Urine Positif, Bukan Jaringan)."] + reasons_rehab
+            })
+        else:
+            result.update({
+                "rekomendasi": "REHABILITASI RAWAT JALAN",
+                "tipe": "Medis", "status_warna": "green",
+                "alasan": [
+                    "✓ Memenuhi syarat SEMA (BB Aman, Urine Positif).",
+                    f"✓ Derajat Ketergantungan: {severity}.",
+                    "✓ Lingkungan/Fungsi Sosial cukup stabil."
+                ]
+            })
+
+        return result
+
+    @staticmethod
+    def determine_recommendation_batch(cases: Any, with_alasan: bool = True, compiled: bool = False) -> "pd.DataFrame":
+        """Versi kolom (vectorized) dari determine_recommendation untuk banyak kasus sekaligus.
+
+        `cases` berupa DataFrame atau mapping kolom -> array dengan kolom BATCH_COLUMNS.
+        Hasil identik dengan jalur skalar, satu baris per kasus (index mengikuti input).
+        `compiled=True` memakai tabel keputusan terkompilasi (tat_table).
+        NumPy/pandas baru diimpor saat fungsi ini dipanggil (lihat tat_batch).
+        """
+        if compiled:
+            from tat_table import get_decision_table
+            return get_decision_table().evaluate(cases, with_alasan=with_alasan)
+        from tat_batch import evaluate_batch
+        return evaluate_batch(cases, with_alasan=with_alasan)
+
+    @staticmethod
+    def determine_recommendation_compact(**kwargs: Any) -> "CompactResult":
+        """Seperti determine_recommendation, tetapi mengembalikan tat_results.CompactResult.
+
+        Hasil terkode (enum + bitmask alasan); teks alasan dirender saat diakses.
+        """
+        from tat_table import get_decision_table
+        return get_decision_table().lookup_case(**kwargs)
+
+    @staticmethod
+    def determine_recommendation_compiled(**kwargs: Any) -> Dict[str, Any]:
+        """Sama dengan determine_recommendation (argumen & hasil), lewat lookup tabel O(1)."""
+        from tat_table import get_decision_table
+        return get_decision_table().recommend(**kwargs)
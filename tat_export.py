@@ -0,0 +1,298 @@
+"""
+=================================================================================
+TAT DSS - EKSPOR ANALITIK (PARQUET / ARROW)
+=================================================================================
+Ekspor kolumnar input + keputusan untuk analis, sebagai ganti mengurai teks
+laporan. Satu baris per asesmen: skor ASAM D1..D6, DSM-5, C-SSRS, jenis
+narkotika, BB dan rasionya terhadap batas SEMA (GRAMATUR_LIMITS), peran, status,
+serta kode + label keputusan dan flag alasan. Nama klien tidak diekspor.
+
+Kolom kategori disimpan dictionary-encoded dengan kamus tetap (level yang dikenal
+lebih dulu, nilai lain ditambahkan terurut) sehingga kamus sama di semua berkas
+dan group-by lintas partisi tidak perlu menyatukan kamus. Label keputusan dibangun
+langsung dari kode evaluate_codes / kode tersimpan tat_store tanpa membuat string
+per baris.
+
+Tujuan berupa direktori ditulis sebagai dataset berpartisi Hive per tanggal
+(`tanggal=YYYY-MM-DD/part-<token>-<n>.parquet`); setiap ekspor menambah berkas baru
+sehingga ekspor harian cukup di-append. Tujuan berakhiran .parquet / .arrow menjadi
+satu berkas. Format "arrow" (Arrow IPC tanpa kompresi) dapat dibaca zero-copy lewat
+memory map; Parquet (zstd) lebih kecil dan tetap dibaca lewat mmap tanpa salinan
+berkas.
+
+    python tat_cli.py export --store tat_cases.db --start 2025-12-01 -o analitik/
+    python tat_cli.py export kasus.csv -o analitik/ --to arrow
+
+    from tat_export import read_analytics
+    t = read_analytics("analitik/", columns=["jenis_narkotika", "rekomendasi"])
+    t.group_by(["jenis_narkotika", "rekomendasi"]).aggregate([("rekomendasi", "count")])
+
+pyarrow adalah dependensi opsional (seperti input Parquet di tat_cli) dan baru
+diimpor saat ekspor / baca dijalankan.
+=================================================================================
+"""
+
+import itertools
+import os
+import uuid
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from tat_core import GRAMATUR_LIMITS
+from tat_results import (
+    ASSIST_LEVELS, FLAG_NAMES, OUTCOME_FIELDS, OUTCOME_ORDER, PERAN_LEVELS, SEVERITY_LEVELS,
+)
+from tat_store import UNKNOWN_SUBSTANCE
+
+EXPORT_FORMATS = ("parquet", "arrow")
+PARTITION_COLUMN = "tanggal"
+PARQUET_COMPRESSION = "zstd"
+ROW_GROUP_SIZE = 131_072
+
+# Level yang dikenal per kolom kategori (urutan tetap = kode kamus tetap)
+CATEGORY_LEVELS = {
+    "sumber": ("app", "batch"),
+    "jenis_narkotika": tuple(GRAMATUR_LIMITS) + (UNKNOWN_SUBSTANCE,),
+    "peran": PERAN_LEVELS,
+    "assist_risk": ASSIST_LEVELS,
+    "status_tangkap": ("Tertangkap Tangan", "Pengembangan/Lapor Diri"),
+}
+OUTCOME_LABEL_COLUMNS = ("rekomendasi", "tipe", "status_warna", "urgency")
+
+
+def export_format(path: str, fmt: Optional[str] = None) -> str:
+    """Format ekspor dari argumen atau ekstensi tujuan (.arrow / .feather / .ipc -> arrow)."""
+    if fmt:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format ekspor tidak didukung: {fmt}")
+        return fmt
+    ext = os.path.splitext(str(path))[1].lower()
+    return "arrow" if ext in (".arrow", ".feather", ".ipc") else "parquet"
+
+
+def _strings(frame: Any, name: str, default: Optional[str]):
+    """Kolom opsional sebagai pyarrow string array (tanpa list Python); tidak ada / NULL / NaN -> `default`."""
+    import pyarrow as pa
+
+    if name not in frame:
+        arr = pa.nulls(len(frame), pa.string())
+    else:
+        arr = pa.array(frame[name], from_pandas=True)
+        if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+            arr = arr.cast(pa.string())
+    return arr if default is None else arr.fill_null(default)
+
+
+def _dates(frame: Any, default: str):
+    """Kolom tanggal (ISO string / datetime) -> date32; tidak ada / NULL -> `default`."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if PARTITION_COLUMN in frame:
+        arr = pa.array(frame[PARTITION_COLUMN], from_pandas=True)
+        if pa.types.is_timestamp(arr.type) or pa.types.is_date(arr.type):
+            arr = arr.cast(pa.date32())
+        else:
+            arr = pc.utf8_slice_codeunits(arr.cast(pa.string()), 0, 10).cast(pa.date32())
+    else:
+        arr = pa.nulls(len(frame), pa.date32())
+    return arr.fill_null(pa.scalar(date.fromisoformat(default), type=pa.date32()))
+
+
+def _dictionary(values: Any, levels: List[str]):
+    """String array -> dictionary array berkamus `levels`; nilai baru ditambahkan (terurut) ke akhir `levels` di tempat.
+
+    `levels` dibagi antar-chunk satu ekspor sehingga kamus hanya bertambah di belakang:
+    kode lama tetap sah dan berkas Arrow IPC cukup menulis delta kamus.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # Encode di C++, lalu remap kode lokal ke posisi di `levels`
+    encoded = values.dictionary_encode()
+    seen = encoded.dictionary.to_pylist()
+    known = set(levels)
+    levels.extend(sorted(v for v in seen if v not in known))
+    position = {label: i for i, label in enumerate(levels)}
+    remap = pa.array([position[v] for v in seen], type=pa.int32())
+    return pa.DictionaryArray.from_arrays(pc.take(remap, encoded.indices), pa.array(levels, type=pa.string()))
+
+
+def new_levels() -> Dict[str, List[str]]:
+    """Kamus awal per kolom kategori untuk satu ekspor (lihat _dictionary)."""
+    return {**{name: list(levels) for name, levels in CATEGORY_LEVELS.items()}, "rules_version": []}
+
+
+def _coded(codes: np.ndarray, labels: Sequence[str]):
+    """Kode (indeks `labels`) -> dictionary array; label duplikat digabung (seperti tat_batch._categorical)."""
+    import pyarrow as pa
+
+    categories = list(dict.fromkeys(labels))
+    remap = np.array([categories.index(label) for label in labels], dtype=np.int8)
+    return pa.DictionaryArray.from_arrays(pa.array(remap[np.asarray(codes)], type=pa.int8()),
+                                          pa.array(categories, type=pa.string()))
+
+
+def analytics_table(frame: Any, codes: Optional[Dict[str, Any]] = None,
+                    thresholds: Optional[Dict[str, float]] = None, tanggal: Optional[str] = None,
+                    rules_version: Optional[str] = None, levels: Optional[Dict[str, List[str]]] = None):
+    """pyarrow.Table analitik untuk satu chunk kasus (DataFrame berkolom tat_batch.BATCH_COLUMNS).
+
+    `codes` = kode hasil yang sudah ada (kolom outcome/severity/reason_bits tat_store);
+    bila None dihitung dengan evaluate_codes. Kolom opsional frame: id, tanggal (ISO),
+    sumber, usia, jenis_narkotika, rules_version. Tanpa kolom tanggal dipakai `tanggal`
+    (default hari ini); tanpa kolom id dipakai nomor baris (index + 1) seperti iter_reports.
+    `levels` (new_levels()) dibagi antar-chunk agar kamus kategori konsisten dalam satu ekspor.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    from tat_batch import encode_columns, evaluate_codes
+    from tat_rules import RuleSet
+
+    cols = encode_columns(frame)
+    if codes is None:
+        codes = evaluate_codes(cols, thresholds=thresholds)
+    outcome, bits = np.asarray(codes["outcome"]), np.asarray(codes["reason_bits"], dtype=np.uint8)
+    bb, limit = cols["bb_amount"], cols["bb_limit"]
+    default_tanggal = tanggal or date.today().isoformat()
+    version = rules_version or RuleSet.current().version
+    levels = new_levels() if levels is None else levels
+
+    data = {
+        PARTITION_COLUMN: _dates(frame, default_tanggal),
+        "id": pa.array(frame["id"] if "id" in frame else np.asarray(frame.index) + 1, type=pa.int64()),
+        "sumber": _dictionary(_strings(frame, "sumber", "batch"), levels["sumber"]),
+        "usia": (pa.array(pd.to_numeric(frame["usia"], errors="coerce"), from_pandas=True).cast(pa.int16(), safe=False)
+                 if "usia" in frame else pa.nulls(len(frame), pa.int16())),
+        "jenis_narkotika": _dictionary(_strings(frame, "jenis_narkotika", UNKNOWN_SUBSTANCE),
+                                       levels["jenis_narkotika"]),
+        "peran": _dictionary(_strings(frame, "peran", None), levels["peran"]),
+        "assist_risk": _dictionary(_strings(frame, "assist_risk", None), levels["assist_risk"]),
+        "status_tangkap": _dictionary(_strings(frame, "status_tangkap", None), levels["status_tangkap"]),
+        **{f"asam_d{d}": pa.array(cols[f"asam_d{d}"], type=pa.int8()) for d in range(1, 7)},
+        "dsm5_count": pa.array(cols["dsm5_count"], type=pa.int8()),
+        "suicide_risk_level": pa.array(cols["suicide_risk_level"], type=pa.int8()),
+        "bb_amount": pa.array(bb, type=pa.float64()),
+        "bb_limit": pa.array(limit, type=pa.float64()),
+        # Rasio BB terhadap batas SEMA; NULL untuk zat tanpa batas (limit 0, "Lainnya")
+        "bb_rasio": pa.array(np.divide(bb, limit, out=np.full(len(bb), np.nan), where=limit > 0),
+                             type=pa.float64(), from_pandas=True),
+        "is_residivis": pa.array(cols["is_residivis"], type=pa.bool_()),
+        "is_urine_positive": pa.array(cols["is_urine_positive"], type=pa.bool_()),
+        "outcome": pa.array(outcome, type=pa.int8()),
+        **{field: _coded(outcome, [OUTCOME_FIELDS[k][field] for k in OUTCOME_ORDER])
+           for field in OUTCOME_LABEL_COLUMNS},
+        "severity": pa.array(codes["severity"], type=pa.int8()),
+        "derajat_ketergantungan": _coded(codes["severity"], SEVERITY_LEVELS),
+        "reason_bits": pa.array(bits, type=pa.uint8()),
+        **{f"flag_{name.lower()}": pa.array((bits & bit) != 0, type=pa.bool_()) for bit, name in FLAG_NAMES.items()},
+        "rules_version": _dictionary(_strings(frame, "rules_version", version), levels["rules_version"]),
+    }
+    return pa.table(data)
+
+
+def iter_tables(frames: Iterable[Any], stored_codes: bool = False, **kwargs: Any):
+    """analytics_table per chunk; stored_codes=True memakai kode tersimpan (riwayat tat_store)."""
+    kwargs.setdefault("levels", new_levels())
+    for frame in frames:
+        if len(frame) == 0:
+            continue
+        codes = None
+        if stored_codes:
+            codes = {c: frame[c].to_numpy() for c in ("outcome", "severity", "reason_bits")}
+        yield analytics_table(frame, codes=codes, **kwargs)
+
+
+def partitioning():
+    """Partisi Hive `tanggal=YYYY-MM-DD` bertipe date32."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.date32())]), flavor="hive")
+
+
+def write_analytics(target: Union[str, BinaryIO], frames: Iterable[Any], stored_codes: bool = False,
+                    fmt: Optional[str] = None, **kwargs: Any) -> int:
+    """Ekspor `frames` (iterable DataFrame kasus) secara streaming; kembalikan jumlah baris.
+
+    `target` direktori (sudah ada atau path tanpa ekstensi berkas) -> dataset berpartisi
+    per tanggal, ditambahkan ke isi yang sudah ada; path .parquet/.arrow atau file-like ->
+    satu berkas. Argumen lain diteruskan ke analytics_table (thresholds, tanggal, ...).
+    """
+    single = not isinstance(target, str) or (os.path.splitext(target)[1] != "" and not os.path.isdir(target))
+    fmt = export_format(target if isinstance(target, str) else "", fmt)
+    tables = iter_tables(frames, stored_codes=stored_codes, **kwargs)
+    first = next(tables, None)
+    if first is None:
+        return 0
+    tables = itertools.chain([first], tables)
+    total = 0
+
+    def counted():
+        nonlocal total
+        for table in tables:
+            total += table.num_rows
+            yield from table.to_batches()
+
+    if single:
+        _write_file(target, first.schema, counted(), fmt)
+        return total
+
+    import pyarrow.dataset as ds
+
+    if fmt == "parquet":
+        file_format = ds.ParquetFileFormat()
+        options = file_format.make_write_options(compression=PARQUET_COMPRESSION)
+    else:
+        file_format = ds.IpcFileFormat()
+        options = file_format.make_write_options(compression=None)
+    ds.write_dataset(
+        counted(), target, schema=first.schema, format=file_format, file_options=options,
+        partitioning=partitioning(), existing_data_behavior="overwrite_or_ignore",
+        # Token unik per ekspor: berkas lama tidak tertimpa (append partisi)
+        basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.{'parquet' if fmt == 'parquet' else 'arrow'}",
+        min_rows_per_group=ROW_GROUP_SIZE, max_rows_per_group=ROW_GROUP_SIZE,
+    )
+    return total
+
+
+def _write_file(target: Union[str, BinaryIO], schema: Any, batches: Iterable[Any], fmt: str) -> None:
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(target, schema, compression=PARQUET_COMPRESSION) as writer:
+            for batch in batches:
+                writer.write_batch(batch, row_group_size=ROW_GROUP_SIZE)
+        return
+    # Kamus hanya bertambah di belakang antar-chunk (_dictionary): ditulis sebagai delta
+    with pa.ipc.new_file(target, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def open_analytics(path: str, fmt: Optional[str] = None):
+    """pyarrow.dataset.Dataset atas direktori ekspor atau satu berkas, dibaca lewat memory map."""
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+
+    if fmt is None and os.path.isdir(path):
+        names = (name for _, _, files in os.walk(path) for name in files)
+        fmt = export_format(next(names, ""))
+    fmt = export_format(path, fmt)
+    return ds.dataset(path, format="ipc" if fmt == "arrow" else "parquet",
+                      partitioning=partitioning() if os.path.isdir(path) else None,
+                      filesystem=pafs.LocalFileSystem(use_mmap=True))
+
+
+def read_analytics(path: str, columns: Optional[List[str]] = None, filter: Any = None,
+                   fmt: Optional[str] = None):
+    """Baca ekspor (kolom & filter partisi opsional) sebagai satu pyarrow.Table siap group-by.
+
+    Contoh filter: pyarrow.dataset.field("tanggal") >= datetime.date(2025, 12, 1).
+    """
+    return open_analytics(path, fmt).to_table(columns=columns, filter=filter).unify_dictionaries()
@@ -0,0 +1,80 @@
+"""
+=================================================================================
+TAT DSS - CACHED FIGURES
+=================================================================================
+Figure Plotly untuk TATUI. Dipisah dari tat_predict_app karena Streamlit
+mengeksekusi ulang skrip utama di setiap rerun (state level modul ikut hilang),
+sedangkan modul yang di-import tetap tinggal di sys.modules: cache di sini
+bertahan lintas rerun dan dipakai bersama oleh semua sesi di proses server.
+
+Radar ASAM hanya punya 5^6 = 15.625 kemungkinan skor, jadi LRU terbatas sudah
+menampung hampir semua profil yang muncul dalam praktik.
+=================================================================================
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+from tat_core import ASAM_DIMENSIONS
+
+ASAM_FIGURE_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=ASAM_FIGURE_CACHE_SIZE)
+def asam_radar_figure(scores: Tuple[int, ...]):
+    """Figure px.line_polar untuk skor ASAM D1..D6 (tuple agar hashable).
+
+    Figure dikirim apa adanya ke st.plotly_chart: Streamlit hanya menyalinnya ke
+    dict (~2 ms), sedangkan membangun ulang DataFrame + px.line_polar ~30 ms.
+    Figure yang di-cache tidak boleh dimutasi oleh pemanggil.
+    """
+    # Import berat (pandas/plotly) ditunda sampai grafik benar-benar dirender
+    import pandas as pd
+    import plotly.express as px
+
+    df_asam = pd.DataFrame({
+        'Dimensi': [f"D{k}" for k in ASAM_DIMENSIONS],
+        'Score': list(scores)
+    })
+    fig = px.line_polar(df_asam, r='Score', theta='Dimensi', line_close=True, range_r=[0,4])
+    fig.update_traces(fill='toself')
+    return fig
+
+
+# Warna per outcome (urut OUTCOME_ORDER), selaras dengan .status-* di TATUI.render_css;
+# pidana digelapkan agar tidak tertukar dengan darurat (sama-sama status merah)
+OUTCOME_COLORS = ("#dc2626", "#f97316", "#7f1d1d", "#3b82f6", "#22c55e")
+
+
+def outcome_heatmap_figure(x_values, y_values, z, x_label: str, y_label: str,
+                           current: Tuple[float, float], log_x: bool = False, log_y: bool = False):
+    """Heatmap outcome diskrit (kode OUTCOME_ORDER) dari tat_sensitivity.outcome_grid.
+
+    Tidak di-cache: grid bergantung pada seluruh input kasus, dan membangunnya hanya
+    butuh milidetik. `current` adalah posisi (x, y) kasus saat ini, ditandai silang.
+    log_x/log_y untuk sumbu BB (nilai geometris); sumbu lain bilangan bulat (dtick 1).
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    from tat_results import OUTCOME_FIELDS, OUTCOME_ORDER
+
+    n = len(OUTCOME_ORDER)
+    # Skala warna bertangga: kode k menempati [k/n, (k+1)/n] dengan zmin=-0.5, zmax=n-0.5
+    colorscale = [[edge / n, OUTCOME_COLORS[k]] for k in range(n) for edge in (k, k + 1)]
+    labels = np.array([OUTCOME_FIELDS[k]["rekomendasi"] for k in OUTCOME_ORDER], dtype=object)
+    fig = go.Figure(go.Heatmap(
+        x=x_values, y=y_values, z=z, zmin=-0.5, zmax=n - 0.5, colorscale=colorscale,
+        customdata=labels[z], hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<br>%{{customdata}}<extra></extra>",
+        colorbar=dict(tickvals=list(range(n)), ticktext=[k.replace("_", " ").title() for k in OUTCOME_ORDER]),
+    ))
+    # BB 0 tidak tampil di sumbu log: penanda dijepit ke nilai grid terkecil
+    x_now = max(current[0], x_values[0]) if log_x else current[0]
+    y_now = max(current[1], y_values[0]) if log_y else current[1]
+    fig.add_trace(go.Scatter(x=[x_now], y=[y_now], mode="markers", name="Kasus ini",
+                             marker=dict(symbol="x", size=14, color="white", line=dict(width=2, color="black")),
+                             hoverinfo="skip", showlegend=False))
+    for update, label, log in ((fig.update_xaxes, x_label, log_x), (fig.update_yaxes, y_label, log_y)):
+        update(title=label, type="log" if log else "linear", dtick=None if log else 1)
+    fig.update_layout(margin=dict(l=10, r=10, t=10, b=10), height=360)
+    return fig
@@ -0,0 +1,238 @@
+"""
+=================================================================================
+TAT DSS - HOT PATH TIMING & PROFILING
+=================================================================================
+Pengukur waktu ringan untuk hot path aplikasi (input, Logic Engine, hasil, laporan)
+agar halaman lambat dapat dipilah: engine, pandas/plotly (di dalam render_results)
+atau Streamlit sendiri (sisa waktu rerun di luar hot path).
+
+Instrumentasi dipasang dengan mengganti staticmethod pada kelas pemiliknya dengan
+wrapper ber-timer, dan dilepas lagi oleh disable(): selama nonaktif pemanggilan
+berjalan tanpa wrapper sama sekali (overhead nol). Aktif bila:
+
+    TAT_METRICS=1          instrumentasi sejak start (tanpa panel)
+    TAT_METRICS_FILE=path  + tulis metrik format teks Prometheus ke `path`
+                           (mis. untuk textfile collector node_exporter)
+    TAT_DEBUG=1            instrumentasi + izinkan panel debug (hanya dari sisi server)
+      ?debug=1             tampilkan panel debug di sidebar (diabaikan tanpa TAT_DEBUG=1)
+      ?debug=1&profile=1   + cProfile satu rerun penuh, ditampilkan di panel
+
+Modul ini di-import (bukan skrip utama) sehingga agregat bertahan lintas rerun dan
+dibagi semua sesi di proses server.
+=================================================================================
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from tat_core import TATLogicEngine
+
+METRICS_FILE = os.environ.get("TAT_METRICS_FILE") or None
+METRICS_WRITE_INTERVAL = 1.0  # detik; penulisan berkas metrik paling sering sekali per interval
+# Batas bucket histogram (detik), rentang hot path: mikrodetik (engine) s.d. detik (rerun penuh)
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+ENGINE_HOT_PATHS = ("determine_recommendation", "determine_recommendation_compact")
+UI_HOT_PATHS = ("input_section_legal", "input_section_medical", "render_results", "render_report")
+RERUN = "rerun"
+
+
+class PathStats:
+    """Agregat satu hot path: jumlah panggilan, total, maksimum dan jumlah per bucket BUCKETS."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        i = bisect_left(BUCKETS, seconds)
+        if i < len(BUCKETS):  # di atas bucket terakhir hanya tercatat di +Inf (= count)
+            self.buckets[i] += 1
+
+
+class Registry:
+    """Agregat per hot path untuk seluruh proses (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, PathStats] = {}
+        self._last_write = 0.0
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = PathStats()
+            stats.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Tuple[int, float, float]]:
+        """{nama: (jumlah, total detik, maks detik)}"""
+        with self._lock:
+            return {name: (s.count, s.total, s.max) for name, s in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus(self) -> str:
+        """Metrik format teks Prometheus (histogram tat_hot_path_seconds per path)."""
+        lines = [
+            "# HELP tat_hot_path_seconds Waktu eksekusi hot path TAT DSS (termasuk rerun penuh Streamlit).",
+            "# TYPE tat_hot_path_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted((name, s.count, s.total, list(s.buckets)) for name, s in self._stats.items())
+        for name, count, total, buckets in items:
+            label = f'path="{name}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'tat_hot_path_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'tat_hot_path_seconds_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"tat_hot_path_seconds_sum{{{label}}} {total:.9f}")
+            lines.append(f"tat_hot_path_seconds_count{{{label}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str, force: bool = False) -> bool:
+        """Tulis prometheus() secara atomik (tmp + rename); dibatasi METRICS_WRITE_INTERVAL."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_write < METRICS_WRITE_INTERVAL:
+                return False
+            self._last_write = now
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus())
+        os.replace(tmp, path)
+        return True
+
+
+REGISTRY = Registry()
+_local = threading.local()
+_enabled = False
+
+
+def env_enabled() -> bool:
+    return os.environ.get("TAT_METRICS") == "1" or METRICS_FILE is not None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    """Pasang timer pada hot path Logic Engine (idempoten). TATUI dipasang per rerun lewat instrument()."""
+    global _enabled
+    instrument(TATLogicEngine, ENGINE_HOT_PATHS, "TATLogicEngine")
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    uninstrument(TATLogicEngine, ENGINE_HOT_PATHS)
+    _enabled = False
+
+
+def record(name: str, seconds: float) -> None:
+    REGISTRY.observe(name, seconds)
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run.add(name, seconds)
+
+
+def _timed(name: str, fn: Callable) -> Callable:
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - t0)
+    wrapper.tat_timed = True
+    return wrapper
+
+
+def instrument(owner: type, names: Tuple[str, ...], prefix: str) -> None:
+    """Ganti staticmethod `names` pada `owner` dengan versi ber-timer `prefix.nama` (idempoten)."""
+    for name in names:
+        fn = owner.__dict__[name].__func__
+        if not getattr(fn, "tat_timed", False):
+            setattr(owner, name, staticmethod(_timed(f"{prefix}.{name}", fn)))
+
+
+def uninstrument(owner: type, names: Tuple[str, ...]) -> None:
+    for name in names:
+        fn = owner.__dict__[name].__func__
+        if getattr(fn, "tat_timed", False):
+            setattr(owner, name, staticmethod(fn.__wrapped__))
+
+
+class RerunTimings:
+    """Waktu hot path selama satu rerun penuh di thread sesi ini, plus cProfile opsional."""
+
+    def __init__(self, profile: bool = False):
+        self.t0 = time.perf_counter()
+        self.timings: Dict[str, List[float]] = {}  # nama -> [jumlah, total detik]
+        self.profiler: Optional[cProfile.Profile] = None
+        self.profile_text: Optional[str] = None
+        if profile:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:  # profiler lain sedang aktif (sesi lain)
+                self.profiler = None
+                self.profile_text = "cProfile tidak tersedia: profiler lain sedang aktif."
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.timings.get(name)
+        if entry is None:
+            self.timings[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def stop_profile(self, limit: int = 30) -> Optional[str]:
+        """Hentikan cProfile (bila aktif) dan kembalikan ringkasan pstats urut waktu kumulatif."""
+        if self.profiler is not None:
+            self.profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+            self.profile_text = out.getvalue()
+            self.profiler = None
+        return self.profile_text
+
+
+@contextmanager
+def rerun_scope(profile: bool = False) -> Iterator[RerunTimings]:
+    """Bungkus satu rerun penuh: kumpulkan timing per rerun, catat durasi `rerun`, tulis berkas metrik."""
+    run = RerunTimings(profile)
+    _local.run = run
+    try:
+        yield run
+    finally:
+        run.stop_profile()
+        _local.run = None
+        REGISTRY.observe(RERUN, run.elapsed())
+        if METRICS_FILE:
+            try:
+                REGISTRY.write_textfile(METRICS_FILE)
+            except OSError:
+                pass  # metrik tidak boleh menggagalkan halaman
@@ -0,0 +1,132 @@
+"""
+=================================================================================
+TAT DSS - PARALLEL BATCH (PROCESS POOL)
+=================================================================================
+Eksekusi batch multi-core: kolom input dikodekan sekali (tat_batch.encode_columns),
+disalin ke satu berkas memory-mapped (di /dev/shm bila tersedia), lalu setiap worker
+mengevaluasi potongan [start:stop] langsung dari buffer tersebut. Tidak ada pickling
+per baris; kode hasil (outcome, severity, reason_bits) ditulis kembali ke blok yang
+sama sehingga urutan input selalu terjaga, dan teks alasan dirender sekali di proses
+induk dari kode tersebut (hanya bila diminta). Berkas mmap dipakai (bukan multiprocessing.shared_memory) agar tidak
+bergantung pada resource tracker dan start method (fork/spawn).
+
+Input kecil (< min_rows) dievaluasi in-process karena overhead pool lebih besar.
+
+    with ParallelEvaluator(workers=4) as ev:
+        hasil = ev.evaluate(df)
+=================================================================================
+"""
+
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tat_batch import assemble_results, encode_columns, evaluate_codes, render_alasan
+
+DEFAULT_MIN_ROWS = 200_000
+
+# Kolom keluaran evaluate_codes yang ditulis worker ke shared memory
+_OUTPUT_DTYPES = {"outcome": np.int8, "severity": np.int8, "reason_bits": np.uint8}
+
+Layout = List[Tuple[str, str, int]]  # (nama kolom, dtype, offset byte)
+
+
+def _build_layout(cols: Dict[str, np.ndarray], n: int) -> Tuple[Layout, int]:
+    layout, offset = [], 0
+    specs = [(k, v.dtype) for k, v in cols.items()] + [(k, np.dtype(d)) for k, d in _OUTPUT_DTYPES.items()]
+    for name, dtype in specs:
+        offset = (offset + 7) & ~7  # align 8 byte
+        layout.append((name, dtype.str, offset))
+        offset += dtype.itemsize * n
+    return layout, max(offset, 1)
+
+
+def _views(buf: mmap.mmap, layout: Layout, n: int) -> Dict[str, np.ndarray]:
+    return {name: np.ndarray((n,), dtype=np.dtype(dt), buffer=buf, offset=off) for name, dt, off in layout}
+
+
+def _open_buffer(path: str, size: int) -> mmap.mmap:
+    with open(path, "r+b") as fh:
+        return mmap.mmap(fh.fileno(), size)
+
+
+def _evaluate_shard(path: str, size: int, layout: Layout, n: int, start: int, stop: int) -> None:
+    """Worker: evaluasi baris [start:stop] langsung dari buffer bersama; tidak ada hasil yang di-pickle balik."""
+    buf, shard = _open_buffer(path, size), {}
+    try:
+        shard = {name: arr[start:stop] for name, arr in _views(buf, layout, n).items()}
+        codes = evaluate_codes(shard)
+        for name in _OUTPUT_DTYPES:
+            shard[name][:] = codes[name]
+    finally:
+        shard.clear()  # lepas view NumPy sebelum mmap ditutup
+        buf.close()
+
+
+class ParallelEvaluator:
+    """Process pool yang dapat dipakai ulang lintas chunk (mis. oleh tat_cli)."""
+
+    def __init__(self, workers: Optional[int] = None, min_rows: int = DEFAULT_MIN_ROWS):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParallelEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def evaluate(self, cases: Any, with_alasan: bool = True) -> pd.DataFrame:
+        """Setara TATLogicEngine.determine_recommendation_batch, dibagi ke `workers` proses."""
+        cols = encode_columns(cases)
+        index = cases.index if isinstance(cases, pd.DataFrame) else None
+        n = len(cols["dsm5_count"])
+        if self.workers <= 1 or n < self.min_rows:
+            codes = evaluate_codes(cols)
+        else:
+            codes = self._evaluate_shared(cols, n)
+        return assemble_results(codes, index=index, alasan=render_alasan(codes, cols) if with_alasan else None)
+
+    def _evaluate_shared(self, cols: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        layout, size = _build_layout(cols, n)
+        fd, path = tempfile.mkstemp(prefix="tat_batch_", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        os.ftruncate(fd, size)
+        os.close(fd)
+        buf, views = _open_buffer(path, size), {}
+        try:
+            views = _views(buf, layout, n)
+            for name, arr in cols.items():
+                views[name][:] = arr
+            bounds = np.linspace(0, n, self.workers + 1, dtype=np.int64).tolist()
+            futures = [
+                self._pool.submit(_evaluate_shard, path, size, layout, n, start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+            ]
+            for fut in futures:
+                fut.result()  # teruskan error worker
+            return {name: views[name].copy() for name in _OUTPUT_DTYPES}
+        finally:
+            views.clear()
+            buf.close()
+            os.unlink(path)
+
+
+def evaluate_parallel(
+    cases: Any, workers: Optional[int] = None, with_alasan: bool = True, min_rows: int = DEFAULT_MIN_ROWS
+) -> pd.DataFrame:
+    """Sekali jalan: buat pool, evaluasi, tutup pool."""
+    with ParallelEvaluator(workers=workers, min_rows=min_rows) as ev:
+        return ev.evaluate(cases, with_alasan=with_alasan)
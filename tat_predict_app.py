@@ -12,198 +12,40 @@ Status Audit Regulasi (Desember 2025):
 =================================================================================
 """
 
+import importlib.util
+import io
+import os
+import sqlite3
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, Mapping, Optional
 
-# =============================================================================
-# 1. KONFIGURASI & KONSTANTA DATA
-# =============================================================================
+# Konstanta & Logic Engine dipisah ke tat_core (tanpa dependensi UI); di-ekspor ulang di sini
+# agar `from tat_predict_app import TATLogicEngine` tetap berfungsi.
+from tat_core import GRAMATUR_LIMITS, ASAM_DIMENSIONS, TATLogicEngine
+from tat_store import CaseStore, DEFAULT_DB_PATH
+from tat_figures import asam_radar_figure, outcome_heatmap_figure
+from tat_reports import format_tanggal, render_report_text, write_report_zip
+import tat_sensitivity
+import tat_metrics
 
-st.set_page_config(
-    page_title="TAT DSS v4.1",
-    page_icon="⚖️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# SEMA No. 4 Tahun 2010 Limits (Gram) - VERIFIED
-GRAMATUR_LIMITS = {
-    "Ganja/Cannabis": 5.0,
-    "Metamfetamin/Sabu": 1.0,
-    "Heroin": 1.8,
-    "Kokain": 1.8,
-    "Ekstasi/MDMA": 2.4, # Atau 8 butir
-    "Morfin": 1.8,
-    "Kodein": 72.0,
-    "Lainnya": 0.0 # Requires Manual Review
-}
-
-# Mapping Dimensi ASAM (Standard BNN/Intl)
-ASAM_DIMENSIONS = {
-    1: "Intoksikasi Akut/Withdrawal",
-    2: "Kondisi Biomedis",
-    3: "Emosional/Perilaku/Kognitif",
-    4: "Kesiapan Berubah",
-    5: "Potensi Relapse",
-    6: "Lingkungan Pemulihan"
-}
+def bulk_export_enabled() -> bool:
+    """Unduhan massal riwayat (berisi data klien) hanya bila server diset TAT_BULK_EXPORT=1.
 
-# =============================================================================
-# 2. LOGIC ENGINE (BACKEND) - AUDITED
-# =============================================================================
+    Default nonaktif: aplikasi dapat diakses siapa pun yang membuka URL-nya. Operator tetap
+    dapat mengekspor lewat `tat_cli.py reports` / `tat_cli.py export`.
+    """
+    return os.environ.get("TAT_BULK_EXPORT") == "1"
 
-class TATLogicEngine:
-    
-    @staticmethod
-    def get_addiction_severity(dsm_count: int, assist_risk: str) -> str:
-        """Mapping ke Terminologi BNN: Ringan/Sedang/Berat"""
-        if dsm_count >= 6 or assist_risk == "High":
-            return "BERAT"
-        elif dsm_count >= 4 or assist_risk == "Moderate":
-            return "SEDANG"
-        else:
-            return "RINGAN"
 
-    @staticmethod
-    def check_legal_red_flags(bb: float, limit: float, peran: str, residivis: bool, urine_negatif: bool) -> List[str]:
-        """Mendeteksi indikator diskualifikasi rehabilitasi sesuai Regulasi"""
-        flags = []
-        
-        # 1. Cek Gramatur (SEMA Limit)
-        if limit > 0 and bb > limit:
-            flags.append(f"⛔ Barang bukti ({bb}g) melebihi batas SEMA ({limit}g).")
-            
-        # 2. Indikasi Sindikat (Heuristik)
-        if bb > limit * 15 and limit > 0:
-            flags.append("⛔ Barang bukti sangat besar (>15x SEMA) - Indikasi Kuat Pengedar.")
-            
-        # 3. Peran Tersangka (UU 35/2009 Pasal 114)
-        if peran in ["Bandar", "Pengedar", "Kurir"]:
-            flags.append(f"⛔ Peran tersangka terindikasi sebagai {peran}.")
-            
-        # 4. Syarat Urine (SEMA Poin 3c)
-        if urine_negatif:
-            flags.append("⚠️ Hasil Tes Urine NEGATIF (Tidak memenuhi syarat SEMA Poin 3c, kecuali ada riwayat medis valid).")
-            
-        # 5. Residivis
-        if residivis:
-            flags.append("⚠️ Status Residivis (Pemberatan).")
-            
-        return flags
+def debug_allowed() -> bool:
+    """Mode debug hanya dapat diaktifkan operator server lewat env TAT_DEBUG=1."""
+    return os.environ.get("TAT_DEBUG") == "1"
 
-    @staticmethod
-    def determine_recommendation(
-        # Medical Inputs
-        asam_scores: Dict[int, int],
-        dsm5_count: int,
-        suicide_risk_level: int,
-        assist_risk: str,
-        
-        # Legal Inputs
-        bb_amount: float,
-        bb_limit: float,
-        peran: str,
-        is_residivis: bool,
-        is_urine_positive: bool,
-        status_tangkap: str
-    ) -> Dict[str, Any]:
-        
-        result = {
-            "rekomendasi": "",
-            "tipe": "",
-            "alasan": [],
-            "status_warna": "grey",
-            "urgency": "Normal",
-            "derajat_ketergantungan": ""
-        }
-
-        # Hitung Derajat Ketergantungan (Terminologi Form BNN)
-        severity = TATLogicEngine.get_addiction_severity(dsm5_count, assist_risk)
-        result["derajat_ketergantungan"] = severity
-
-        # 1. CEK KEDARURATAN MEDIS (PRIORITAS TERTINGGI - DUTY OF CARE)
-        # FIX: Renamed suicide_risk to suicide_risk_level to match argument name
-        if suicide_risk_level >= 4 or asam_scores.get(1, 0) >= 3 or asam_scores.get(2, 0) >= 3:
-            result.update({
-                "rekomendasi": "REHABILITASI RAWAT INAP (MEDIS/PSIKIATRIS SEGERA)",
-                "tipe": "Medis", "status_warna": "red", "urgency": "IMMEDIATE",
-                "alasan": ["🚨 INDIKASI GAWAT DARURAT: Risiko bunuh diri tinggi atau Komplikasi Medis.",
-                           "Wajib intervensi medis segera (Stabilisasi) sebelum proses hukum lanjut."]
-            })
-            return result
-
-        # 2. FILTER HUKUM (SEMA 4/2010)
-        # SEMA Poin 3c: Harus Urine Positif
-        urine_flag = not is_urine_positive
-        legal_flags = TATLogicEngine.check_legal_red_flags(bb_amount, bb_limit, peran, is_residivis, urine_flag)
-        
-        # SEMA Poin 3a: Tertangkap Tangan (Pertimbangan Hakim)
-        if status_tangkap != "Tertangkap Tangan":
-            result["alasan"].append("ℹ️ Catatan: Status bukan 'Tertangkap Tangan' (Pertimbangan Hakim SEMA Poin 3a).")
 
-        if legal_flags:
-            # Jika ada pelanggaran hukum (BB Lebih / Bandar / Urine Negatif)
-            
-            # Cek Pasal 103 (Dual Track) -> Hanya jika BB lebih TAPI dia pecandu berat & Urine Positif
-            can_dual_track = (severity == "BERAT") and (is_urine_positive) and (peran == "Pengguna")
-            
-            if can_dual_track and bb_amount > bb_limit:
-                 result.update({
-                    "rekomendasi": "PROSES HUKUM (+ REKOMENDASI REHABILITASI PASAL 103)",
-                    "tipe": "Dual Track", "status_warna": "orange",
-                    "alasan": legal_flags + [
-                        f"⚠️ Klien terkonfirmasi Pecandu {severity}.",
-                        "Disarankan penerapan UU 35/2009 Pasal 103 (Vonis Rehab di Lapas/Lembaga)."
-                    ]
-                })
-            else:
-                # Murni Pidana
-                result.update({
-                    "rekomendasi": "PROSES HUKUM (PIDANA PENJARA)",
-                    "tipe": "Hukum", "status_warna": "red",
-                    "alasan": legal_flags + ["❌ Tidak memenuhi kriteria rehabilitasi SEMA 4/2010."]
-                })
-            return result
-
-        # 3. PENENTUAN LEVEL REHABILITASI (JIKA LOLOS FILTER HUKUM)
-        # Juknis BNN: Rawat Inap untuk Ketergantungan Berat / Masalah Sosial / Medis
-        
-        need_inpatient = False
-        reasons_rehab = []
-
-        # Cek Indikasi Rawat Inap
-        if severity == "BERAT":
-            need_inpatient = True
-            reasons_rehab.append(f"✓ Derajat Ketergantungan: {severity}.")
-        if asam_scores.get(5, 0) >= 3:
-            need_inpatient = True
-            reasons_rehab.append("✓ Potensi Relapse Tinggi (ASAM D5).")
-        if asam_scores.get(6, 0) >= 3:
-            need_inpatient = True
-            reasons_rehab.append("✓ Lingkungan tidak mendukung pemulihan (ASAM D6).")
-
-        if need_inpatient:
-            result.update({
-                "rekomendasi": "REHABILITASI RAWAT INAP",
-                "tipe": "Medis", "status_warna": "blue",
-                "alasan": ["✓ Memenuhi syarat SEMA (BB Aman, Urine Positif, Bukan Jaringan)."] + reasons_rehab
-            })
-        else:
-            result.update({
-                "rekomendasi": "REHABILITASI RAWAT JALAN",
-                "tipe": "Medis", "status_warna": "green",
-                "alasan": [
-                    "✓ Memenuhi syarat SEMA (BB Aman, Urine Positif).",
-                    f"✓ Derajat Ketergantungan: {severity}.",
-                    "✓ Lingkungan/Fungsi Sosial cukup stabil."
-                ]
-            })
-
-        return result
+def debug_enabled() -> bool:
+    """Panel debug tampil lewat ?debug=1, hanya bila server berjalan dengan TAT_DEBUG=1."""
+    return debug_allowed() and st.query_params.get("debug") == "1"
 
 # =============================================================================
 # 3. UI COMPONENTS (FRONTEND)
@@ -241,6 +83,68 @@ class TATUI:
             st.divider()
             st.info("Pastikan dokumen BAP dan Hasil Lab tersedia sebelum memulai.")
 
+    @staticmethod
+    def render_debug_panel(run: Optional[tat_metrics.RerunTimings] = None):
+        if not debug_enabled():
+            return
+        with st.sidebar:
+            st.divider()
+            with st.expander("🛠️ Debug", expanded=True):
+                info = asam_radar_figure.cache_info()
+                lookups = info.hits + info.misses
+                st.caption("Cache figure radar ASAM (lintas sesi)")
+                c1, c2 = st.columns(2)
+                c1.metric("Hit", f"{info.hits:,}")
+                c2.metric("Miss", f"{info.misses:,}")
+                st.caption(f"Hit rate {info.hits / lookups:.0%} · {info.currsize:,}/{info.maxsize:,} entri"
+                           if lookups else f"Belum ada lookup · kapasitas {info.maxsize:,} entri")
+
+                if run is None:
+                    return
+                # Waktu hot path: rerun ini (thread sesi ini) + agregat proses
+                profile_text = run.stop_profile()
+                elapsed = run.elapsed()
+                hot = sum(total for name, (_, total) in run.timings.items() if name.startswith("TATUI."))
+                st.caption(f"Rerun penuh ini: {elapsed * 1000:.1f} ms · hot path UI {hot * 1000:.1f} ms · "
+                           f"sisa (Streamlit & lainnya) {(elapsed - hot) * 1000:.1f} ms")
+                rows = []
+                for name, (count, total, worst) in sorted(tat_metrics.REGISTRY.snapshot().items()):
+                    this_run = run.timings.get(name)
+                    rows.append({
+                        "Hot path": name,
+                        "Rerun ini (ms)": round(this_run[1] * 1000, 2) if this_run else None,
+                        "Panggilan": count,
+                        "Rata-rata (ms)": round(total / count * 1000, 3),
+                        "Maks (ms)": round(worst * 1000, 2),
+                    })
+                if rows:
+                    st.table(rows)
+                if tat_metrics.METRICS_FILE:
+                    st.caption(f"Metrik Prometheus: {tat_metrics.METRICS_FILE}")
+                if profile_text:
+                    st.caption("cProfile rerun ini (waktu kumulatif):")
+                    st.code(profile_text, language=None)
+                else:
+                    st.caption("Tambahkan &profile=1 pada URL untuk cProfile satu rerun.")
+
+    @staticmethod
+    def render_history(store: Optional[CaseStore]):
+        if store is None:
+            return
+        with st.sidebar:
+            st.divider()
+            st.header("📚 Riwayat Asesmen")
+            today = datetime.now().date().isoformat()
+            try:
+                st.metric("Total Tersimpan", f"{store.count():,}")
+                totals = store.totals(start=today, end=today)
+            except sqlite3.Error as exc:
+                st.caption(f"Riwayat tidak tersedia: {exc}")
+                return
+            st.caption("Hari ini:")
+            for rekomendasi, jumlah in totals.items():
+                st.markdown(f"- {rekomendasi}: **{jumlah}**")
+
     @staticmethod
     def input_section_legal():
         st.markdown("### ⚖️ 1. Parameter Hukum & Bukti")
@@ -311,7 +215,7 @@ class TATUI:
         return dsm_count, asam_scores, assist_risk, suicide_risk
 
     @staticmethod
-    def render_results(decision: Dict, inputs: Dict):
+    def render_results(decision: Mapping, inputs: Dict):
         st.divider()
         st.header("📊 HASIL ANALISIS")
         
@@ -336,84 +240,197 @@ class TATUI:
         
         with col2:
             st.subheader("📈 Profil ASAM")
-            df_asam = pd.DataFrame({
-                'Dimensi': [f"D{k}" for k in inputs['asam_scores'].keys()],
-                'Score': list(inputs['asam_scores'].values())
-            })
-            fig = px.line_polar(df_asam, r='Score', theta='Dimensi', line_close=True, range_r=[0,4])
-            fig.update_traces(fill='toself')
-            st.plotly_chart(fig, use_container_width=True)
+            scores = tuple(inputs['asam_scores'].get(k, 0) for k in ASAM_DIMENSIONS)
+            st.plotly_chart(asam_radar_figure(scores), use_container_width=True)
+
+        TATUI.render_sensitivity(inputs)
 
     @staticmethod
-    def render_report(decision: Dict, inputs: Dict):
+    def render_sensitivity(inputs: Dict):
+        """Titik ubah rekomendasi per input (analitis dari ambang aturan) dan heatmap what-if 2D."""
+        with st.expander("🎯 Sensitivitas Keputusan (What-If)"):
+            st.caption("Perubahan satu input (input lain tetap) yang mengubah rekomendasi, "
+                       "diturunkan langsung dari ambang aturan.")
+            rows = [
+                {"Input": tat_sensitivity.AXIS_LABELS[axis.axis], "Nilai Sekarang": str(axis.current),
+                 "Titik Ubah": f"{bp['op']} {bp['nilai']}", "Rekomendasi Menjadi": bp["menjadi"]}
+                for axis in tat_sensitivity.sweep(inputs).values() for bp in axis.breakpoints()
+            ]
+            if rows:
+                st.dataframe(rows, hide_index=True, width="stretch")
+            else:
+                st.info("Tidak ada perubahan satu input yang mengubah rekomendasi.")
+
+            axes = tat_sensitivity.GRID_AXES
+            col1, col2 = st.columns(2)
+            with col1: x_axis = st.selectbox("Sumbu X", axes, 0, format_func=tat_sensitivity.AXIS_LABELS.get, key="whatif_x")
+            with col2: y_axis = st.selectbox("Sumbu Y", axes, 1, format_func=tat_sensitivity.AXIS_LABELS.get, key="whatif_y")
+            if x_axis == y_axis:
+                st.warning("Pilih dua input yang berbeda.")
+                return
+            xv, yv, z = tat_sensitivity.outcome_grid(inputs, x_axis, y_axis)
+            current = tat_sensitivity.case_columns(inputs)
+            st.plotly_chart(outcome_heatmap_figure(
+                xv, yv, z, tat_sensitivity.AXIS_LABELS[x_axis], tat_sensitivity.AXIS_LABELS[y_axis],
+                (current[x_axis], current[y_axis]), log_x=x_axis == "bb_amount", log_y=y_axis == "bb_amount",
+            ), width="stretch")
+
+    @staticmethod
+    def render_report(decision: Mapping, inputs: Dict):
         st.header("🖨️ LAPORAN ASESMEN TERPADU")
         st.info("Salin teks di bawah ini untuk Berita Acara atau Laporan Resmi.")
         
-        # Generate Text Report
-        tgl = datetime.now().strftime("%d %B %Y")
-        report_text = f"""
-LAPORAN HASIL ASESMEN TERPADU (TAT)
-BADAN NARKOTIKA NASIONAL
-============================================================
-Tanggal Pemeriksaan : {tgl}
-Nama Terperiksa     : {inputs['nama']}
-Usia                : {inputs['usia']} Tahun
-
-A. DATA HUKUM & BARANG BUKTI
-------------------------------------------------------------
-1. Jenis Narkotika   : {inputs.get('jenis_narkotika', '-')}
-2. Berat Barang Bukti: {inputs['bb_amount']} gram
-   (Batas SEMA No. 4/2010: {inputs['bb_limit']} gram)
-3. Status BB         : {'MELEBIHI BATAS' if inputs['bb_amount'] > inputs['bb_limit'] else 'DI BAWAH BATAS (Memenuhi Syarat)'}
-4. Peran Tersangka   : {inputs['peran']}
-5. Status Residivis  : {'Ya' if inputs['is_residivis'] else 'Tidak'}
-6. Status Urine      : {'Positif' if inputs.get('is_urine_positive', True) else 'Negatif'}
-
-B. DATA KLINIS & MEDIS
-------------------------------------------------------------
-1. Derajat Ketergantungan : {decision['derajat_ketergantungan']}
-2. Diagnosis DSM-5        : {inputs['dsm_count']} Kriteria Terpenuhi
-3. Profil ASAM            :
-   - D1 (Intoksikasi) : {inputs['asam_scores'][1]}
-   - D2 (Biomedis)    : {inputs['asam_scores'][2]}
-   - D3 (Emosional)   : {inputs['asam_scores'][3]}
-   - D4 (Motivasi)    : {inputs['asam_scores'][4]}
-   - D5 (Relapse)     : {inputs['asam_scores'][5]}
-   - D6 (Lingkungan)  : {inputs['asam_scores'][6]}
-
-C. REKOMENDASI TIM ASESMEN TERPADU
-------------------------------------------------------------
-KESIMPULAN:
->> {decision['rekomendasi']} <<
-
-DASAR PERTIMBANGAN:
-{chr(10).join(['- ' + r for r in decision['alasan']])}
-
-D. CATATAN TAMBAHAN
-------------------------------------------------------------
-Prioritas: {decision.get('urgency', 'Normal Priority')}
-
-============================================================
-Dicetak melalui Sistem Pendukung Keputusan TAT v4.1
-(Alat bantu ini bukan pengganti keputusan klinis/hukum final)
-"""
+        # Template laporan dipakai bersama dengan laporan massal (tat_reports)
+        tgl = format_tanggal()
+        report_text = render_report_text(inputs, decision, tgl)
         st.text_area("Draft Laporan", report_text, height=400)
         
         st.download_button(
             label="💾 Download Laporan (.txt)",
             data=report_text,
             file_name=f"Laporan_TAT_{inputs['nama']}_{tgl}.txt",
-            mime="text/plain"
+            mime="text/plain",
+            on_click="ignore"  # unduhan tidak perlu memicu rerun
         )
 
+    @staticmethod
+    def render_bulk_reports(store: Optional[CaseStore]):
+        """Satu unduhan ZIP berisi laporan semua asesmen riwayat dalam rentang tanggal (lihat bulk_export_enabled)."""
+        if store is None or not bulk_export_enabled():
+            return
+        with st.expander("📦 Laporan Massal dari Riwayat (ZIP)"):
+            today = datetime.now().date()
+            col1, col2 = st.columns(2)
+            with col1: start = st.date_input("Dari Tanggal", today, key="bulk_start")
+            with col2: end = st.date_input("Sampai Tanggal", today, key="bulk_end")
+            start, end = start.isoformat(), end.isoformat()
+            try:
+                jumlah = sum(store.totals(start=start, end=end).values())
+            except sqlite3.Error as exc:
+                st.caption(f"Riwayat tidak tersedia: {exc}")
+                return
+            st.caption(f"{jumlah:,} asesmen dalam rentang ini.")
+
+            def build_zip():
+                # Dijalankan saat tombol diklik; yang ditahan hanya ZIP terkompresi (~1 KB per laporan)
+                out = io.BytesIO()
+                frames = store.iter_cases("tanggal >= ? AND tanggal <= ?", [start, end], batch_size=5_000)
+                write_report_zip(out, frames, stored_codes=True, rules=store.get_rules)
+                out.seek(0)
+                return out
+
+            st.download_button(
+                label="📦 Download Semua Laporan (.zip)",
+                data=build_zip,
+                file_name=f"Laporan_TAT_{start}_{end}.zip",
+                mime="application/zip",
+                disabled=jumlah == 0,
+                on_click="ignore"
+            )
+
+            if importlib.util.find_spec("pyarrow") is None:
+                return  # pyarrow opsional: ekspor analitik hanya tersedia bila terpasang
+
+            def build_parquet():
+                # Satu berkas Parquet (zstd, kolom kategori ber-dictionary) untuk pandas/DuckDB/Spark
+                from tat_export import write_analytics
+                out = io.BytesIO()
+                frames = store.iter_cases("tanggal >= ? AND tanggal <= ?", [start, end], batch_size=50_000)
+                write_analytics(out, frames, stored_codes=True, fmt="parquet")
+                out.seek(0)
+                return out
+
+            st.download_button(
+                label="📊 Ekspor Analitik (.parquet)",
+                data=build_parquet,
+                file_name=f"Analitik_TAT_{start}_{end}.parquet",
+                mime="application/vnd.apache.parquet",
+                disabled=jumlah == 0,
+                on_click="ignore"
+            )
+
 # =============================================================================
 # 4. MAIN CONTROLLER
 # =============================================================================
 
-def main():
+@st.cache_resource
+def get_case_store() -> Optional[CaseStore]:
+    """Satu koneksi riwayat (SQLite WAL) per proses server; None bila DB tidak dapat dibuka."""
+    try:
+        return CaseStore(DEFAULT_DB_PATH)
+    except sqlite3.Error:
+        return None
+
+
+@st.fragment
+def input_fragment(store: Optional[CaseStore]):
+    with st.form("tat_form"):
+        col1, col2 = st.columns(2)
+        with col1: nama = st.text_input("Nama Klien")
+        with col2: usia = st.number_input("Usia", 10, 80, 25)
+
+        st.divider()
+        jenis_narkotika, limit, bb_amount, peran, residivis, is_urine_pos, status_tangkap = TATUI.input_section_legal()
+        
+        st.divider()
+        dsm_count, asam_scores, assist_risk, suicide_risk = TATUI.input_section_medical()
+
+        submitted = st.form_submit_button("🔍 ANALISIS SEKARANG", type="primary", use_container_width=True)
+
+        if submitted:
+            # Hasil terkode (CompactResult); teks alasan baru dirender di tab Hasil/Laporan
+            decision = TATLogicEngine.determine_recommendation_compact(
+                asam_scores=asam_scores, dsm5_count=dsm_count,
+                suicide_risk_level=suicide_risk, assist_risk=assist_risk,
+                bb_amount=bb_amount, bb_limit=limit, peran=peran,
+                is_residivis=residivis, is_urine_positive=is_urine_pos,
+                status_tangkap=status_tangkap
+            )
+            
+            st.session_state['analyzed'] = True
+            st.session_state['decision'] = decision
+            st.session_state['inputs'] = {
+                'nama': nama, 'usia': usia, 
+                'jenis_narkotika': jenis_narkotika, # Ditambahkan
+                'bb_amount': bb_amount, 'bb_limit': limit,
+                'peran': peran, 'is_residivis': residivis, 
+                'is_urine_positive': is_urine_pos, # Ditambahkan
+                'asam_scores': asam_scores, 'dsm_count': dsm_count,
+                'assist_risk': assist_risk, 'suicide_risk_level': suicide_risk,
+                'status_tangkap': status_tangkap
+            }
+            if store is not None:
+                try:
+                    store.save_assessment(st.session_state['inputs'], decision)
+                except sqlite3.Error as exc:
+                    st.toast(f"Asesmen tidak tersimpan ke riwayat: {exc}", icon="⚠️")
+            # Rerun seluruh app (bukan hanya fragment ini) agar tab Hasil/Laporan & sidebar ikut diperbarui
+            st.rerun(scope="app")
+
+
+@st.fragment
+def results_fragment():
+    if st.session_state['analyzed']:
+        TATUI.render_results(st.session_state['decision'], st.session_state['inputs'])
+    else:
+        st.info("Silakan isi data dan klik Analisis pada tab Input Data.")
+
+
+@st.fragment
+def report_fragment():
+    if st.session_state['analyzed']:
+        TATUI.render_report(st.session_state['decision'], st.session_state['inputs'])
+    else:
+        st.info("Laporan akan tersedia setelah analisis dilakukan.")
+    TATUI.render_bulk_reports(get_case_store())
+
+
+def render_page(run: Optional[tat_metrics.RerunTimings]):
     TATUI.render_css()
     TATUI.render_header()
     TATUI.render_sidebar()
+    store = get_case_store()
+    TATUI.render_history(store)
 
     if 'analyzed' not in st.session_state:
         st.session_state['analyzed'] = False
@@ -422,52 +439,39 @@ def main():
 
     tab_input, tab_result, tab_report = st.tabs(["📝 Input Data", "📊 Hasil Analisis", "🖨️ Laporan Resmi"])
 
+    # Setiap tab adalah fragment: interaksi di dalamnya hanya menjalankan ulang tab tersebut
     with tab_input:
-        with st.form("tat_form"):
-            col1, col2 = st.columns(2)
-            with col1: nama = st.text_input("Nama Klien")
-            with col2: usia = st.number_input("Usia", 10, 80, 25)
-
-            st.divider()
-            jenis_narkotika, limit, bb_amount, peran, residivis, is_urine_pos, status_tangkap = TATUI.input_section_legal()
-            
-            st.divider()
-            dsm_count, asam_scores, assist_risk, suicide_risk = TATUI.input_section_medical()
-
-            submitted = st.form_submit_button("🔍 ANALISIS SEKARANG", type="primary", use_container_width=True)
-
-            if submitted:
-                decision = TATLogicEngine.determine_recommendation(
-                    asam_scores=asam_scores, dsm5_count=dsm_count,
-                    suicide_risk_level=suicide_risk, assist_risk=assist_risk,
-                    bb_amount=bb_amount, bb_limit=limit, peran=peran,
-                    is_residivis=residivis, is_urine_positive=is_urine_pos,
-                    status_tangkap=status_tangkap
-                )
-                
-                st.session_state['analyzed'] = True
-                st.session_state['decision'] = decision
-                st.session_state['inputs'] = {
-                    'nama': nama, 'usia': usia, 
-                    'jenis_narkotika': jenis_narkotika, # Ditambahkan
-                    'bb_amount': bb_amount, 'bb_limit': limit,
-                    'peran': peran, 'is_residivis': residivis, 
-                    'is_urine_positive': is_urine_pos, # Ditambahkan
-                    'asam_scores': asam_scores, 'dsm_count': dsm_count
-                }
-                st.rerun()
+        input_fragment(store)
 
     with tab_result:
-        if st.session_state['analyzed']:
-            TATUI.render_results(st.session_state['decision'], st.session_state['inputs'])
-        else:
-            st.info("Silakan isi data dan klik Analisis pada tab Input Data.")
+        results_fragment()
 
     with tab_report:
-        if st.session_state['analyzed']:
-            TATUI.render_report(st.session_state['decision'], st.session_state['inputs'])
-        else:
-            st.info("Laporan akan tersedia setelah analisis dilakukan.")
+        report_fragment()
+
+    # Terakhir, agar statistik mencakup render pada rerun ini
+    TATUI.render_debug_panel(run)
+
+
+def main():
+    st.set_page_config(
+        page_title="TAT DSS v4.1",
+        page_icon="⚖️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # Instrumentasi proses hanya dari konfigurasi server; query param pengunjung tidak mengaktifkannya
+    if debug_allowed() or tat_metrics.env_enabled():
+        tat_metrics.enable()
+    if not tat_metrics.enabled():
+        render_page(None)
+        return
+
+    # TATUI dibuat ulang setiap rerun (skrip utama dieksekusi ulang), jadi timer dipasang per rerun
+    tat_metrics.instrument(TATUI, tat_metrics.UI_HOT_PATHS, "TATUI")
+    with tat_metrics.rerun_scope(profile=debug_enabled() and st.query_params.get("profile") == "1") as run:
+        render_page(run)
 
 if __name__ == "__main__":
     main()
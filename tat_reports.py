@@ -0,0 +1,280 @@
+"""
+=================================================================================
+TAT DSS - LAPORAN HASIL ASESMEN TERPADU (TUNGGAL & MASSAL)
+=================================================================================
+Satu template laporan untuk TATUI.render_report dan pembuatan laporan massal.
+Template dikompilasi sekali saat import menjadi format-string `%` + urutan field,
+sehingga merender satu laporan hanya berupa satu operasi `%` atas tuple nilai.
+
+Jalur massal memakai kolom batch: kode hasil (tat_batch.evaluate_codes atau kode
+yang tersimpan di tat_store) dan teks alasan (render_alasan, di-memo per kombinasi
+kode) dihitung per chunk, lalu setiap laporan langsung ditulis sebagai entri ZIP.
+Yang berada di memori hanya satu chunk kasus, bukan seluruh laporan.
+
+    python tat_cli.py reports kasus.csv -o laporan.zip
+    python tat_cli.py reports --store tat_cases.db --start 2025-12-01 -o laporan.zip
+=================================================================================
+"""
+
+import re
+import zipfile
+from datetime import date, datetime
+from functools import lru_cache
+from operator import itemgetter
+from string import Formatter
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from tat_results import OUTCOME_FIELDS, OUTCOME_ORDER, SEVERITY_LEVELS
+
+REPORT_DATE_FORMAT = "%d %B %Y"
+ZIP_COMPRESSLEVEL = 6
+
+REPORT_TEMPLATE = """
+LAPORAN HASIL ASESMEN TERPADU (TAT)
+BADAN NARKOTIKA NASIONAL
+============================================================
+Tanggal Pemeriksaan : {tanggal}
+Nama Terperiksa     : {nama}
+Usia                : {usia} Tahun
+
+A. DATA HUKUM & BARANG BUKTI
+------------------------------------------------------------
+1. Jenis Narkotika   : {jenis_narkotika}
+2. Berat Barang Bukti: {bb_amount} gram
+   (Batas SEMA No. 4/2010: {bb_limit} gram)
+3. Status BB         : {status_bb}
+4. Peran Tersangka   : {peran}
+5. Status Residivis  : {residivis}
+6. Status Urine      : {urine}
+
+B. DATA KLINIS & MEDIS
+------------------------------------------------------------
+1. Derajat Ketergantungan : {derajat_ketergantungan}
+2. Diagnosis DSM-5        : {dsm_count} Kriteria Terpenuhi
+3. Profil ASAM            :
+   - D1 (Intoksikasi) : {asam_d1}
+   - D2 (Biomedis)    : {asam_d2}
+   - D3 (Emosional)   : {asam_d3}
+   - D4 (Motivasi)    : {asam_d4}
+   - D5 (Relapse)     : {asam_d5}
+   - D6 (Lingkungan)  : {asam_d6}
+
+C. REKOMENDASI TIM ASESMEN TERPADU
+------------------------------------------------------------
+KESIMPULAN:
+>> {rekomendasi} <<
+
+DASAR PERTIMBANGAN:
+{alasan}
+
+D. CATATAN TAMBAHAN
+------------------------------------------------------------
+Prioritas: {urgency}
+
+============================================================
+Dicetak melalui Sistem Pendukung Keputusan TAT v4.1
+(Alat bantu ini bukan pengganti keputusan klinis/hukum final)
+"""
+
+STATUS_BB_TEXT = ("DI BAWAH BATAS (Memenuhi Syarat)", "MELEBIHI BATAS")
+
+
+class CompiledTemplate:
+    """Template `{field}` yang diurai sekali menjadi format `%s` + urutan field."""
+
+    def __init__(self, template: str):
+        parts, fields = [], []
+        for literal, field, spec, conv in Formatter().parse(template):
+            parts.append(literal.replace("%", "%%"))
+            if field is not None:
+                if spec or conv:
+                    raise ValueError(f"Field template harus polos: {{{field}}}")
+                parts.append("%s")
+                fields.append(field)
+        self.template = template
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._format = "".join(parts)
+        self._values = itemgetter(*fields)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        return self._format % self._values(values)
+
+    def render_tuple(self, values: Tuple[Any, ...]) -> str:
+        """Render dari tuple yang sudah berurutan sesuai `fields` (jalur massal)."""
+        return self._format % values
+
+
+REPORT = CompiledTemplate(REPORT_TEMPLATE)
+
+
+def format_tanggal(value: Union[None, str, date] = None) -> str:
+    """Tanggal laporan; None = hari ini, str = ISO YYYY-MM-DD (kolom `tanggal` tat_store)."""
+    if value is None:
+        value = datetime.now()
+    elif isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.strftime(REPORT_DATE_FORMAT)
+
+
+def report_fields(inputs: Mapping[str, Any], decision: Mapping[str, Any], tanggal: str) -> Dict[str, Any]:
+    """Nilai template untuk satu asesmen UI (st.session_state['inputs'] + hasil Logic Engine)."""
+    asam = inputs['asam_scores']
+    return {
+        'tanggal': tanggal, 'nama': inputs['nama'], 'usia': inputs['usia'],
+        'jenis_narkotika': inputs.get('jenis_narkotika', '-'),
+        'bb_amount': inputs['bb_amount'], 'bb_limit': inputs['bb_limit'],
+        'status_bb': STATUS_BB_TEXT[inputs['bb_amount'] > inputs['bb_limit']],
+        'peran': inputs['peran'],
+        'residivis': 'Ya' if inputs['is_residivis'] else 'Tidak',
+        'urine': 'Positif' if inputs.get('is_urine_positive', True) else 'Negatif',
+        'derajat_ketergantungan': decision['derajat_ketergantungan'],
+        'dsm_count': inputs['dsm_count'],
+        **{f'asam_d{d}': asam[d] for d in range(1, 7)},
+        'rekomendasi': decision['rekomendasi'],
+        'alasan': "\n".join('- ' + r for r in decision['alasan']),
+        'urgency': decision.get('urgency', 'Normal Priority'),
+    }
+
+
+def render_report_text(inputs: Mapping[str, Any], decision: Mapping[str, Any], tanggal: Optional[str] = None) -> str:
+    """Teks "Laporan Hasil Asesmen Terpadu" untuk satu kasus (dipakai TATUI.render_report)."""
+    return REPORT.render(report_fields(inputs, decision, tanggal or format_tanggal()))
+
+
+def report_filename(nama: Any, tanggal: str, nomor: Optional[int] = None) -> str:
+    """Nama berkas laporan; `nomor` (id kasus / nomor baris) menjaga nama unik di dalam ZIP."""
+    aman = re.sub(r"[^\w.-]+", "_", str(nama or "")).strip("._") or "tanpa_nama"
+    prefix = f"{nomor:06d}_" if nomor is not None else ""
+    return f"{prefix}Laporan_TAT_{aman}_{tanggal}.txt"
+
+# =============================================================================
+# JALUR MASSAL
+# =============================================================================
+
+def _text_values(frame: Any, column: str, default: str, integer: bool = False) -> List[Any]:
+    """Kolom opsional sebagai list Python; NULL/NaN menjadi `default`.
+
+    integer=True mengembalikan float bulat ke int (kolom INTEGER ber-NULL dibaca pandas sebagai float).
+    """
+    if column not in frame:
+        return [default] * len(frame)
+    out = []
+    for v in frame[column].tolist():
+        if v is None or v != v:  # None / NaN
+            out.append(default)
+        elif integer and isinstance(v, float):
+            out.append(int(v))
+        else:
+            out.append(v)
+    return out
+
+
+RulesLookup = Callable[[str], Any]  # versi aturan -> RuleSet (atau None), mis. CaseStore.get_rules
+
+
+def _alasan_by_version(codes: Dict[str, Any], cols: Dict[str, Any], versions: List[Any],
+                       rules: RulesLookup) -> Any:
+    """Teks alasan per baris dengan ambang versi aturan (`rules_version`) baris itu.
+
+    Versi kosong atau tidak terdaftar memakai aturan aktif, sama seperti CaseStore.result.
+    """
+    import numpy as np
+
+    from tat_batch import render_alasan
+
+    def thresholds(version: Optional[str]) -> Optional[Dict[str, float]]:
+        found = rules(version) if version is not None else None
+        return found.thresholds if found is not None else None
+
+    versions = [v if isinstance(v, str) else None for v in versions]  # NULL sqlite / NaN pandas
+    index = {v: i for i, v in enumerate(dict.fromkeys(versions))}
+    if len(index) == 1:
+        return render_alasan(codes, cols, thresholds=thresholds(versions[0]))
+    keys = np.fromiter((index[v] for v in versions), dtype=np.int64, count=len(versions))
+    alasan = np.empty(len(versions), dtype=object)
+    for version, i in index.items():
+        rows = np.flatnonzero(keys == i)
+        alasan[rows] = render_alasan({k: codes[k][rows] for k in ("outcome", "severity", "reason_bits")},
+                                     {k: cols[k][rows] for k in ("bb_amount", "bb_limit", "peran_code")},
+                                     thresholds=thresholds(version))
+    return alasan
+
+
+def iter_reports(frame: Any, codes: Optional[Dict[str, Any]] = None,
+                 thresholds: Optional[Dict[str, float]] = None,
+                 rules: Optional[RulesLookup] = None) -> Iterator[Tuple[str, str]]:
+    """(nama berkas, teks laporan) per baris DataFrame kasus berkolom tat_batch.BATCH_COLUMNS.
+
+    `codes` = kode hasil yang sudah ada (mis. kolom outcome/severity/reason_bits dari
+    tat_store); bila None dihitung dengan evaluate_codes. Kolom opsional: nama, usia,
+    jenis_narkotika, tanggal (ISO), id. Teks identik dengan render_report_text.
+    `rules` (mis. CaseStore.get_rules) + kolom rules_version: teks alasan riwayat memakai
+    ambang aturan saat keputusan itu dihitung, bukan aturan aktif.
+    """
+    from tat_batch import encode_columns, evaluate_codes, render_alasan
+
+    if len(frame) == 0:
+        return
+    cols = encode_columns(frame)
+    if codes is None:
+        codes = evaluate_codes(cols, thresholds=thresholds)
+    if rules is not None and "rules_version" in frame:
+        alasan = _alasan_by_version(codes, cols, frame["rules_version"].tolist(), rules)
+    else:
+        alasan = render_alasan(codes, cols, thresholds=thresholds)
+
+    # Teks per kode dihitung sekali per kombinasi, bukan per baris
+    outcome_text = [(OUTCOME_FIELDS[k]["rekomendasi"], OUTCOME_FIELDS[k]["urgency"]) for k in OUTCOME_ORDER]
+    joined: Dict[tuple, str] = {}
+    tanggal_text: Dict[Any, str] = {}
+    today = format_tanggal()
+
+    bb, limit = cols["bb_amount"].tolist(), cols["bb_limit"].tolist()
+    # Nomor unik di dalam ZIP: id riwayat, atau nomor baris input (index chunk tat_cli bersifat global)
+    nomor = frame["id"].tolist() if "id" in frame else (frame.index + 1).tolist()
+    rows = zip(
+        nomor, _text_values(frame, "tanggal", ""), _text_values(frame, "nama", "-"),
+        _text_values(frame, "usia", "-", integer=True), _text_values(frame, "jenis_narkotika", "-"),
+        bb, limit, frame["peran"].tolist(), cols["is_residivis"].tolist(), cols["is_urine_positive"].tolist(),
+        codes["severity"].tolist(), cols["dsm5_count"].tolist(),
+        *(cols[f"asam_d{d}"].tolist() for d in range(1, 7)),
+        codes["outcome"].tolist(), alasan,
+    )
+    for (no, tgl_iso, nama, usia, jenis, b, lim, peran, residivis, urine, sev, dsm,
+         d1, d2, d3, d4, d5, d6, k, reasons) in rows:
+        tgl = tanggal_text.get(tgl_iso)
+        if tgl is None:
+            tgl = tanggal_text[tgl_iso] = format_tanggal(tgl_iso) if tgl_iso else today
+        key = tuple(reasons)
+        text = joined.get(key)
+        if text is None:
+            text = joined[key] = "\n".join('- ' + r for r in reasons)
+        rekomendasi, urgency = outcome_text[k]
+        values = (tgl, nama, usia, jenis, b, lim, STATUS_BB_TEXT[b > lim], peran,
+                  'Ya' if residivis else 'Tidak', 'Positif' if urine else 'Negatif',
+                  SEVERITY_LEVELS[sev], dsm, d1, d2, d3, d4, d5, d6, rekomendasi, text, urgency)
+        yield report_filename(nama, tgl_iso or date.today().isoformat(), no), REPORT.render_tuple(values)
+
+
+def write_report_zip(target: Union[str, BinaryIO], frames: Iterable[Any], stored_codes: bool = False,
+                     compresslevel: int = ZIP_COMPRESSLEVEL, rules: Optional[RulesLookup] = None) -> int:
+    """Tulis laporan setiap baris `frames` (iterable DataFrame) ke ZIP secara streaming.
+
+    Setiap laporan langsung menjadi satu entri ZIP; `target` boleh path atau file-like
+    (termasuk stream tanpa seek, mis. stdout). stored_codes=True memakai kolom
+    outcome/severity/reason_bits yang ada di frame (riwayat tat_store) alih-alih
+    mengevaluasi ulang; `rules` (CaseStore.get_rules) membuat teks alasannya mengikuti
+    rules_version tiap baris. Kembalikan jumlah laporan.
+    """
+    if rules is not None:
+        rules = lru_cache(maxsize=None)(rules)  # satu lookup per versi untuk seluruh ZIP, bukan per chunk
+    total = 0
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for frame in frames:
+            codes = None
+            if stored_codes:
+                codes = {c: frame[c].to_numpy() for c in ("outcome", "severity", "reason_bits")}
+            for name, text in iter_reports(frame, codes=codes, rules=rules):
+                zf.writestr(name, text)
+                total += 1
+    return total
@@ -0,0 +1,197 @@
+"""
+=================================================================================
+TAT DSS - COMPACT RESULT REPRESENTATION
+=================================================================================
+Representasi hasil terkode: jenis rekomendasi (enum), derajat ketergantungan dan
+bitmask kode alasan, plus bb/limit/peran yang dibutuhkan untuk teks. Teks `alasan`
+(termasuk f-string BB) hanya dirender saat diminta, misalnya oleh
+TATUI.render_results / render_report.
+
+Modul ini juga menjadi katalog tunggal teks rekomendasi & alasan untuk jalur batch
+dan tabel terkompilasi. Tanpa dependensi NumPy/pandas.
+=================================================================================
+"""
+
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Optional
+
+from tat_core import RULE_THRESHOLDS
+
+
+class Rekomendasi(IntEnum):
+    """Kode rekomendasi (urutan sama dengan kolom `outcome` pada jalur batch)."""
+    DARURAT = 0
+    DUAL_TRACK = 1
+    PIDANA = 2
+    RAWAT_INAP = 3
+    RAWAT_JALAN = 4
+
+
+OUTCOME_ORDER = ("darurat", "dual_track", "pidana", "rawat_inap", "rawat_jalan")
+LEGAL_OUTCOMES = (Rekomendasi.DUAL_TRACK, Rekomendasi.PIDANA)
+
+OUTCOME_FIELDS = {
+    "darurat": {"rekomendasi": "REHABILITASI RAWAT INAP (MEDIS/PSIKIATRIS SEGERA)",
+                "tipe": "Medis", "status_warna": "red", "urgency": "IMMEDIATE"},
+    "dual_track": {"rekomendasi": "PROSES HUKUM (+ REKOMENDASI REHABILITASI PASAL 103)",
+                   "tipe": "Dual Track", "status_warna": "orange", "urgency": "Normal"},
+    "pidana": {"rekomendasi": "PROSES HUKUM (PIDANA PENJARA)",
+               "tipe": "Hukum", "status_warna": "red", "urgency": "Normal"},
+    "rawat_inap": {"rekomendasi": "REHABILITASI RAWAT INAP",
+                   "tipe": "Medis", "status_warna": "blue", "urgency": "Normal"},
+    "rawat_jalan": {"rekomendasi": "REHABILITASI RAWAT JALAN",
+                    "tipe": "Medis", "status_warna": "green", "urgency": "Normal"},
+}
+
+# Catatan: catatan 'Tertangkap Tangan' pada jalur skalar selalu tertimpa result.update(),
+# sehingga tidak pernah muncul di alasan akhir. Jalur terkode mengikuti perilaku tersebut.
+LEGAL_FLAG_TEXT = (
+    "⛔ Barang bukti ({bb}g) melebihi batas SEMA ({limit}g).",
+    "⛔ Barang bukti sangat besar (>{kelipatan}x SEMA) - Indikasi Kuat Pengedar.",
+    "⛔ Peran tersangka terindikasi sebagai {peran}.",
+    "⚠️ Hasil Tes Urine NEGATIF (Tidak memenuhi syarat SEMA Poin 3c, kecuali ada riwayat medis valid).",
+    "⚠️ Status Residivis (Pemberatan).",
+)
+
+ALASAN_TEXT = {
+    "darurat": ("🚨 INDIKASI GAWAT DARURAT: Risiko bunuh diri tinggi atau Komplikasi Medis.",
+                "Wajib intervensi medis segera (Stabilisasi) sebelum proses hukum lanjut."),
+    "dual_track": ("⚠️ Klien terkonfirmasi Pecandu {severity}.",
+                   "Disarankan penerapan UU 35/2009 Pasal 103 (Vonis Rehab di Lapas/Lembaga)."),
+    "pidana": ("❌ Tidak memenuhi kriteria rehabilitasi SEMA 4/2010.",),
+    "rawat_inap": ("✓ Memenuhi syarat SEMA (BB Aman, Urine Positif, Bukan Jaringan).",),
+    "inap_berat": "✓ Derajat Ketergantungan: BERAT.",
+    "inap_d5": "✓ Potensi Relapse Tinggi (ASAM D5).",
+    "inap_d6": "✓ Lingkungan tidak mendukung pemulihan (ASAM D6).",
+    "rawat_jalan": ("✓ Memenuhi syarat SEMA (BB Aman, Urine Positif).",
+                    "✓ Derajat Ketergantungan: {severity}.",
+                    "✓ Lingkungan/Fungsi Sosial cukup stabil."),
+}
+
+SEVERITY_LEVELS = ("RINGAN", "SEDANG", "BERAT")
+ASSIST_LEVELS = ("Low", "Moderate", "High")
+PERAN_LEVELS = ("Pengguna", "Kurir", "Pengedar", "Bandar")
+
+# Bitmask kode alasan: 5 flag hukum sesuai urutan check_legal_red_flags + indikasi rawat inap
+FLAG_OVER_LIMIT, FLAG_SINDIKAT, FLAG_PERAN, FLAG_URINE_NEG, FLAG_RESIDIVIS = 1, 2, 4, 8, 16
+FLAG_D5, FLAG_D6 = 32, 64
+LEGAL_FLAG_BITS = (FLAG_OVER_LIMIT, FLAG_SINDIKAT, FLAG_PERAN, FLAG_URINE_NEG, FLAG_RESIDIVIS)
+FLAG_NAMES = {
+    FLAG_OVER_LIMIT: "BB_MELEBIHI_SEMA", FLAG_SINDIKAT: "INDIKASI_SINDIKAT", FLAG_PERAN: "PERAN_JARINGAN",
+    FLAG_URINE_NEG: "URINE_NEGATIF", FLAG_RESIDIVIS: "RESIDIVIS", FLAG_D5: "ASAM_D5_TINGGI", FLAG_D6: "ASAM_D6_TINGGI",
+}
+
+
+def alasan_text(outcome: int, severity: int, bits: int, bb: float, limit: float, peran_code: int,
+                kelipatan: Optional[float] = None) -> List[str]:
+    """Render alasan satu kasus dari kode; teks identik dengan jalur skalar."""
+    kategori = OUTCOME_ORDER[outcome]
+    if kategori == "darurat":
+        return list(ALASAN_TEXT["darurat"])
+    if kategori in ("dual_track", "pidana"):
+        # Urutan sama dengan check_legal_red_flags
+        kelipatan = RULE_THRESHOLDS["kelipatan_sindikat"] if kelipatan is None else kelipatan
+        peran = PERAN_LEVELS[peran_code] if peran_code >= 0 else ""
+        flags = [tpl.format(bb=bb, limit=limit, peran=peran, kelipatan=kelipatan)
+                 for tpl, bit in zip(LEGAL_FLAG_TEXT, LEGAL_FLAG_BITS) if bits & bit]
+        return flags + [r.format(severity=SEVERITY_LEVELS[severity]) for r in ALASAN_TEXT[kategori]]
+    if kategori == "rawat_inap":
+        alasan = list(ALASAN_TEXT["rawat_inap"])
+        if severity == 2: alasan.append(ALASAN_TEXT["inap_berat"])
+        if bits & FLAG_D5: alasan.append(ALASAN_TEXT["inap_d5"])
+        if bits & FLAG_D6: alasan.append(ALASAN_TEXT["inap_d6"])
+        return alasan
+    return [r.format(severity=SEVERITY_LEVELS[severity]) for r in ALASAN_TEXT["rawat_jalan"]]
+
+
+class CompactResult:
+    """Hasil determine_recommendation dalam bentuk terkode (~160 byte vs ~380 byte dict per hasil).
+
+    Mendukung akses gaya dict (`decision['rekomendasi']`, `decision.get('urgency')`) sehingga
+    dapat langsung dipakai TATUI; `alasan` dirender saat diakses dari kode + `kelipatan`
+    sindikat yang berlaku saat hasil dibuat (bukan RULE_THRESHOLDS saat dibaca).
+    """
+
+    __slots__ = ("outcome", "severity", "reason_bits", "peran_code", "bb_amount", "bb_limit", "kelipatan")
+
+    FIELDS = ("rekomendasi", "tipe", "alasan", "status_warna", "urgency", "derajat_ketergantungan")
+
+    def __init__(self, outcome: int, severity: int, reason_bits: int, peran_code: int,
+                 bb_amount: float, bb_limit: float, kelipatan: Optional[float] = None):
+        self.outcome = outcome
+        self.severity = severity
+        self.reason_bits = reason_bits
+        self.peran_code = peran_code
+        self.bb_amount = bb_amount
+        self.bb_limit = bb_limit
+        # Snapshot ambang saat evaluasi agar teks alasan tidak ikut berubah bila aturan diganti
+        self.kelipatan = RULE_THRESHOLDS["kelipatan_sindikat"] if kelipatan is None else kelipatan
+
+    @property
+    def kode(self) -> Rekomendasi:
+        return Rekomendasi(self.outcome)
+
+    @property
+    def rekomendasi(self) -> str:
+        return OUTCOME_FIELDS[OUTCOME_ORDER[self.outcome]]["rekomendasi"]
+
+    @property
+    def tipe(self) -> str:
+        return OUTCOME_FIELDS[OUTCOME_ORDER[self.outcome]]["tipe"]
+
+    @property
+    def status_warna(self) -> str:
+        return OUTCOME_FIELDS[OUTCOME_ORDER[self.outcome]]["status_warna"]
+
+    @property
+    def urgency(self) -> str:
+        return OUTCOME_FIELDS[OUTCOME_ORDER[self.outcome]]["urgency"]
+
+    @property
+    def derajat_ketergantungan(self) -> str:
+        return SEVERITY_LEVELS[self.severity]
+
+    @property
+    def alasan(self) -> List[str]:
+        return alasan_text(self.outcome, self.severity, self.reason_bits, self.bb_amount, self.bb_limit,
+                           self.peran_code, self.kelipatan)
+
+    @property
+    def reason_codes(self) -> List[str]:
+        """Nama kode alasan yang aktif pada bitmask."""
+        return [name for bit, name in FLAG_NAMES.items() if self.reason_bits & bit]
+
+    # Akses gaya dict (kompatibel dengan hasil determine_recommendation)
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Bentuk dict penuh, identik dengan TATLogicEngine.determine_recommendation."""
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def _key(self) -> tuple:
+        return (self.outcome, self.severity, self.reason_bits, self.peran_code, self.bb_amount, self.bb_limit,
+                self.kelipatan)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactResult):
+            return self._key() == other._key()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CompactResult({self.kode.name}, {self.derajat_ketergantungan}, reason_bits={self.reason_bits:#04x})"
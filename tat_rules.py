@@ -0,0 +1,216 @@
+"""
+=================================================================================
+TAT DSS - VERSIONED RULE SETS & DIFF RE-EVALUATION
+=================================================================================
+Satu RuleSet = snapshot GRAMATUR_LIMITS + RULE_THRESHOLDS dengan versi stabil
+(sha1 isi aturan). Setiap baris di tat_store mencatat `rules_version` saat
+keputusannya terakhir dihitung.
+
+Saat aturan berubah, reevaluate() tidak menjalankan ulang seluruh riwayat. Setiap
+input hanya memengaruhi keputusan lewat perbandingan dengan ambang, jadi sebuah
+baris hanya dapat berubah bila minimal satu perbandingan berbeda antara aturan
+lama dan baru:
+
+    ASAM / DSM / C-SSRS  : (kolom >= ambang_lama) != (kolom >= ambang_baru)
+    kelipatan_sindikat   : (bb > limit x k_lama) != (bb > limit x k_baru)
+    batas gramatur zat Z : hanya baris jenis_narkotika = Z dengan
+                           (limit > 0), (bb > limit) atau (bb > limit x k) berubah
+
+Predikat tersebut dibangun per versi lama sebagai klausa SQL, hanya baris
+kandidat yang dibaca dan dievaluasi ulang (tat_batch.evaluate_codes dengan
+`thresholds` baru), lalu keputusan yang berubah dilaporkan sebagai flip.
+
+    python tat_cli.py reevaluate --store tat_cases.db --set kelipatan_sindikat=10 --dry-run
+    python tat_cli.py reevaluate --store tat_cases.db     # terapkan aturan aktif tat_core
+=================================================================================
+"""
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from tat_core import GRAMATUR_LIMITS, RULE_THRESHOLDS
+
+# Ambang -> kolom input yang dibandingkan dengan `kolom >= ambang` (lihat evaluate_codes)
+THRESHOLD_COLUMNS = {
+    "dsm_berat": ("dsm5_count",),
+    "dsm_sedang": ("dsm5_count",),
+    "cssrs_darurat": ("suicide_risk_level",),
+    "asam_darurat": ("asam_d1", "asam_d2"),
+    "asam_rawat_inap": ("asam_d5", "asam_d6"),
+}
+REEVAL_BATCH_SIZE = 50_000
+
+
+class RuleSet:
+    """Snapshot aturan (ambang + batas gramatur) dengan versi deterministik."""
+
+    def __init__(self, thresholds: Mapping[str, float], limits: Mapping[str, float]):
+        self.thresholds = dict(thresholds)
+        self.limits = dict(limits)
+
+    @classmethod
+    def current(cls) -> "RuleSet":
+        """Aturan yang aktif di proses ini (RULE_THRESHOLDS + GRAMATUR_LIMITS)."""
+        return cls(RULE_THRESHOLDS, GRAMATUR_LIMITS)
+
+    @classmethod
+    def from_json(cls, thresholds_json: str, limits_json: str) -> "RuleSet":
+        return cls(json.loads(thresholds_json), json.loads(limits_json))
+
+    def to_json(self) -> Tuple[str, str]:
+        return (json.dumps(self.thresholds, sort_keys=True, ensure_ascii=False),
+                json.dumps(self.limits, sort_keys=True, ensure_ascii=False))
+
+    @property
+    def version(self) -> str:
+        """12 digit heksadesimal sha1 isi aturan; sama di semua proses dan mesin."""
+        return hashlib.sha1("\n".join(self.to_json()).encode("utf-8")).hexdigest()[:12]
+
+    def with_changes(self, thresholds: Optional[Mapping[str, float]] = None,
+                     limits: Optional[Mapping[str, float]] = None) -> "RuleSet":
+        unknown = set(thresholds or {}) - set(self.thresholds)
+        if unknown:
+            raise ValueError(f"Ambang tidak dikenal: {', '.join(sorted(unknown))}")
+        return RuleSet({**self.thresholds, **(thresholds or {})}, {**self.limits, **(limits or {})})
+
+    def diff(self, other: "RuleSet") -> Dict[str, Dict[str, Tuple[Any, Any]]]:
+        """Perubahan self -> other: {"thresholds": {nama: (lama, baru)}, "limits": {zat: (lama, baru)}}."""
+        def changed(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+            return {k: (a.get(k), b.get(k)) for k in sorted(set(a) | set(b)) if a.get(k) != b.get(k)}
+        return {"thresholds": changed(self.thresholds, other.thresholds), "limits": changed(self.limits, other.limits)}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RuleSet) and (self.thresholds, self.limits) == (other.thresholds, other.limits)
+
+    def __repr__(self) -> str:
+        return f"RuleSet({self.version})"
+
+
+def affected_predicate(old: RuleSet, new: RuleSet) -> Tuple[str, List[Any]]:
+    """Klausa SQL (atas tabel cases) untuk baris yang keputusannya mungkin berubah old -> new.
+
+    Superset yang eksak: baris di luar predikat dijamin menghasilkan kode yang sama.
+    Perbandingan bb memakai `bb_limit` tersimpan di baris (snapshot saat evaluasi).
+    """
+    clauses, params = [], []
+    t_old, t_new = old.thresholds, new.thresholds
+    for name, columns in THRESHOLD_COLUMNS.items():
+        if t_old[name] != t_new[name]:
+            for col in columns:
+                clauses.append(f"(({col} >= ?) != ({col} >= ?))")
+                params += [t_old[name], t_new[name]]
+    k_old, k_new = t_old["kelipatan_sindikat"], t_new["kelipatan_sindikat"]
+    if k_old != k_new:
+        clauses.append("(bb_limit > 0 AND ((bb_amount > bb_limit * ?) != (bb_amount > bb_limit * ?)))")
+        params += [k_old, k_new]
+    for jenis, (_, limit) in old.diff(new)["limits"].items():
+        if limit is None:
+            continue  # zat dihapus dari tabel: baris lama dibiarkan dengan snapshot limitnya
+        clauses.append(
+            "(jenis_narkotika = ? AND ((bb_limit > 0) != (? > 0) OR (bb_amount > bb_limit) != (bb_amount > ?)"
+            " OR (bb_amount > bb_limit * ?) != (bb_amount > ? * ?)))"
+        )
+        params += [jenis, limit, limit, k_old, limit, k_new]
+    return (" OR ".join(clauses) if clauses else "0"), params
+
+
+class ReevalReport:
+    """Ringkasan satu re-evaluasi: jumlah kandidat, baris yang berubah, dan daftar flip rekomendasi."""
+
+    def __init__(self, new_version: str, full: bool, dry_run: bool):
+        self.new_version = new_version
+        self.full = full
+        self.dry_run = dry_run
+        self.total_rows = 0
+        self.candidates = 0
+        self.changed = 0   # kode hasil (outcome / severity / reason_bits) atau bb_limit berubah
+        self.flips: List[Dict[str, Any]] = []
+        self.seconds = 0.0
+        self.from_versions: Dict[str, int] = {}
+
+    def flip_summary(self) -> Dict[Tuple[str, str], int]:
+        summary: Dict[Tuple[str, str], int] = {}
+        for f in self.flips:
+            key = (f["dari"], f["menjadi"])
+            summary[key] = summary.get(key, 0) + 1
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "new_version": self.new_version, "full": self.full, "dry_run": self.dry_run,
+            "total_rows": self.total_rows, "candidates": self.candidates, "changed": self.changed,
+            "flips": len(self.flips), "seconds": round(self.seconds, 3), "from_versions": self.from_versions,
+            "flip_summary": [{"dari": a, "menjadi": b, "jumlah": n} for (a, b), n in self.flip_summary().items()],
+        }
+
+
+def reevaluate(store: Any, new: Optional[RuleSet] = None, full: bool = False, dry_run: bool = False,
+               batch_size: int = REEVAL_BATCH_SIZE) -> ReevalReport:
+    """Bawa riwayat di `store` (tat_store.CaseStore) ke aturan `new` (default: aturan aktif).
+
+    full=True mengevaluasi ulang semua baris (pembanding / verifikasi predikat diff).
+    dry_run=True hanya menghitung laporan tanpa menulis ke store.
+
+    Menulis hanya diizinkan untuk aturan aktif (RuleSet.current()): riwayat tidak boleh
+    dipindah ke aturan yang tidak dijalankan Logic Engine, karena asesmen berikutnya akan
+    memakai aturan berbeda dari riwayat. Aturan lain hanya dapat disimulasikan (dry_run).
+    """
+    import pandas as pd
+    from tat_batch import BATCH_COLUMNS, encode_columns, evaluate_codes
+    from tat_store import outcome_label
+
+    active = RuleSet.current()
+    new = new or active
+    if not dry_run:
+        if new != active:
+            raise ValueError(
+                f"Aturan {new.version} berbeda dari aturan aktif {active.version}; gunakan dry-run, "
+                "atau ubah RULE_THRESHOLDS/GRAMATUR_LIMITS di tat_core lalu evaluasi ulang dengan aturan aktif"
+            )
+        new = active  # versi tersimpan harus sama persis dengan yang dicatat asesmen baru (mis. 15 vs 15.0)
+    report = ReevalReport(new.version, full, dry_run)
+    t0 = time.perf_counter()
+    if not dry_run:
+        store.register_rules(new)
+
+    report.total_rows = store.count()
+    for version, n_rows in store.rules_versions().items():
+        if version == new.version:
+            continue
+        report.from_versions[version or "-"] = n_rows
+        where, params = ("rules_version IS NULL", []) if version is None else ("rules_version = ?", [version])
+        # Versi lama tidak dikenal (baris pra-skema v2) atau full -> semua baris versi itu kandidat
+        old = None if full else store.get_rules(version)
+        if old is not None:
+            predicate, pred_params = affected_predicate(old, new)
+            where, params = f"{where} AND ({predicate})", params + pred_params
+
+        for frame in store.iter_cases(where, params, batch_size):
+            report.candidates += len(frame)
+            known = frame["jenis_narkotika"].isin(list(new.limits))
+            cases = frame.assign(bb_limit=frame["bb_limit"].where(~known, frame["jenis_narkotika"].map(new.limits)))
+            codes = evaluate_codes(encode_columns(cases[list(BATCH_COLUMNS)]), thresholds=new.thresholds)
+            outcome, severity, bits = codes["outcome"], codes["severity"], codes["reason_bits"]
+            diff = ((outcome != frame["outcome"].to_numpy()) | (severity != frame["severity"].to_numpy())
+                    | (bits != frame["reason_bits"].to_numpy()) | (cases["bb_limit"] != frame["bb_limit"]).to_numpy())
+            report.changed += int(diff.sum())
+            flipped = outcome != frame["outcome"].to_numpy()
+            if flipped.any():
+                moved = frame.loc[flipped, ["id", "tanggal", "jenis_narkotika", "peran", "outcome"]]
+                for rec, k_new in zip(moved.to_dict("records"), outcome[flipped].tolist()):
+                    report.flips.append({
+                        "id": rec["id"], "tanggal": rec["tanggal"], "jenis_narkotika": rec["jenis_narkotika"],
+                        "peran": rec["peran"], "versi_lama": version, "versi_baru": new.version,
+                        "dari": outcome_label(rec["outcome"]), "menjadi": outcome_label(k_new),
+                    })
+            if not dry_run:
+                store.update_results(pd.DataFrame({
+                    "id": frame["id"].to_numpy(), "tanggal": frame["tanggal"].to_numpy(),
+                    "jenis_narkotika": frame["jenis_narkotika"].to_numpy(),
+                    "old_outcome": frame["outcome"].to_numpy(), "outcome": outcome, "severity": severity,
+                    "reason_bits": bits, "bb_limit": cases["bb_limit"].to_numpy(),
+                }), new.version)
+    report.seconds = time.perf_counter() - t0
+    return report
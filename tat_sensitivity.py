@@ -0,0 +1,296 @@
+"""
+=================================================================================
+TAT DSS - SENSITIVITY / WHAT-IF
+=================================================================================
+"Berapa barang bukti, atau perubahan ASAM apa, yang mengubah rekomendasi ini?"
+
+Logic Engine hanya membandingkan input dengan ambang, sehingga keputusan sepanjang
+satu sumbu input (input lain tetap) konstan per potongan. Titik potongnya diturunkan
+langsung dari struktur aturan, bukan dari sampling:
+
+    bb_amount           : bb > bb_limit, bb > bb_limit x kelipatan_sindikat
+    asam_d1 / asam_d2   : >= asam_darurat
+    asam_d5 / asam_d6   : >= asam_rawat_inap
+    dsm5_count          : >= dsm_sedang, >= dsm_berat
+    suicide_risk_level  : >= cssrs_darurat
+    assist_risk, peran, is_residivis, is_urine_positive : setiap level
+
+Cukup satu evaluasi per potongan (satu panggilan evaluate_codes untuk semua sumbu)
+untuk mengetahui rekomendasi di seluruh sumbu; titik ubah (breakpoint) adalah batas
+antar-potongan yang rekomendasinya (dan dengan itu `tipe`) berbeda.
+
+outcome_grid() mengevaluasi grid 2D dua sumbu secara vectorized untuk heatmap di
+tab Hasil; kolom dibangun langsung dalam bentuk terkode (tanpa pandas).
+
+    from tat_sensitivity import sweep
+    for axis in sweep(case).values():
+        for bp in axis.breakpoints():
+            print(bp["keterangan"])
+=================================================================================
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tat_core import ASAM_DIMENSIONS, RULE_THRESHOLDS
+from tat_results import ASSIST_LEVELS, OUTCOME_FIELDS, OUTCOME_ORDER, PERAN_LEVELS
+from tat_rules import THRESHOLD_COLUMNS
+from tat_store import outcome_label
+
+# Domain sumbu bilangan bulat (sama dengan widget input TATUI)
+INTEGER_DOMAINS = {
+    **{f"asam_d{d}": (0, 4) for d in ASAM_DIMENSIONS},
+    "dsm5_count": (0, 11),
+    "suicide_risk_level": (0, 5),
+}
+CATEGORICAL_AXES = {
+    "assist_risk": ASSIST_LEVELS,
+    "peran": PERAN_LEVELS,
+    "is_residivis": (False, True),
+    "is_urine_positive": (False, True),
+}
+AXIS_LABELS = {
+    "bb_amount": "Barang Bukti (gram)",
+    **{f"asam_d{d}": f"ASAM D{d} ({name})" for d, name in ASAM_DIMENSIONS.items()},
+    "dsm5_count": "Kriteria DSM-5",
+    "suicide_risk_level": "C-SSRS",
+    "assist_risk": "Risiko ASSIST",
+    "peran": "Peran Tersangka",
+    "is_residivis": "Residivis",
+    "is_urine_positive": "Urine Positif",
+}
+GRID_AXES = ("bb_amount", "dsm5_count", "suicide_risk_level") + tuple(f"asam_d{d}" for d in ASAM_DIMENSIONS)
+GRID_BB_POINTS = 160
+
+
+def case_columns(case: Mapping[str, Any]) -> Dict[str, Any]:
+    """Satu kasus -> nilai per kolom tat_batch.BATCH_COLUMNS.
+
+    Menerima argumen determine_recommendation (asam_scores, dsm5_count, ...), inputs UI
+    (dsm_count) maupun baris batch datar (asam_d1..asam_d6).
+    """
+    asam = case.get("asam_scores")
+    cols = {f"asam_d{d}": int(asam.get(d, 0) if asam is not None else case.get(f"asam_d{d}", 0))
+            for d in ASAM_DIMENSIONS}
+    cols.update({
+        "dsm5_count": int(case.get("dsm5_count", case.get("dsm_count", 0))),
+        "suicide_risk_level": int(case.get("suicide_risk_level", 0)),
+        "assist_risk": case.get("assist_risk", "Low"),
+        "bb_amount": float(case["bb_amount"]),
+        "bb_limit": float(case["bb_limit"]),
+        "peran": case["peran"],
+        "is_residivis": bool(case.get("is_residivis", False)),
+        "is_urine_positive": bool(case.get("is_urine_positive", True)),
+    })
+    return cols
+
+
+def _encoded(base: Mapping[str, Any], n: int, overrides: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Kolom terkode untuk evaluate_codes: `base` diulang n kali, kolom di `overrides` diganti.
+
+    assist_risk / peran boleh di-override dengan label; dikodekan seperti encode_columns.
+    """
+    cols: Dict[str, np.ndarray] = {}
+    for c in INTEGER_DOMAINS:
+        cols[c] = np.full(n, base[c], dtype=np.int64)
+    for c in ("bb_amount", "bb_limit"):
+        cols[c] = np.full(n, base[c], dtype=np.float64)
+    for c in ("is_residivis", "is_urine_positive"):
+        cols[c] = np.full(n, base[c], dtype=bool)
+    cols["assist_code"] = np.full(n, _code(base["assist_risk"], ASSIST_LEVELS), dtype=np.int8)
+    cols["peran_code"] = np.full(n, _code(base["peran"], PERAN_LEVELS), dtype=np.int8)
+    for c, values in overrides.items():
+        if c == "assist_risk":
+            cols["assist_code"] = np.array([_code(v, ASSIST_LEVELS) for v in values], dtype=np.int8)
+        elif c == "peran":
+            cols["peran_code"] = np.array([_code(v, PERAN_LEVELS) for v in values], dtype=np.int8)
+        else:
+            cols[c] = np.asarray(values, dtype=cols[c].dtype)
+    return cols
+
+
+def _code(label: Any, levels: Tuple[str, ...]) -> int:
+    return levels.index(label) if label in levels else -1
+
+
+def integer_cuts(axis: str, thresholds: Optional[Mapping[str, float]] = None) -> List[int]:
+    """Nilai T (di dalam domain) di mana perbandingan `axis >= T` berganti."""
+    t = RULE_THRESHOLDS if thresholds is None else thresholds
+    lo, hi = INTEGER_DOMAINS[axis]
+    cuts = {int(np.ceil(t[name])) for name, columns in THRESHOLD_COLUMNS.items() if axis in columns}
+    return sorted(c for c in cuts if lo < c <= hi)
+
+
+def bb_cuts(bb_limit: float, thresholds: Optional[Mapping[str, float]] = None) -> List[float]:
+    """Nilai X di mana perbandingan `bb > X` berganti (batas SEMA dan kelipatan sindikat)."""
+    t = RULE_THRESHOLDS if thresholds is None else thresholds
+    return sorted({x for x in (bb_limit, bb_limit * t["kelipatan_sindikat"]) if x >= 0})
+
+
+class AxisSweep:
+    """Rekomendasi sepanjang satu sumbu: potongan berurutan dengan outcome konstan.
+
+    Potongan berupa (bawah, atas, outcome). Sumbu bilangan bulat: rentang inklusif
+    [bawah, atas]. bb_amount: bawah < bb <= atas (bawah None = mulai dari 0, atas None =
+    tak terbatas). Sumbu kategori: bawah = atas = level.
+    """
+
+    def __init__(self, axis: str, current: Any, segments: List[Tuple[Any, Any, int]]):
+        self.axis = axis
+        self.current = current
+        self.segments = segments
+
+    @property
+    def kind(self) -> str:
+        if self.axis == "bb_amount":
+            return "kontinu"
+        return "kategori" if self.axis in CATEGORICAL_AXES else "diskrit"
+
+    def outcome_at(self, value: Any) -> int:
+        for lo, hi, outcome in self.segments:
+            if self.kind == "kategori":
+                if value == lo:
+                    return outcome
+            elif self.kind == "kontinu":
+                if (lo is None or value > lo) and (hi is None or value <= hi):
+                    return outcome
+            elif lo <= value <= hi:
+                return outcome
+        raise ValueError(f"{value!r} di luar domain {self.axis}")
+
+    @property
+    def current_outcome(self) -> int:
+        return self.outcome_at(self.current)
+
+    def breakpoints(self) -> List[Dict[str, Any]]:
+        """Titik ubah rekomendasi, urut naik. Sumbu kategori: level lain yang mengubah rekomendasi."""
+        label = AXIS_LABELS[self.axis]
+        points = []
+        if self.kind == "kategori":
+            now = self.current_outcome
+            for level, _, outcome in self.segments:
+                if outcome != now:
+                    points.append({
+                        "axis": self.axis, "op": "=", "nilai": level, "dari": outcome_label(now),
+                        "menjadi": outcome_label(outcome),
+                        "keterangan": f"{label} = {level}: {outcome_label(now)} → {outcome_label(outcome)}",
+                    })
+            return points
+        for (_, below_hi, below), (above_lo, _, above) in zip(self.segments, self.segments[1:]):
+            if below == above:
+                continue
+            if self.kind == "kontinu":
+                op, value = ">", below_hi
+            else:
+                op, value = ">=", above_lo
+            points.append({
+                "axis": self.axis, "op": op, "nilai": value, "dari": outcome_label(below),
+                "menjadi": outcome_label(above),
+                "keterangan": f"{label} {'>' if op == '>' else '≥'} {value}: "
+                              f"{outcome_label(below)} → {outcome_label(above)}",
+            })
+        return points
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "axis": self.axis, "kind": self.kind, "nilai": self.current,
+            "rekomendasi": outcome_label(self.current_outcome),
+            "segmen": [{"bawah": lo, "atas": hi, "rekomendasi": outcome_label(k),
+                        "tipe": OUTCOME_FIELDS[OUTCOME_ORDER[k]]["tipe"]} for lo, hi, k in self.segments],
+            "breakpoints": self.breakpoints(),
+        }
+
+
+def _merge(segments: List[Tuple[Any, Any, int]]) -> List[Tuple[Any, Any, int]]:
+    merged: List[Tuple[Any, Any, int]] = []
+    for lo, hi, outcome in segments:
+        if merged and merged[-1][2] == outcome:
+            merged[-1] = (merged[-1][0], hi, outcome)
+        else:
+            merged.append((lo, hi, outcome))
+    return merged
+
+
+def sweep(case: Mapping[str, Any], thresholds: Optional[Mapping[str, float]] = None,
+          axes: Optional[Sequence[str]] = None) -> Dict[str, AxisSweep]:
+    """Rekomendasi per potongan di setiap sumbu input untuk satu kasus (input lain tetap).
+
+    Semua potongan semua sumbu dievaluasi dalam satu panggilan evaluate_codes.
+    """
+    from tat_batch import evaluate_codes
+
+    base = case_columns(case)
+    axes = list(axes or ("bb_amount", *INTEGER_DOMAINS, *CATEGORICAL_AXES))
+    plan: List[Tuple[str, List[Tuple[Any, Any]], List[Any]]] = []  # (sumbu, batas potongan, nilai wakil)
+    for axis in axes:
+        if axis == "bb_amount":
+            cuts = bb_cuts(base["bb_limit"], thresholds)
+            bounds = list(zip([None] + cuts, cuts + [None]))
+            # Wakil potongan (bawah, atas]: nilai atas (perbandingan ketat >); potongan terakhir: di atasnya
+            reps = [hi if hi is not None else (lo * 2 + 1.0) for lo, hi in bounds]
+        elif axis in INTEGER_DOMAINS:
+            lo, hi = INTEGER_DOMAINS[axis]
+            cuts = integer_cuts(axis, thresholds)
+            bounds = list(zip([lo] + cuts, [c - 1 for c in cuts] + [hi]))
+            reps = [b for b, _ in bounds]
+        elif axis in CATEGORICAL_AXES:
+            bounds = [(level, level) for level in CATEGORICAL_AXES[axis]]
+            reps = list(CATEGORICAL_AXES[axis])
+        else:
+            raise KeyError(f"Sumbu tidak dikenal: {axis}")
+        plan.append((axis, bounds, reps))
+
+    n = sum(len(reps) for _, _, reps in plan)
+    overrides: Dict[str, List[Any]] = {}
+    row = 0
+    for axis, _, reps in plan:
+        column = overrides.setdefault(axis, [base[axis]] * n)
+        column[row:row + len(reps)] = reps
+        row += len(reps)
+    outcome = evaluate_codes(_encoded(base, n, overrides), thresholds=thresholds)["outcome"].tolist()
+
+    result, row = {}, 0
+    for axis, bounds, reps in plan:
+        segments = [(lo, hi, outcome[row + i]) for i, (lo, hi) in enumerate(bounds)]
+        row += len(reps)
+        result[axis] = AxisSweep(axis, base[axis], segments if axis in CATEGORICAL_AXES else _merge(segments))
+    return result
+
+
+def breakpoints(case: Mapping[str, Any], thresholds: Optional[Mapping[str, float]] = None) -> List[Dict[str, Any]]:
+    """Semua titik ubah rekomendasi untuk satu kasus, per sumbu berurutan."""
+    return [bp for axis in sweep(case, thresholds).values() for bp in axis.breakpoints()]
+
+
+def axis_values(case: Mapping[str, Any], axis: str, points: int = GRID_BB_POINTS,
+                thresholds: Optional[Mapping[str, float]] = None) -> np.ndarray:
+    """Nilai grid satu sumbu: seluruh domain bilangan bulat, atau BB geometris yang memuat semua titik potong."""
+    if axis in INTEGER_DOMAINS:
+        lo, hi = INTEGER_DOMAINS[axis]
+        return np.arange(lo, hi + 1)
+    if axis != "bb_amount":
+        raise KeyError(f"Sumbu grid tidak didukung: {axis}")
+    base = case_columns(case)
+    cuts = [c for c in bb_cuts(base["bb_limit"], thresholds) if c > 0]
+    top = max(cuts + [base["bb_amount"], 1.0]) * 2.0
+    bottom = min(cuts + [base["bb_amount"]] if base["bb_amount"] > 0 else cuts or [top / 100.0]) / 10.0
+    values = np.geomspace(bottom, top, points)
+    # Titik potong & nilai sekarang dimasukkan persis agar batas warna tepat di breakpoint
+    extra = cuts + [base["bb_amount"]] + [np.nextafter(c, np.inf) for c in cuts]
+    return np.unique(np.concatenate([values, [x for x in extra if x > 0]]))
+
+
+def outcome_grid(case: Mapping[str, Any], x_axis: str, y_axis: str, x_values: Optional[np.ndarray] = None,
+                 y_values: Optional[np.ndarray] = None,
+                 thresholds: Optional[Mapping[str, float]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Kode outcome (len(y) x len(x), int8) untuk grid dua sumbu, input lain tetap seperti `case`."""
+    from tat_batch import evaluate_codes
+
+    if x_axis == y_axis:
+        raise ValueError("Sumbu x dan y harus berbeda")
+    xv = axis_values(case, x_axis, thresholds=thresholds) if x_values is None else np.asarray(x_values)
+    yv = axis_values(case, y_axis, thresholds=thresholds) if y_values is None else np.asarray(y_values)
+    cols = _encoded(case_columns(case), len(xv) * len(yv), {x_axis: np.tile(xv, len(yv)), y_axis: np.repeat(yv, len(xv))})
+    codes = evaluate_codes(cols, thresholds=thresholds)["outcome"]
+    return xv, yv, codes.reshape(len(yv), len(xv))
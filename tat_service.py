@@ -0,0 +1,378 @@
+"""
+=================================================================================
+TAT DSS - LOCAL ASSESSMENT SERVICE (HTTP/JSON, ASYNCIO)
+=================================================================================
+Layanan lokal untuk sistem manajemen kasus di kantor wilayah. Sepenuhnya offline,
+hanya memakai pustaka standar + Logic Engine versi batch.
+
+    POST /assess         satu kasus (objek JSON)         -> satu hasil
+    POST /assess/batch   daftar kasus (array JSON)       -> daftar hasil
+    GET  /metrics        latensi p50/p99, throughput, ukuran micro-batch
+    GET  /health
+
+Permintaan /assess yang datang bersamaan digabung menjadi micro-batch (maks.
+`max_batch` kasus; terus menampung selama masih ada kedatangan baru, paling lama
+`max_wait_ms` sejak kasus pertama) lalu dievaluasi sekaligus lewat tat_batch.evaluate_codes.
+
+Field kasus: asam_scores {"1": 0, ...} atau asam_d1..asam_d6, dsm5_count,
+suicide_risk_level, assist_risk, bb_amount, bb_limit (atau jenis_narkotika), peran,
+is_residivis, is_urine_positive, status_tangkap.
+
+    python tat_service.py --port 8787
+=================================================================================
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from tat_core import ASAM_DIMENSIONS, GRAMATUR_LIMITS, TATLogicEngine
+from tat_batch import BATCH_COLUMNS, encode_columns, evaluate_codes, render_alasan
+from tat_results import OUTCOME_FIELDS, OUTCOME_ORDER, SEVERITY_LEVELS
+
+MAX_BODY_BYTES = 16 * 2**20
+# Titik impas jalur vectorized vs Logic Engine skalar per baris (diukur, 1 CPU): per baris ~4.8 us,
+# vectorized ~120 us tetap + ~4.0 us/baris -> impas ~160-190 baris. Di bawahnya per baris lebih cepat.
+VECTOR_MIN_ROWS = 160
+# Sama dengan default determine_recommendation (asam_scores.get(d, 0)) dan form UI
+_DEFAULTS = {**{f"asam_d{d}": 0 for d in range(1, 7)}, "is_residivis": False, "is_urine_positive": True,
+             "status_tangkap": "Tertangkap Tangan"}
+# Tipe JSON yang diterima per field (bool bukan angka; "false" bukan bool)
+_INT_FIELDS = tuple(f"asam_d{d}" for d in ASAM_DIMENSIONS) + ("dsm5_count", "suicide_risk_level")
+_FLOAT_FIELDS = ("bb_amount", "bb_limit")
+_BOOL_FIELDS = ("is_residivis", "is_urine_positive")
+_STR_FIELDS = ("assist_risk", "peran", "status_tangkap")
+
+
+class BadRequest(ValueError):
+    pass
+
+# =============================================================================
+# 1. NORMALISASI & EVALUASI
+# =============================================================================
+
+def _asam_dimension(key: Any) -> int:
+    """Kunci asam_scores ("1".."6" dari JSON, atau int) -> nomor dimensi ASAM."""
+    if isinstance(key, str) and key.isdecimal():
+        key = int(key)
+    if isinstance(key, bool) or not isinstance(key, int) or key not in ASAM_DIMENSIONS:
+        raise BadRequest(f"Kunci asam_scores tidak valid: {key!r} (gunakan 1-{len(ASAM_DIMENSIONS)})")
+    return key
+
+
+def _check_types(row: Dict[str, Any]) -> None:
+    """Validasi tipe setiap field kolom batch (in-place: angka bulat bertipe float menjadi int)."""
+    for field in _INT_FIELDS:
+        val = row[field]
+        if isinstance(val, float) and val.is_integer():
+            row[field] = val = int(val)
+        if isinstance(val, bool) or not isinstance(val, int):
+            raise BadRequest(f"{field} harus bilangan bulat, bukan {val!r}")
+    for field in _FLOAT_FIELDS:
+        val = row[field]
+        if isinstance(val, bool) or not isinstance(val, (int, float)) or not math.isfinite(val):
+            raise BadRequest(f"{field} harus angka, bukan {val!r}")
+    for field in _BOOL_FIELDS:
+        if not isinstance(row[field], bool):
+            raise BadRequest(f"{field} harus true/false, bukan {row[field]!r}")
+    for field in _STR_FIELDS:
+        if not isinstance(row[field], str):
+            raise BadRequest(f"{field} harus teks, bukan {row[field]!r}")
+
+
+def normalize_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Terima bentuk argumen determine_recommendation atau kolom batch -> baris kolom batch tervalidasi.
+
+    Tipe yang salah (mis. "false" untuk boolean, asam_scores berupa array) dan kunci ASAM yang
+    tidak valid menjadi BadRequest (HTTP 400), bukan kesalahan evaluasi.
+    """
+    if not isinstance(case, dict):
+        raise BadRequest("Setiap kasus harus berupa objek JSON")
+    row = dict(case)
+    scores = row.pop("asam_scores", None)
+    if scores is not None:
+        if not isinstance(scores, dict):
+            raise BadRequest("asam_scores harus berupa objek JSON {dimensi: skor}")
+        for dim, val in scores.items():
+            row[f"asam_d{_asam_dimension(dim)}"] = val
+    if "bb_limit" not in row and "jenis_narkotika" in row:
+        jenis = row["jenis_narkotika"]
+        if not isinstance(jenis, str) or jenis not in GRAMATUR_LIMITS:
+            raise BadRequest(f"jenis_narkotika tidak dikenal: {jenis!r}")
+        row["bb_limit"] = GRAMATUR_LIMITS[jenis]
+    for key, val in _DEFAULTS.items():
+        row.setdefault(key, val)
+    missing = [c for c in BATCH_COLUMNS if c not in row]
+    if missing:
+        raise BadRequest(f"Field wajib tidak ada: {', '.join(missing)}")
+    _check_types(row)
+    return row
+
+
+def evaluate_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Evaluasi vectorized sekumpulan baris ternormalisasi -> dict hasil (format determine_recommendation).
+
+    Batch kecil dievaluasi per baris dengan Logic Engine skalar karena overhead tetap jalur
+    vectorized (encode_columns + evaluate_codes, ~120 us) baru terbayar mulai ~VECTOR_MIN_ROWS baris.
+    """
+    if len(rows) < VECTOR_MIN_ROWS:
+        return [_evaluate_single(row) for row in rows]
+    try:
+        cols = encode_columns({c: [r[c] for r in rows] for c in BATCH_COLUMNS})
+    except (TypeError, ValueError) as exc:
+        raise BadRequest(f"Nilai field tidak valid: {exc}") from exc
+    codes = evaluate_codes(cols)
+    # Teks alasan di-memo per kombinasi kode (render_alasan); field lain dari katalog per outcome
+    alasan = render_alasan(codes, cols)
+    fields = [OUTCOME_FIELDS[k] for k in OUTCOME_ORDER]
+    return [
+        {**fields[k], "alasan": reasons, "derajat_ketergantungan": SEVERITY_LEVELS[sev]}
+        for k, sev, reasons in zip(codes["outcome"].tolist(), codes["severity"].tolist(), alasan)
+    ]
+
+
+def _evaluate_single(row: Dict[str, Any]) -> Dict[str, Any]:
+    # Tipe sudah divalidasi normalize_case
+    return TATLogicEngine.determine_recommendation(
+        asam_scores={d: row[f"asam_d{d}"] for d in ASAM_DIMENSIONS},
+        dsm5_count=row["dsm5_count"], suicide_risk_level=row["suicide_risk_level"],
+        assist_risk=row["assist_risk"], bb_amount=float(row["bb_amount"]), bb_limit=float(row["bb_limit"]),
+        peran=row["peran"], is_residivis=row["is_residivis"],
+        is_urine_positive=row["is_urine_positive"], status_tangkap=row["status_tangkap"],
+    )
+
+# =============================================================================
+# 2. METRICS & MICRO-BATCHER
+# =============================================================================
+
+class ServiceMetrics:
+    """Penghitung throughput + jendela latensi terbatas (untuk p50/p99)."""
+
+    def __init__(self, window: int = 20_000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.cases = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_cases = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=window)
+        self._recent: Deque[float] = deque(maxlen=window)  # timestamp selesai, untuk req/s terkini
+
+    def observe(self, latency_s: float, cases: int = 1) -> None:
+        self.requests += 1
+        self.cases += cases
+        self.latencies_ms.append(latency_s * 1000.0)
+        self._recent.append(time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+
+        def pct(p: float) -> Optional[float]:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 3) if lat else None
+
+        now = time.monotonic()
+        recent = [t for t in self._recent if now - t <= 10.0]
+        uptime = now - self.started
+        return {
+            "uptime_s": round(uptime, 1),
+            "requests_total": self.requests,
+            "cases_total": self.cases,
+            "errors_total": self.errors,
+            "latency_ms": {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99), "max": pct(1.0), "window": len(lat)},
+            "throughput_rps_10s": round(len(recent) / 10.0, 1),
+            "throughput_rps_avg": round(self.requests / uptime, 1) if uptime else 0.0,
+            "micro_batches_total": self.batches,
+            "micro_batch_avg_size": round(self.batched_cases / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Gabungkan permintaan satu-kasus yang bersamaan menjadi satu evaluasi vectorized."""
+
+    def __init__(self, metrics: ServiceMetrics, max_batch: int = 256, max_wait_ms: float = 2.0):
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch and loop.time() < deadline:
+                # Beri giliran ke koneksi lain yang sudah siap; berhenti menunggu begitu satu
+                # putaran event loop tidak membawa kasus baru (klien tunggal tidak tertahan)
+                await asyncio.sleep(0)
+                if self._queue.empty():
+                    break
+                while not self._queue.empty() and len(batch) < self.max_batch:
+                    batch.append(self._queue.get_nowait())
+            self._evaluate(batch)
+
+    def _evaluate(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        self.metrics.batches += 1
+        self.metrics.batched_cases += len(batch)
+        try:
+            results = evaluate_rows([row for row, _ in batch])
+        except Exception:
+            # Satu kasus rusak tidak boleh menggagalkan kasus lain dalam batch yang sama
+            for row, fut in batch:
+                if not fut.done():
+                    try:
+                        fut.set_result(evaluate_rows([row])[0])
+                    except Exception as exc:  # diteruskan ke handler permintaan masing-masing
+                        fut.set_exception(exc)
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+# =============================================================================
+# 3. HTTP SERVER
+# =============================================================================
+
+class AssessmentService:
+    def __init__(self, max_batch: int = 256, max_wait_ms: float = 2.0):
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(self.metrics, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8787) -> None:
+        self.batcher.start()
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+
+    async def stop(self) -> None:
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self.metrics.errors += 1
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Content-Length tidak valid"}, False)
+                    return
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body terlalu besar"}, False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload = await self._dispatch(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Any]:
+        t0 = time.perf_counter()
+        try:
+            if method == "GET" and path == "/health":
+                return HTTPStatus.OK, {"status": "ok"}
+            if method == "GET" and path == "/metrics":
+                return HTTPStatus.OK, self.metrics.snapshot()
+            if method == "POST" and path == "/assess":
+                result = await self.batcher.submit(normalize_case(json.loads(body or b"null")))
+                self.metrics.observe(time.perf_counter() - t0)
+                return HTTPStatus.OK, result
+            if method == "POST" and path == "/assess/batch":
+                cases = json.loads(body or b"null")
+                if not isinstance(cases, list):
+                    raise BadRequest("Body /assess/batch harus berupa array JSON")
+                results = evaluate_rows([normalize_case(c) for c in cases]) if cases else []
+                self.metrics.observe(time.perf_counter() - t0, cases=len(cases))
+                return HTTPStatus.OK, results
+            return HTTPStatus.NOT_FOUND, {"error": f"Tidak ada endpoint {method} {path}"}
+        except (BadRequest, json.JSONDecodeError) as exc:
+            self.metrics.errors += 1
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:
+            self.metrics.errors += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload: Any, keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8787, max_batch: int = 256, max_wait_ms: float = 2.0) -> None:
+    service = AssessmentService(max_batch=max_batch, max_wait_ms=max_wait_ms)
+    await service.start(host, port)
+    print(f"TAT DSS service aktif di http://{host}:{port} (micro-batch {max_batch}, tunggu {max_wait_ms} ms)")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def build_parser(parser: Optional[argparse.ArgumentParser] = None) -> argparse.ArgumentParser:
+    parser = parser or argparse.ArgumentParser(prog="tat_service", description="TAT DSS - layanan asesmen lokal")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--max-batch", type=int, default=256, help="Ukuran maksimum micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Tunggu maksimum pengisian micro-batch")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,368 @@
+"""
+=================================================================================
+TAT DSS - CASE STORE (SQLITE, WAL)
+=================================================================================
+Penyimpanan lokal riwayat asesmen. Setiap asesmen (dari UI maupun batch) disimpan
+sebagai satu baris `cases` berisi input + hasil terkode (outcome/severity/reason_bits,
+lihat tat_results) sehingga teks alasan selalu dapat dirender ulang, serta versi
+aturan (`rules_version`, lihat tat_rules) yang dipakai saat keputusan dihitung.
+
+Tabel `rollup_harian` (jumlah per tanggal x jenis narkotika x rekomendasi) diperbarui
+secara inkremental di transaksi yang sama dengan insert, sehingga ringkasan tidak
+perlu memindai `cases` berapa pun jumlah riwayatnya.
+
+    store = CaseStore("tat_cases.db")
+    store.save_assessment(inputs, decision)             # satu asesmen UI
+    store.insert_batch(df)                              # hasil batch, transaksi per blok
+    store.totals(start="2025-01-01")                    # dari rollup
+=================================================================================
+"""
+
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from tat_results import OUTCOME_FIELDS, OUTCOME_ORDER, PERAN_LEVELS, CompactResult
+from tat_rules import RuleSet
+
+DEFAULT_DB_PATH = os.environ.get("TAT_DB_PATH", "tat_cases.db")
+SCHEMA_VERSION = 2
+INSERT_BATCH_SIZE = 50_000
+UNKNOWN_SUBSTANCE = "(tidak diketahui)"
+
+CASE_COLUMNS = (
+    "created_at", "tanggal", "sumber", "nama", "usia", "jenis_narkotika", "peran",
+    "asam_d1", "asam_d2", "asam_d3", "asam_d4", "asam_d5", "asam_d6",
+    "dsm5_count", "suicide_risk_level", "assist_risk", "bb_amount", "bb_limit",
+    "is_residivis", "is_urine_positive", "status_tangkap",
+    "outcome", "tipe", "severity", "reason_bits", "rules_version",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id                 INTEGER PRIMARY KEY,
+    created_at         TEXT NOT NULL,
+    tanggal            TEXT NOT NULL,            -- YYYY-MM-DD
+    sumber             TEXT NOT NULL,            -- 'app' / 'batch'
+    nama               TEXT,
+    usia               INTEGER,
+    jenis_narkotika    TEXT NOT NULL,
+    peran              TEXT NOT NULL,
+    asam_d1 INTEGER, asam_d2 INTEGER, asam_d3 INTEGER, asam_d4 INTEGER, asam_d5 INTEGER, asam_d6 INTEGER,
+    dsm5_count         INTEGER,
+    suicide_risk_level INTEGER,
+    assist_risk        TEXT,
+    bb_amount          REAL,
+    bb_limit           REAL,
+    is_residivis       INTEGER,
+    is_urine_positive  INTEGER,
+    status_tangkap     TEXT,
+    outcome            INTEGER NOT NULL,         -- indeks OUTCOME_ORDER (Rekomendasi)
+    tipe               TEXT NOT NULL,            -- Medis / Dual Track / Hukum
+    severity           INTEGER NOT NULL,         -- indeks SEVERITY_LEVELS
+    reason_bits        INTEGER NOT NULL,
+    rules_version      TEXT                      -- RuleSet.version; NULL = sebelum skema v2
+);
+CREATE INDEX IF NOT EXISTS idx_cases_tanggal ON cases (tanggal);
+CREATE INDEX IF NOT EXISTS idx_cases_jenis ON cases (jenis_narkotika, tanggal);
+CREATE INDEX IF NOT EXISTS idx_cases_peran ON cases (peran, tanggal);
+CREATE INDEX IF NOT EXISTS idx_cases_outcome ON cases (outcome, tanggal);
+CREATE INDEX IF NOT EXISTS idx_cases_tipe ON cases (tipe, tanggal);
+
+CREATE TABLE IF NOT EXISTS rule_sets (
+    version    TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    thresholds TEXT NOT NULL,                    -- JSON RULE_THRESHOLDS
+    limits     TEXT NOT NULL                     -- JSON GRAMATUR_LIMITS
+);
+
+CREATE TABLE IF NOT EXISTS rollup_harian (
+    tanggal         TEXT NOT NULL,
+    jenis_narkotika TEXT NOT NULL,
+    outcome         INTEGER NOT NULL,
+    jumlah          INTEGER NOT NULL,
+    PRIMARY KEY (tanggal, jenis_narkotika, outcome)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_ROLLUP = (
+    "INSERT INTO rollup_harian (tanggal, jenis_narkotika, outcome, jumlah) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (tanggal, jenis_narkotika, outcome) DO UPDATE SET jumlah = jumlah + excluded.jumlah"
+)
+
+RollupKey = Tuple[str, str, int]  # (tanggal, jenis_narkotika, outcome)
+
+
+def outcome_label(outcome: int) -> str:
+    return OUTCOME_FIELDS[OUTCOME_ORDER[outcome]]["rekomendasi"]
+
+
+class CaseStore:
+    """Koneksi SQLite (WAL) yang aman dipakai bersama antar-thread Streamlit."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # aman di WAL; fsync saat checkpoint
+            self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB: insert indeks acak pada batch besar
+            self._migrate()
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_rules ON cases (rules_version)")
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._rules: Optional[RuleSet] = None
+
+    def _migrate(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 1:
+            self._conn.execute("ALTER TABLE cases ADD COLUMN rules_version TEXT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "CaseStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Tulis
+    # -------------------------------------------------------------------------
+
+    def _insert_rows(self, rows: List[tuple]) -> None:
+        """Insert + update rollup dalam satu transaksi (dipanggil dengan lock dipegang)."""
+        rollup: Counter = Counter()
+        i_tgl, i_jenis, i_outcome = (CASE_COLUMNS.index(c) for c in ("tanggal", "jenis_narkotika", "outcome"))
+        for row in rows:
+            rollup[(row[i_tgl], row[i_jenis], row[i_outcome])] += 1
+        placeholders = ", ".join("?" * len(CASE_COLUMNS))
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(f"INSERT INTO cases ({', '.join(CASE_COLUMNS)}) VALUES ({placeholders})", rows)
+            self._apply_rollup(rollup)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _apply_rollup(self, delta: Mapping[RollupKey, int]) -> None:
+        self._conn.executemany(_UPSERT_ROLLUP, [(*key, n) for key, n in delta.items() if n])
+        if any(n < 0 for n in delta.values()):
+            self._conn.execute("DELETE FROM rollup_harian WHERE jumlah = 0")
+
+    def _current_rules_version(self) -> str:
+        """Versi aturan aktif, terdaftar di rule_sets (dipanggil dengan lock dipegang)."""
+        rules = RuleSet.current()
+        if rules != self._rules:
+            self._register(rules)
+            self._rules = rules
+        return rules.version
+
+    def _register(self, rules: RuleSet) -> None:
+        self._conn.execute("INSERT OR IGNORE INTO rule_sets VALUES (?, ?, ?, ?)",
+                           (rules.version, datetime.now().isoformat(timespec="seconds"), *rules.to_json()))
+
+    def register_rules(self, rules: RuleSet) -> None:
+        with self._lock:
+            self._register(rules)
+
+    def update_results(self, updates: Any, rules_version: str) -> None:
+        """Tulis hasil re-evaluasi (DataFrame id, tanggal, jenis_narkotika, old_outcome, outcome,
+        severity, reason_bits, bb_limit) + koreksi rollup dalam satu transaksi."""
+        tipe = [OUTCOME_FIELDS[name]["tipe"] for name in OUTCOME_ORDER]
+        outcome = updates["outcome"].tolist()
+        rows = list(zip(outcome, [tipe[k] for k in outcome], updates["severity"].tolist(),
+                        updates["reason_bits"].tolist(), updates["bb_limit"].tolist(),
+                        [rules_version] * len(outcome), updates["id"].tolist()))
+        delta: Counter = Counter()
+        moved = updates[updates["outcome"] != updates["old_outcome"]]
+        for tgl, jenis, old, new in zip(moved["tanggal"].tolist(), moved["jenis_narkotika"].tolist(),
+                                        moved["old_outcome"].tolist(), moved["outcome"].tolist()):
+            delta[(tgl, jenis, old)] -= 1
+            delta[(tgl, jenis, new)] += 1
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE cases SET outcome = ?, tipe = ?, severity = ?, reason_bits = ?, bb_limit = ?, "
+                    "rules_version = ? WHERE id = ?", rows)
+                self._apply_rollup(delta)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save_assessment(self, inputs: Mapping[str, Any], decision: CompactResult,
+                        tanggal: Optional[str] = None, sumber: str = "app") -> int:
+        """Simpan satu asesmen UI (st.session_state['inputs'] + CompactResult); kembalikan id baris."""
+        asam = inputs.get("asam_scores", {})
+        now = datetime.now()
+        row = (
+            now.isoformat(timespec="seconds"), tanggal or now.date().isoformat(), sumber,
+            inputs.get("nama") or None, inputs.get("usia"),
+            inputs.get("jenis_narkotika") or UNKNOWN_SUBSTANCE, inputs["peran"],
+            *(int(asam.get(d, 0)) for d in range(1, 7)),
+            inputs.get("dsm_count", inputs.get("dsm5_count")), inputs.get("suicide_risk_level"),
+            inputs.get("assist_risk"), float(inputs["bb_amount"]), float(inputs["bb_limit"]),
+            int(bool(inputs.get("is_residivis"))), int(bool(inputs.get("is_urine_positive", True))),
+            inputs.get("status_tangkap"),
+            decision.outcome, decision.tipe, decision.severity, decision.reason_bits,
+        )
+        with self._lock:
+            self._insert_rows([row + (self._current_rules_version(),)])
+            return self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def insert_batch(self, cases: Any, codes: Optional[Dict[str, Any]] = None, tanggal: Optional[str] = None,
+                     sumber: str = "batch", batch_size: int = INSERT_BATCH_SIZE) -> int:
+        """Simpan hasil batch (DataFrame kolom BATCH_COLUMNS) dalam transaksi per `batch_size` baris.
+
+        `codes` adalah keluaran tat_batch.evaluate_codes untuk `cases`; bila tidak diberikan
+        dihitung di sini. Kolom opsional: tanggal, jenis_narkotika, nama, usia.
+        """
+        from tat_batch import encode_columns, evaluate_codes
+
+        n = len(cases)
+        if n == 0:
+            return 0
+        cols = encode_columns(cases)
+        codes = codes if codes is not None else evaluate_codes(cols)
+        outcome = codes["outcome"].tolist()
+        tipe = [OUTCOME_FIELDS[OUTCOME_ORDER[k]]["tipe"] for k in range(len(OUTCOME_ORDER))]
+
+        def column(name: str, default: Any) -> List[Any]:
+            if name in cases:
+                return [default if v is None or v != v else v for v in cases[name].tolist()]
+            return [default] * n
+
+        with self._lock:
+            version = self._current_rules_version()
+        created = datetime.now().isoformat(timespec="seconds")
+        tgl = column("tanggal", tanggal or date.today().isoformat())
+        tgl = [str(v)[:10] for v in tgl]
+        rows = zip(
+            [created] * n, tgl, [sumber] * n, column("nama", None), column("usia", None),
+            column("jenis_narkotika", UNKNOWN_SUBSTANCE), [str(v) for v in cases["peran"].tolist()],
+            *(cols[f"asam_d{d}"].tolist() for d in range(1, 7)),
+            cols["dsm5_count"].tolist(), cols["suicide_risk_level"].tolist(),
+            [str(v) for v in cases["assist_risk"].tolist()], cols["bb_amount"].tolist(), cols["bb_limit"].tolist(),
+            cols["is_residivis"].astype(int).tolist(), cols["is_urine_positive"].astype(int).tolist(),
+            [str(v) for v in cases["status_tangkap"].tolist()],
+            outcome, [tipe[k] for k in outcome], codes["severity"].tolist(), codes["reason_bits"].tolist(),
+            [version] * n,
+        )
+        rows = list(rows)
+        with self._lock:
+            for start in range(0, n, batch_size):
+                self._insert_rows(rows[start:start + batch_size])
+        return n
+
+    def rebuild_rollup(self) -> None:
+        """Hitung ulang rollup dari tabel cases (perbaikan/verifikasi; O(n))."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM rollup_harian")
+                self._conn.execute(
+                    "INSERT INTO rollup_harian SELECT tanggal, jenis_narkotika, outcome, COUNT(*) "
+                    "FROM cases GROUP BY tanggal, jenis_narkotika, outcome"
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # -------------------------------------------------------------------------
+    # Baca
+    # -------------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _filters(start: Optional[str], end: Optional[str], **eq: Any) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if start:
+            clauses.append("tanggal >= ?")
+            params.append(start)
+        if end:
+            clauses.append("tanggal <= ?")
+            params.append(end)
+        for col, val in eq.items():
+            if val is not None:
+                clauses.append(f"{col} = ?")
+                params.append(val)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def rollup(self, start: Optional[str] = None, end: Optional[str] = None,
+               jenis_narkotika: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Jumlah per tanggal x jenis narkotika x rekomendasi (dari rollup, tanpa memindai cases)."""
+        where, params = self._filters(start, end, jenis_narkotika=jenis_narkotika)
+        rows = self._query(
+            f"SELECT tanggal, jenis_narkotika, outcome, jumlah FROM rollup_harian{where} "
+            "ORDER BY tanggal, jenis_narkotika, outcome", params)
+        return [{"tanggal": r["tanggal"], "jenis_narkotika": r["jenis_narkotika"],
+                 "rekomendasi": outcome_label(r["outcome"]), "jumlah": r["jumlah"]} for r in rows]
+
+    def totals(self, start: Optional[str] = None, end: Optional[str] = None,
+               jenis_narkotika: Optional[str] = None) -> Dict[str, int]:
+        """Total per rekomendasi untuk rentang tanggal (dari rollup)."""
+        where, params = self._filters(start, end, jenis_narkotika=jenis_narkotika)
+        rows = self._query(f"SELECT outcome, SUM(jumlah) AS n FROM rollup_harian{where} GROUP BY outcome", params)
+        return {outcome_label(r["outcome"]): r["n"] for r in rows}
+
+    def count(self) -> int:
+        return self._query("SELECT COALESCE(SUM(jumlah), 0) FROM rollup_harian")[0][0]
+
+    def history(self, limit: int = 50, start: Optional[str] = None, end: Optional[str] = None,
+                jenis_narkotika: Optional[str] = None, peran: Optional[str] = None,
+                outcome: Optional[int] = None, tipe: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Asesmen terbaru (memakai indeks tanggal / jenis / peran / outcome / tipe)."""
+        where, params = self._filters(start, end, jenis_narkotika=jenis_narkotika, peran=peran,
+                                      outcome=outcome, tipe=tipe)
+        rows = self._query(f"SELECT * FROM cases{where} ORDER BY tanggal DESC, id DESC LIMIT ?", [*params, limit])
+        return [dict(r, rekomendasi=outcome_label(r["outcome"])) for r in rows]
+
+    def rules_versions(self) -> Dict[Optional[str], int]:
+        """Jumlah baris per versi aturan (None = baris sebelum skema v2)."""
+        return {r[0]: r[1] for r in self._query(
+            "SELECT rules_version, COUNT(*) FROM cases GROUP BY rules_version")}
+
+    def get_rules(self, version: Optional[str]) -> Optional[RuleSet]:
+        rows = self._query("SELECT thresholds, limits FROM rule_sets WHERE version = ?", [version])
+        return RuleSet.from_json(rows[0][0], rows[0][1]) if rows else None
+
+    def iter_cases(self, where: str = "1", params: Iterable[Any] = (), batch_size: int = INSERT_BATCH_SIZE):
+        """DataFrame per blok baris `cases` yang memenuhi `where`, urut id (keyset pagination,
+        aman dipakai bersama update_results di antara blok)."""
+        import pandas as pd
+
+        params, last_id = list(params), 0
+        while True:
+            with self._lock:
+                cur = self._conn.execute(
+                    f"SELECT * FROM cases WHERE id > ? AND ({where}) ORDER BY id LIMIT ?",
+                    [last_id, *params, batch_size])
+                names = [d[0] for d in cur.description]
+                rows = cur.fetchall()
+            if not rows:
+                return
+            frame = pd.DataFrame.from_records([tuple(r) for r in rows], columns=names)
+            last_id = int(frame["id"].iat[-1])
+            yield frame
+
+    def result(self, row: Mapping[str, Any]) -> CompactResult:
+        """Baris `cases` -> CompactResult; teks alasan memakai aturan versi `rules_version` baris itu."""
+        peran_code = PERAN_LEVELS.index(row["peran"]) if row["peran"] in PERAN_LEVELS else -1
+        rules = self.get_rules(row["rules_version"]) if row["rules_version"] is not None else None
+        return CompactResult(row["outcome"], row["severity"], row["reason_bits"], peran_code,
+                             row["bb_amount"], row["bb_limit"],
+                             rules.thresholds["kelipatan_sindikat"] if rules is not None else None)
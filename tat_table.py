@@ -0,0 +1,205 @@
+"""
+=================================================================================
+TAT DSS - COMPILED DECISION TABLE
+=================================================================================
+Mode terkompilasi (opsional) untuk Logic Engine. Selain bb_amount semua input
+diskrit dan kecil, dan setiap input hanya memengaruhi keputusan lewat ambang di
+RULE_THRESHOLDS. Ruang input direduksi menjadi kelas per sumbu:
+
+    C-SSRS, ASAM D1, D2, D5, D6 : di bawah / di atas ambang        (2 kelas)
+    DSM-5                       : < sedang / sedang / berat         (3 kelas)
+    ASSIST, Peran               : level yang dikenal + 'lainnya'    (4 / 5 kelas)
+    Residivis, Urine            : boolean                           (2 kelas)
+    Pita BB                     : limit <= 0 (bb <= / > limit), atau
+                                  limit > 0 x (bb > limit) x (bb > k x limit)   (6 pita)
+
+Tabel (46.080 sel, ~135 KB) dibangun sekali dengan mengevaluasi satu kasus
+representatif per sel lewat tat_batch.evaluate_codes, lalu setiap evaluasi menjadi
+satu lookup array berindeks kode terpaket. get_decision_table() membangun ulang
+tabel otomatis bila GRAMATUR_LIMITS atau RULE_THRESHOLDS berubah.
+=================================================================================
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from tat_core import GRAMATUR_LIMITS, RULE_THRESHOLDS
+from tat_batch import assemble_results, encode_columns, evaluate_codes, render_alasan
+from tat_results import (
+    ASSIST_LEVELS, OUTCOME_FIELDS, OUTCOME_ORDER, PERAN_LEVELS, SEVERITY_LEVELS, CompactResult, alasan_text,
+)
+
+# Urutan sumbu dan jumlah kelas (radix) untuk indeks terpaket
+TABLE_AXES = (
+    ("cssrs", 2), ("d1", 2), ("d2", 2), ("dsm", 3), ("assist", len(ASSIST_LEVELS) + 1),
+    ("d5", 2), ("d6", 2), ("peran", len(PERAN_LEVELS) + 1), ("residivis", 2), ("urine", 2), ("bb_band", 6),
+)
+_STRIDES = {}
+_stride = 1
+for _name, _size in reversed(TABLE_AXES):
+    _STRIDES[_name] = _stride
+    _stride *= _size
+TABLE_SIZE = _stride
+
+_ASSIST_INDEX = {label: i + 1 for i, label in enumerate(ASSIST_LEVELS)}
+_PERAN_INDEX = {label: i + 1 for i, label in enumerate(PERAN_LEVELS)}
+
+
+class DecisionTable:
+    """Tabel keputusan terkompilasi untuk satu set aturan (RULE_THRESHOLDS)."""
+
+    def __init__(self, outcome: np.ndarray, severity: np.ndarray, reason_bits: np.ndarray,
+                 thresholds: Dict[str, float], limits: Optional[Dict[str, float]] = None):
+        self.outcome, self.severity, self.reason_bits = outcome, severity, reason_bits
+        self.thresholds = dict(thresholds)
+        self.limits = dict(GRAMATUR_LIMITS if limits is None else limits)
+        # Salinan list Python untuk lookup skalar (lebih cepat daripada indexing NumPy per elemen)
+        self._packed = list(zip(outcome.tolist(), severity.tolist(), reason_bits.tolist()))
+
+    @property
+    def nbytes(self) -> int:
+        return self.outcome.nbytes + self.severity.nbytes + self.reason_bits.nbytes
+
+    # -------------------------------------------------------------------------
+    # Build
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, thresholds: Optional[Dict[str, float]] = None, limits: Optional[Dict[str, float]] = None) -> "DecisionTable":
+        """Enumerasi semua sel kelas dan evaluasi satu kasus representatif per sel."""
+        t = dict(RULE_THRESHOLDS if thresholds is None else thresholds)
+        grid = np.indices([size for _, size in TABLE_AXES]).reshape(len(TABLE_AXES), -1)
+        ax = {name: grid[i] for i, (name, _) in enumerate(TABLE_AXES)}
+
+        def rep(cls_idx: np.ndarray, values) -> np.ndarray:
+            return np.asarray(values)[cls_idx]
+
+        sedang, berat, k = t["dsm_sedang"], t["dsm_berat"], t["kelipatan_sindikat"]
+        # Representatif pita BB: (bb, limit) per pita
+        band_bb = [0.0, 1.0, min(1.0, k), (1.0 + k) / 2.0 if k > 1 else 1.0, 1.0, max(1.0, k) + 1.0]
+        band_limit = [0.0, 0.0, 1.0, 1.0, 1.0, 1.0]
+        zeros = np.zeros(TABLE_SIZE, dtype=np.int64)
+        cols = {
+            "suicide_risk_level": rep(ax["cssrs"], [t["cssrs_darurat"] - 1, t["cssrs_darurat"]]),
+            "asam_d1": rep(ax["d1"], [t["asam_darurat"] - 1, t["asam_darurat"]]),
+            "asam_d2": rep(ax["d2"], [t["asam_darurat"] - 1, t["asam_darurat"]]),
+            "asam_d3": zeros, "asam_d4": zeros,
+            "asam_d5": rep(ax["d5"], [t["asam_rawat_inap"] - 1, t["asam_rawat_inap"]]),
+            "asam_d6": rep(ax["d6"], [t["asam_rawat_inap"] - 1, t["asam_rawat_inap"]]),
+            "dsm5_count": rep(ax["dsm"], [min(sedang, berat) - 1, sedang, berat]),
+            "assist_code": (ax["assist"] - 1).astype(np.int8),
+            "peran_code": (ax["peran"] - 1).astype(np.int8),
+            "is_residivis": ax["residivis"].astype(bool),
+            "is_urine_positive": ax["urine"].astype(bool),
+            "bb_amount": rep(ax["bb_band"], band_bb).astype(np.float64),
+            "bb_limit": rep(ax["bb_band"], band_limit).astype(np.float64),
+        }
+        codes = evaluate_codes(cols, thresholds=t)
+        return cls(codes["outcome"], codes["severity"], codes["reason_bits"], t, limits)
+
+    def is_current(self) -> bool:
+        """True bila tabel dibangun dari GRAMATUR_LIMITS dan RULE_THRESHOLDS yang aktif saat ini."""
+        return self.thresholds == RULE_THRESHOLDS and self.limits == GRAMATUR_LIMITS
+
+    # -------------------------------------------------------------------------
+    # Lookup
+    # -------------------------------------------------------------------------
+
+    def pack(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Indeks sel tabel untuk kolom hasil tat_batch.encode_columns."""
+        t, s = self.thresholds, _STRIDES
+        bb, limit, dsm = cols["bb_amount"], cols["bb_limit"], cols["dsm5_count"]
+        idx = (cols["assist_code"] + np.int32(1)) * np.int32(s["assist"])
+        idx += (cols["peran_code"] + np.int32(1)) * np.int32(s["peran"])
+
+        def add(stride: int, mask: np.ndarray) -> None:
+            np.add(idx, stride, out=idx, where=mask)
+
+        add(s["cssrs"], cols["suicide_risk_level"] >= t["cssrs_darurat"])
+        add(s["d1"], cols["asam_d1"] >= t["asam_darurat"])
+        add(s["d2"], cols["asam_d2"] >= t["asam_darurat"])
+        # Kelas DSM: 0 / 1 (sedang) / 2 (berat); berat selalu menang seperti get_addiction_severity
+        add(s["dsm"], dsm >= min(t["dsm_sedang"], t["dsm_berat"]))
+        add(s["dsm"], dsm >= t["dsm_berat"])
+        add(s["d5"], cols["asam_d5"] >= t["asam_rawat_inap"])
+        add(s["d6"], cols["asam_d6"] >= t["asam_rawat_inap"])
+        add(s["residivis"], cols["is_residivis"])
+        add(s["urine"], cols["is_urine_positive"])
+        # Pita BB: limit <= 0 -> 0/1 ; limit > 0 -> 2 + (bb > limit) + 2 * (bb > k x limit)
+        limit_pos = limit > 0
+        add(2 * s["bb_band"], limit_pos)
+        add(s["bb_band"], bb > limit)
+        add(2 * s["bb_band"], limit_pos & (bb > limit * t["kelipatan_sindikat"]))
+        return idx
+
+    def lookup_codes(self, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Pengganti evaluate_codes: satu gather array per kolom keluaran."""
+        idx = self.pack(cols)
+        return {"outcome": self.outcome[idx], "severity": self.severity[idx], "reason_bits": self.reason_bits[idx]}
+
+    def evaluate(self, cases: Any, with_alasan: bool = True) -> pd.DataFrame:
+        """Setara TATLogicEngine.determine_recommendation_batch lewat tabel."""
+        cols = encode_columns(cases)
+        codes = self.lookup_codes(cols)
+        index = cases.index if isinstance(cases, pd.DataFrame) else None
+        alasan = render_alasan(codes, cols, thresholds=self.thresholds) if with_alasan else None
+        return assemble_results(codes, index=index, alasan=alasan)
+
+    def lookup_case(
+        self, asam_scores: Dict[int, int], dsm5_count: int, suicide_risk_level: int, assist_risk: str,
+        bb_amount: float, bb_limit: float, peran: str, is_residivis: bool, is_urine_positive: bool,
+        status_tangkap: str,
+    ) -> CompactResult:
+        """Lookup O(1) satu kasus (argumen sama dengan determine_recommendation) -> hasil terkode."""
+        t = self.thresholds
+        if bb_limit > 0:
+            band = 2 + (bb_amount > bb_limit) + 2 * (bb_amount > bb_limit * t["kelipatan_sindikat"])
+        else:
+            band = int(bb_amount > bb_limit)
+        dsm_cls = 2 if dsm5_count >= t["dsm_berat"] else 1 if dsm5_count >= t["dsm_sedang"] else 0
+        peran_idx = _PERAN_INDEX.get(peran, 0)
+        s = _STRIDES
+        idx = (
+            (suicide_risk_level >= t["cssrs_darurat"]) * s["cssrs"]
+            + (asam_scores.get(1, 0) >= t["asam_darurat"]) * s["d1"]
+            + (asam_scores.get(2, 0) >= t["asam_darurat"]) * s["d2"]
+            + dsm_cls * s["dsm"]
+            + _ASSIST_INDEX.get(assist_risk, 0) * s["assist"]
+            + (asam_scores.get(5, 0) >= t["asam_rawat_inap"]) * s["d5"]
+            + (asam_scores.get(6, 0) >= t["asam_rawat_inap"]) * s["d6"]
+            + peran_idx * s["peran"]
+            + bool(is_residivis) * s["residivis"]
+            + bool(is_urine_positive) * s["urine"]
+            + band * s["bb_band"]
+        )
+        outcome, severity, bits = self._packed[idx]
+        return CompactResult(outcome, severity, bits, peran_idx - 1, bb_amount, bb_limit, t["kelipatan_sindikat"])
+
+    def recommend(self, **kwargs: Any) -> Dict[str, Any]:
+        """Setara TATLogicEngine.determine_recommendation (argumen dan hasil sama), O(1)."""
+        c = self.lookup_case(**kwargs)
+        result = dict(OUTCOME_FIELDS[OUTCOME_ORDER[c.outcome]])
+        result["alasan"] = alasan_text(c.outcome, c.severity, c.reason_bits, c.bb_amount, c.bb_limit, c.peran_code,
+                                       c.kelipatan)
+        result["derajat_ketergantungan"] = SEVERITY_LEVELS[c.severity]
+        return result
+
+
+_TABLE: Optional[DecisionTable] = None
+_TABLE_LOCK = threading.Lock()
+
+
+def get_decision_table() -> DecisionTable:
+    """Tabel untuk aturan aktif; dibangun ulang otomatis bila GRAMATUR_LIMITS/RULE_THRESHOLDS berubah."""
+    global _TABLE
+    table = _TABLE
+    # Perbandingan dict kecil (~0.2 us) lebih murah daripada hashing ulang seluruh aturan
+    if table is None or not table.is_current():
+        with _TABLE_LOCK:
+            if _TABLE is None or not _TABLE.is_current():
+                _TABLE = DecisionTable.build()
+            table = _TABLE
+    return table
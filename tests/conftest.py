@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul tat_* berada di root repo (tanpa paket), sama seperti benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,148 @@
+"""
+Uji diferensial: setiap jalur evaluasi harus identik dengan Logic Engine skalar
+(TATLogicEngine.determine_recommendation) - rekomendasi, tipe, warna, urgency,
+derajat ketergantungan dan teks alasan.
+
+Jalur vectorized batch diuji atas seluruh grid cartesian titik ambang (614.400 kasus);
+jalur lain atas sampel tetap (seed) dari grid tersebut ditambah kasus acak di seluruh
+domain input.
+"""
+
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tat_core import ASAM_DIMENSIONS, GRAMATUR_LIMITS, RULE_THRESHOLDS, TATLogicEngine
+from tat_batch import BATCH_COLUMNS, case_from_row, evaluate_compact, record_result
+from tat_parallel import evaluate_parallel
+from tat_results import OUTCOME_FIELDS, OUTCOME_ORDER
+from tat_table import get_decision_table
+import tat_service
+
+GRID_SAMPLE = 25_000
+GRID_CHUNK = 50_000
+RANDOM_CASES = 5_000
+
+
+def batch_parity_grid() -> pd.DataFrame:
+    """Grid diferensial: setiap titik ambang pada setiap sumbu, dikombinasikan penuh (cartesian).
+
+    ASAM D1/D2/D5/D6 {2,3}, DSM {3,4,5,6}, C-SSRS {3,4}, semua level ASSIST, semua jenis
+    narkotika dengan BB di sekitar batas SEMA dan 15x SEMA, semua peran, residivis, urine dan
+    status tangkap. D3/D4 tidak memengaruhi hasil sehingga cukup satu nilai.
+    """
+    asam = [[2] if d in (3, 4) else [2, 3] for d in ASAM_DIMENSIONS]
+    clinical = pd.MultiIndex.from_product(
+        asam + [[3, 4, 5, 6], [3, 4], ["Low", "Moderate", "High"]],
+        names=[f"asam_d{d}" for d in ASAM_DIMENSIONS] + ["dsm5_count", "suicide_risk_level", "assist_risk"],
+    ).to_frame(index=False)
+    bb_points = []
+    for limit in GRAMATUR_LIMITS.values():
+        k = RULE_THRESHOLDS["kelipatan_sindikat"]
+        for bb in sorted({0.0, limit * 0.5, limit, limit * 1.5, limit * k, limit * k + 1.0, 1.0}):
+            bb_points.append((bb, limit))
+    legal = pd.MultiIndex.from_product(
+        [range(len(bb_points)), ["Pengguna", "Kurir", "Pengedar", "Bandar"], [False, True], [False, True],
+         ["Tertangkap Tangan", "Pengembangan/Lapor Diri"]],
+        names=["bb_idx", "peran", "is_residivis", "is_urine_positive", "status_tangkap"],
+    ).to_frame(index=False)
+    pts = pd.DataFrame(bb_points, columns=["bb_amount", "bb_limit"])
+    legal = pd.concat([pts.iloc[legal.pop("bb_idx")].reset_index(drop=True), legal], axis=1)
+    grid = clinical.merge(legal, how="cross")
+    return grid[list(BATCH_COLUMNS)]
+
+
+def random_cases(n: int, seed: int = 0) -> pd.DataFrame:
+    """Kasus acak di seluruh domain input, termasuk peran/ASSIST di luar daftar level."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        **{f"asam_d{d}": rng.integers(0, 5, n) for d in ASAM_DIMENSIONS},
+        "dsm5_count": rng.integers(0, 12, n),
+        "suicide_risk_level": rng.integers(0, 6, n),
+        "assist_risk": rng.choice(["Low", "Moderate", "High", "Tidak Diketahui"], n),
+        "bb_amount": np.round(rng.exponential(5.0, n), 2),
+        "bb_limit": rng.choice(list(GRAMATUR_LIMITS.values()), n),
+        "peran": rng.choice(["Pengguna", "Kurir", "Pengedar", "Bandar", "Lainnya"], n),
+        "is_residivis": rng.random(n) < 0.2,
+        "is_urine_positive": rng.random(n) < 0.8,
+        "status_tangkap": rng.choice(["Tertangkap Tangan", "Pengembangan/Lapor Diri"], n),
+    })
+
+
+@pytest.fixture(scope="module")
+def cases() -> pd.DataFrame:
+    grid = batch_parity_grid().sample(n=GRID_SAMPLE, random_state=0)
+    return pd.concat([grid, random_cases(RANDOM_CASES)], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def expected(cases: pd.DataFrame) -> List[Dict[str, Any]]:
+    return [TATLogicEngine.determine_recommendation(**case_from_row(row)) for row in cases.to_dict("records")]
+
+
+def mismatches(actual: List[Dict[str, Any]], expected: List[Dict[str, Any]]) -> List[int]:
+    """Posisi baris yang hasilnya berbeda dari jalur skalar."""
+    assert len(actual) == len(expected)
+    return [i for i, (a, e) in enumerate(zip(actual, expected)) if a != e]
+
+
+def _service_rows(cases: pd.DataFrame, vectorized: bool) -> List[Dict[str, Any]]:
+    rows = [tat_service.normalize_case({**row, "bb_amount": float(row["bb_amount"])})
+            for row in cases.to_dict("records")]
+    threshold = tat_service.VECTOR_MIN_ROWS
+    tat_service.VECTOR_MIN_ROWS = 0 if vectorized else len(rows) + 1
+    try:
+        return tat_service.evaluate_rows(rows)
+    finally:
+        tat_service.VECTOR_MIN_ROWS = threshold
+
+
+PATHS: Dict[str, Callable[[pd.DataFrame], List[Dict[str, Any]]]] = {
+    "batch": lambda c: TATLogicEngine.determine_recommendation_batch(c).to_dict("records"),
+    "batch_compiled": lambda c: TATLogicEngine.determine_recommendation_batch(c, compiled=True).to_dict("records"),
+    "scalar_compiled": lambda c: [TATLogicEngine.determine_recommendation_compiled(**case_from_row(r))
+                                  for r in c.to_dict("records")],
+    "compact_records": lambda c: [record_result(rec).to_dict() for rec in evaluate_compact(c)],
+    "compact_records_compiled": lambda c: [record_result(rec).to_dict() for rec in evaluate_compact(c, compiled=True)],
+    "scalar_compact": lambda c: [TATLogicEngine.determine_recommendation_compact(**case_from_row(r)).to_dict()
+                                 for r in c.to_dict("records")],
+    "parallel": lambda c: evaluate_parallel(c, workers=2, min_rows=0).to_dict("records"),
+    "service_per_row": lambda c: _service_rows(c, vectorized=False),
+    "service_vectorized": lambda c: _service_rows(c, vectorized=True),
+}
+
+
+def test_full_grid_parity():
+    """Seluruh grid untuk jalur vectorized batch, diproses per chunk agar memori tetap kecil."""
+    grid = batch_parity_grid()
+    bad = {"batch": 0, "batch_compiled": 0}
+    for start in range(0, len(grid), GRID_CHUNK):
+        chunk = grid.iloc[start:start + GRID_CHUNK]
+        expected = [TATLogicEngine.determine_recommendation(**case_from_row(r)) for r in chunk.to_dict("records")]
+        for path in bad:
+            bad[path] += len(mismatches(PATHS[path](chunk), expected))
+    assert not any(bad.values()), f"baris berbeda dari {len(grid)} kasus grid: {bad}"
+
+
+@pytest.mark.parametrize("path", list(PATHS))
+def test_parity_with_scalar_engine(path: str, cases: pd.DataFrame, expected: List[Dict[str, Any]]):
+    bad = mismatches(PATHS[path](cases), expected)
+    assert not bad, f"{path}: {len(bad)} baris berbeda, mis. baris {bad[:5]}"
+
+
+def test_cases_cover_every_outcome(expected: List[Dict[str, Any]]):
+    """Sampel harus menjangkau semua rekomendasi, agar parity tidak lolos karena kasus yang seragam."""
+    assert {r["rekomendasi"] for r in expected} == {OUTCOME_FIELDS[k]["rekomendasi"] for k in OUTCOME_ORDER}
+
+
+def test_parity_after_rule_change(cases: pd.DataFrame, monkeypatch: pytest.MonkeyPatch):
+    """Tabel terkompilasi dibangun ulang dan jalur batch mengikuti ambang baru."""
+    monkeypatch.setitem(RULE_THRESHOLDS, "kelipatan_sindikat", 10)
+    monkeypatch.setitem(RULE_THRESHOLDS, "dsm_berat", 5)
+    sample = cases.iloc[:5_000]
+    expected = [TATLogicEngine.determine_recommendation(**case_from_row(r)) for r in sample.to_dict("records")]
+    for path in ("batch", "batch_compiled", "scalar_compiled", "scalar_compact"):
+        assert not mismatches(PATHS[path](sample), expected), path
+    assert get_decision_table().thresholds["kelipatan_sindikat"] == 10
@@ -0,0 +1,74 @@
+"""
+Resume tat_cli (iter_chunks dengan start_row): hasil sama dengan membaca penuh, dan
+memori puncak tidak tumbuh seiring posisi resume.
+"""
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from tat_batch import BATCH_COLUMNS
+from tat_cli import iter_chunks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RSS_ROWS = 600_000
+RSS_GROWTH_MB = 15  # skiprows=range(...) lama: ~60 MB tambahan pada 600k baris
+
+ROW = "2,2,1,3,2,2,4,0,Moderate,0.8,1.0,Pengguna,False,True,Tertangkap Tangan"
+
+
+def write_csv(path: str, rows: int) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(",".join(BATCH_COLUMNS) + "\n")
+        fh.writelines(f"{ROW}\n" for _ in range(rows))
+
+
+def peak_rss_mb(path: str, start_row: int) -> float:
+    """RSS puncak (MB) proses terpisah yang melanjutkan dari start_row dan membaca satu chunk."""
+    code = (
+        "import resource, sys\n"
+        "from tat_cli import iter_chunks\n"
+        "chunk = next(iter_chunks(sys.argv[1], 'csv', 1000, int(sys.argv[2])))\n"
+        "assert chunk.index[0] == int(sys.argv[2])\n"
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code, path, str(start_row)],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return int(out.stdout) / 1024  # ru_maxrss Linux dalam KB
+
+
+def test_resume_matches_full_read(tmp_path):
+    path = str(tmp_path / "kasus.csv")
+    cases = pd.DataFrame({c: range(1_000) for c in BATCH_COLUMNS})
+    cases.to_csv(path, index=False)
+    full = pd.concat(iter_chunks(path, "csv", 64))
+    for start in (0, 1, 63, 64, 999):
+        pd.testing.assert_frame_equal(pd.concat(iter_chunks(path, "csv", 64, start)), full.iloc[start:])
+    assert sum(len(c) for c in iter_chunks(path, "csv", 64, 1_000)) == 0
+
+
+@pytest.mark.parametrize("fmt, text", [
+    ("csv", 'a,b\n0,x\n1,"baris\n\nterpisah"\n\n  \n2,y\n3,z\n'),
+    ("jsonl", '{"a": 0, "b": "x"}\n{"a": 1, "b": "baris"}\n\n  \n{"a": 2, "b": "y"}\n{"a": 3, "b": "z"}\n'),
+])
+def test_resume_counts_data_rows_not_lines(tmp_path, fmt, text):
+    """next_row checkpoint = jumlah baris data; baris kosong dan newline berkutip tidak menggeser resume."""
+    path = tmp_path / f"kasus.{fmt}"
+    path.write_text(text, encoding="utf-8")
+    full = pd.concat(iter_chunks(str(path), fmt, 2))
+    assert full.index.tolist() == [0, 1, 2, 3]
+    for start in range(1, 5):
+        resumed = [c for c in iter_chunks(str(path), fmt, 2, start) if len(c)]
+        got = [(i, a) for c in resumed for i, a in zip(c.index, c["a"])]
+        assert got == list(zip(full.index[start:], full["a"].iloc[start:]))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="ru_maxrss dalam KB hanya di Linux")
+def test_resume_memory_flat(tmp_path):
+    path = str(tmp_path / "kasus.csv")
+    write_csv(path, RSS_ROWS)
+    growth = peak_rss_mb(path, RSS_ROWS - 10) - peak_rss_mb(path, 0)
+    assert growth < RSS_GROWTH_MB, f"RSS resume tumbuh {growth:.0f} MB"
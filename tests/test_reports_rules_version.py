@@ -0,0 +1,44 @@
+"""
+Laporan massal dari riwayat (write_report_zip stored_codes=True) memakai ambang aturan
+versi `rules_version` tiap baris, sama seperti CaseStore.result.
+"""
+
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from tat_core import RULE_THRESHOLDS
+from tat_reports import write_report_zip
+from tat_store import CaseStore
+
+
+def _case(nama: str) -> dict:
+    return {
+        **{f"asam_d{d}": 1 for d in range(1, 7)}, "dsm5_count": 2, "suicide_risk_level": 0,
+        "assist_risk": "Low", "bb_amount": 12.0, "bb_limit": 1.0, "peran": "Pengguna",
+        "is_residivis": False, "is_urine_positive": True, "status_tangkap": "Tertangkap Tangan",
+        "nama": nama, "jenis_narkotika": "Metamfetamina",
+    }
+
+
+def test_stored_reports_use_row_rules_version(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    with CaseStore(str(tmp_path / "riwayat.db")) as store:
+        store.insert_batch(pd.DataFrame([_case("Lama")]))
+        # Aturan 10x SEMA: 12 gram kini melewati batas sindikat
+        monkeypatch.setitem(RULE_THRESHOLDS, "kelipatan_sindikat", 10)
+        store.insert_batch(pd.DataFrame([_case("Baru")]))
+        monkeypatch.setitem(RULE_THRESHOLDS, "kelipatan_sindikat", 15)
+
+        rows = pd.concat(store.iter_cases()).to_dict("records")
+        assert len({r["rules_version"] for r in rows}) == 2
+        out = io.BytesIO()
+        assert write_report_zip(out, store.iter_cases(), stored_codes=True, rules=store.get_rules) == 2
+
+        with zipfile.ZipFile(out) as zf:
+            texts = [zf.read(name).decode("utf-8") for name in zf.namelist()]
+        for row, text in zip(rows, texts):
+            assert row["nama"] in text
+            assert "\n".join("- " + r for r in store.result(row).alasan) in text
+        assert ">10x SEMA" in texts[1] and "10x" not in texts[0]
@@ -0,0 +1,37 @@
+"""
+Header HTTP tidak valid pada tat_service dijawab 400, bukan menutup koneksi tanpa respons.
+"""
+
+import asyncio
+
+import pytest
+
+from tat_service import AssessmentService
+
+
+async def _exchange(request: bytes) -> bytes:
+    service = AssessmentService()
+    await service.start(port=0)
+    port = service.server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        return response
+    finally:
+        await service.stop()
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1.5"])
+def test_invalid_content_length_is_bad_request(length: str):
+    response = asyncio.run(_exchange(
+        f"POST /assess HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode("latin-1")))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Content-Length tidak valid" in response
+
+
+def test_valid_request_still_served():
+    response = asyncio.run(_exchange(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 200 ")